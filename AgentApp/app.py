@@ -1,16 +1,37 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response
 from pydantic import BaseModel as FastAPIModel
 from typing import Dict, Any, Optional, List
 import uvicorn
 import os
+import time
 from dotenv import load_dotenv
 
 # Import the state model and graph
 from models.state import BoxState
 from graphs.main_graph import build_main_graph
+from nodes.classification import warm_up_classifier
+from tools.building.design import design, design_many, format_design
+from tools.building.sweep import sweep_design, sweep_summary
+from utils.artifacts import artifact_store
+from utils.history import read_log
+from graphs.checkpoints import (
+    finish_run,
+    list_interrupted_plans,
+    make_checkpointer,
+    new_thread_id,
+    resume_plan,
+    run_config,
+)
+
+try:
+    from app.config import DESIGN_BATCH_MAX_SITES
+except ImportError:
+    DESIGN_BATCH_MAX_SITES = 100_000
 
-# Create the graph
-graph = build_main_graph()
+# Create the graph (state checkpointed to disk so plans can be resumed)
+graph = build_main_graph(checkpointer=make_checkpointer())
+warm_up_classifier()
 
 # Create FastAPI app
 app = FastAPI(
@@ -23,88 +44,186 @@ app = FastAPI(
 class ChatRequest(FastAPIModel):
     message: str
     history: Optional[List[Dict[str, Any]]] = []
+    plan: bool = False  # skip the classifier and run the message as a multi-tool plan
+    synthesis: Optional[str] = None  # "auto", "template" or "llm" (default: ANSWER_SYNTHESIS)
 
 class ChatResponse(FastAPIModel):
     response: str
-    type: str  # "design", "guide", "answer", or "unknown"
+    type: str  # "design", "guide", "answer", "plan", or "unknown"
     data: Optional[Dict[str, Any]] = None  # For design results or search results
+    thread_id: Optional[str] = None  # checkpoint thread — use with /plans/{thread_id}/resume
+
+class SweepRequest(FastAPIModel):
+    area: float
+    # Each axis: a list of values or {"min", "max", "step"} (defaults: tools/building/sweep.py)
+    width: Optional[Any] = None
+    n_floors: Optional[Any] = None
+    floor_height: Optional[Any] = None
+    window_ratio: Optional[Any] = None
+    objectives: Optional[Dict[str, str]] = None  # e.g. {"total_area": "max", "height": "min"}
+    limit: int = 20  # feasible rows returned (the Pareto front is always complete)
+
+class DesignRequest(FastAPIModel):
+    area: Optional[float] = None          # footprint, m² (defaults: tools/building/solver.py)
+    n_floors: Optional[int] = None
+    floor_height: Optional[float] = None
+    width: Optional[float] = None         # fixes the plan shape (or depth / aspect_ratio)
+    depth: Optional[float] = None
+    aspect_ratio: Optional[float] = None
+    message: Optional[str] = None         # parsed for the values left out
+    sites: Optional[List[Dict[str, Any]]] = None  # batch: one parameter set per site
+
+def _format_response(final_state_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a final graph state into a ChatResponse payload."""
+    # Process the response based on request type
+    request_type = final_state_dict.get("request_type", "unknown")
+
+    if request_type == "design_building":
+        # Format design results
+        return format_design(
+            final_state_dict.get("box", {}),
+            final_state_dict.get("compliant", False),
+            final_state_dict.get("issues", []),
+        )
+
+    elif request_type == "show_guide":
+        # Return the design guidelines
+        return {
+            "response": final_state_dict.get("answer", "No guidelines available."),
+            "type": "guide",
+            "data": None
+        }
+
+    elif request_type == "general_question":
+        # Return the answer to the question
+        answer = final_state_dict.get("answer", "No answer available.")
+        search_results = final_state_dict.get("search_results")
+
+        return {
+            "response": answer,
+            "type": "answer",
+            "data": {"search_results": search_results} if search_results else None
+        }
+
+    elif request_type == "plan":
+        # Return the plan summary plus every step result
+        return {
+            "response": final_state_dict.get("answer") or "Plan finished.",
+            "type": "plan",
+            "data": {
+                "plan": final_state_dict.get("plan"),
+                "plan_results": final_state_dict.get("plan_results"),
+            }
+        }
+
+    else:
+        # Unknown request type
+        return {
+            "response": final_state_dict.get("answer", "I don't understand your request."),
+            "type": "unknown",
+            "data": None
+        }
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     """Process a chat message with the architectural assistant."""
+    thread_id = new_thread_id("plan" if request.plan else "run")
     try:
         # Create state from the message
         if not request.message:
             return {"response": "Please provide a message.", "type": "error"}
-        
+
         # Create initial state with user input
-        state = BoxState(request={"user_input": request.message})
-        
-        # Run the agent
-        final_state_dict = graph.invoke(state, config={"recursion_limit": 50})
-        
-        # Process the response based on request type
-        request_type = final_state_dict.get("request_type", "unknown")
-        
-        if request_type == "design_building":
-            # Format design results
-            box = final_state_dict.get("box", {})
-            is_compliant = final_state_dict.get("compliant", False)
-            issues = final_state_dict.get("issues", [])
-            
-            response_text = "Building Design Results:\n"
-            response_text += f"Compliant: {is_compliant}\n"
-            
-            if issues:
-                response_text += f"Issues: {', '.join(issues)}\n"
-                
-            response_text += "\nDimensions:\n"
-            for key, value in box.items():
-                if value is not None:
-                    if isinstance(value, float):
-                        response_text += f"- {key}: {value:.2f}\n"
-                    else:
-                        response_text += f"- {key}: {value}\n"
-            
-            return {
-                "response": response_text,
-                "type": "design",
-                "data": {
-                    "box": box,
-                    "compliant": is_compliant,
-                    "issues": issues
-                }
-            }
-            
-        elif request_type == "show_guide":
-            # Return the design guidelines
-            return {
-                "response": final_state_dict.get("answer", "No guidelines available."),
-                "type": "guide",
-                "data": None
-            }
-            
-        elif request_type == "general_question":
-            # Return the answer to the question
-            answer = final_state_dict.get("answer", "No answer available.")
-            search_results = final_state_dict.get("search_results")
-            
-            return {
-                "response": answer,
-                "type": "answer",
-                "data": {"search_results": search_results} if search_results else None
-            }
-            
-        else:
-            # Unknown request type
-            return {
-                "response": final_state_dict.get("answer", "I don't understand your request."),
-                "type": "unknown",
-                "data": None
-            }
-            
+        state = BoxState(
+            request={"user_input": request.message, "synthesis": request.synthesis},
+            request_type="plan" if request.plan else None,
+            history_run=thread_id,
+        )
+
+        # Run the agent; only a resumable plan keeps its checkpoints
+        try:
+            final_state_dict = graph.invoke(state, config=run_config(thread_id))
+        finally:
+            finish_run(graph, thread_id)
+        return {**_format_response(final_state_dict), "thread_id": thread_id}
+
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing request: {str(e)} (thread_id: {thread_id})",
+        )
+
+@app.get("/plans")
+async def plans_endpoint():
+    """List plans that were interrupted or finished with failed steps."""
+    return {"plans": list_interrupted_plans(graph)}
+
+@app.post("/plans/{thread_id}/resume", response_model=ChatResponse)
+async def resume_plan_endpoint(thread_id: str):
+    """Resume a plan from its last successful step."""
+    try:
+        final_state_dict = resume_plan(graph, thread_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error resuming plan: {str(e)}")
+    return {**_format_response(final_state_dict), "thread_id": thread_id}
+
+@app.get("/history/{thread_id}")
+async def history_endpoint(thread_id: str):
+    """Return every history entry of a run from the on-disk log (full payloads)."""
+    entries = read_log(thread_id)
+    if not entries:
+        raise HTTPException(status_code=404, detail=f"No history for {thread_id}")
+    return {"thread_id": thread_id, "entries": entries}
+
+@app.get("/artifacts/{handle}")
+async def artifact_endpoint(handle: str):
+    """Return a stored tool output by its handle ("art:…" from a result stub)."""
+    try:
+        data = artifact_store.get(handle)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(content=data, media_type="text/plain; charset=utf-8")
+
+@app.post("/design")
+def design_endpoint(request: DesignRequest):
+    """Size a box (or a batch of sites) against the design rules, without the graph."""
+    if request.sites is None:
+        return design(request.model_dump(exclude={"sites"}, exclude_none=True))
+    if len(request.sites) > DESIGN_BATCH_MAX_SITES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"at most {DESIGN_BATCH_MAX_SITES} sites per request",
+        )
+    started = time.perf_counter()
+    results = design_many(request.sites)
+    return {
+        "results": results,
+        "count": len(results),
+        "compliant": sum(1 for r in results if r["data"]["compliant"]),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+@app.post("/design/sweep")
+def design_sweep_endpoint(request: SweepRequest):
+    """Evaluate a grid of massings for an area; return the feasible count and Pareto front."""
+    axes = {
+        axis: getattr(request, axis)
+        for axis in ("width", "n_floors", "floor_height", "window_ratio")
+        if getattr(request, axis) is not None
+    }
+    try:
+        result = sweep_design(request.area, axes, request.objectives)
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return sweep_summary(result, request.limit)
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Return runtime counters and timings recorded by the agent nodes."""
+    from utils import metrics
+    return metrics.snapshot()
 
 @app.get("/")
 async def root():
@@ -113,6 +232,13 @@ async def root():
         "message": "Architectural Assistant API",
         "endpoints": {
             "/chat": "POST - Send a message to the assistant",
+            "/plans": "GET - List interrupted plans",
+            "/plans/{thread_id}/resume": "POST - Resume a plan from its last successful step",
+            "/history/{thread_id}": "GET - Full node history of a run (from the on-disk log)",
+            "/artifacts/{handle}": "GET - Full tool output behind an artifact stub",
+            "/design": "POST - Size a box (or a batch of sites) against the rules, without the graph",
+            "/design/sweep": "POST - Sweep candidate massings for an area (feasible set + Pareto front)",
+            "/metrics": "GET - Runtime counters and timings",
             "/": "GET - Get API information"
         },
         "example": {
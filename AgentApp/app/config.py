@@ -21,6 +21,52 @@ LLM_TIMEOUT     = _s.LLM_TIMEOUT
 GEMINI_MODEL    = _s.GEMINI_MODEL
 MCP_GH_ENDPOINT = _s.MCP_GH_ENDPOINT
 MCP_TIMEOUT     = _s.MCP_TIMEOUT
+MCP_GH_ENDPOINTS = list(_s.MCP_GH_ENDPOINTS or [MCP_GH_ENDPOINT])
+MCP_GUID_OWNERS_MAX = _s.MCP_GUID_OWNERS_MAX
+MCP_READ_ONLY_TOOLS = list(_s.MCP_READ_ONLY_TOOLS)
+PLAN_MAX_PARALLEL = _s.PLAN_MAX_PARALLEL
+PLAN_CONCRETE_ARGS = _s.PLAN_CONCRETE_ARGS
+PLAN_CACHE         = _s.PLAN_CACHE
+PLAN_CACHE_MAX_ENTRIES = _s.PLAN_CACHE_MAX_ENTRIES
+PLAN_MAX_WAVES     = _s.PLAN_MAX_WAVES
+INTENT_CLASSIFIER           = _s.INTENT_CLASSIFIER
+INTENT_CONFIDENCE_THRESHOLD = _s.INTENT_CONFIDENCE_THRESHOLD
+INTENT_LOG_MAX_ENTRIES      = _s.INTENT_LOG_MAX_ENTRIES
+SPECULATIVE_ROUTING         = _s.SPECULATIVE_ROUTING
+TOOL_CALL_MAX_PARALLEL        = _s.TOOL_CALL_MAX_PARALLEL
+TOOL_CALL_SERIALIZE_MUTATIONS = _s.TOOL_CALL_SERIALIZE_MUTATIONS
+ANSWER_SYNTHESIS   = _s.ANSWER_SYNTHESIS
+CACHE_DIR          = os.path.join(_ROOT, _s.CACHE_DIR)
+CHECKPOINT_PATH    = os.path.join(CACHE_DIR, _s.CHECKPOINT_FILE)
+SEARCH_CACHE       = _s.SEARCH_CACHE
+SEARCH_CACHE_PATH  = os.path.join(CACHE_DIR, _s.SEARCH_CACHE_FILE)
+SEARCH_CACHE_TTL         = _s.SEARCH_CACHE_TTL
+SEARCH_CACHE_STALE_TTL   = _s.SEARCH_CACHE_STALE_TTL
+SEARCH_CACHE_MAX_ENTRIES = _s.SEARCH_CACHE_MAX_ENTRIES
+CODE_SEARCH        = _s.CODE_SEARCH
+CODE_DOCS_DIR      = os.path.join(_ROOT, _s.CODE_DOCS_DIR)
+CODE_INDEX_DIR     = os.path.join(CACHE_DIR, _s.CODE_INDEX_DIR)
+CODE_INDEX_CHECK_SECONDS = _s.CODE_INDEX_CHECK_SECONDS
+CODE_SEARCH_MIN_COVERAGE = _s.CODE_SEARCH_MIN_COVERAGE
+SEARCH_MAX_QUERIES = _s.SEARCH_MAX_QUERIES
+SEARCH_TOP_K       = _s.SEARCH_TOP_K
+SEARCH_CONTEXT_TOKENS = _s.SEARCH_CONTEXT_TOKENS
+HISTORY_MAX_ENTRIES = _s.HISTORY_MAX_ENTRIES
+HISTORY_INLINE_CHARS = _s.HISTORY_INLINE_CHARS
+HISTORY_LOG        = _s.HISTORY_LOG
+HISTORY_LOG_PATH   = os.path.join(CACHE_DIR, _s.HISTORY_LOG_FILE)
+ARTIFACTS          = _s.ARTIFACTS
+ARTIFACT_DIR       = os.path.join(CACHE_DIR, _s.ARTIFACT_DIR)
+ARTIFACT_MIN_CHARS = _s.ARTIFACT_MIN_CHARS
+ARTIFACT_PREVIEW_CHARS = _s.ARTIFACT_PREVIEW_CHARS
+ARTIFACT_MEMORY_BYTES = _s.ARTIFACT_MEMORY_BYTES
+DESIGN_SOLVER      = _s.DESIGN_SOLVER
+DESIGN_EXTRACTION_LLM = _s.DESIGN_EXTRACTION_LLM
+DESIGN_MAX_ITERATIONS = _s.DESIGN_MAX_ITERATIONS
+DESIGN_BATCH_WORKERS = _s.DESIGN_BATCH_WORKERS
+DESIGN_BATCH_MIN_PARALLEL = _s.DESIGN_BATCH_MIN_PARALLEL
+DESIGN_BATCH_MAX_SITES = _s.DESIGN_BATCH_MAX_SITES
+SWEEP_MAX_CANDIDATES = _s.SWEEP_MAX_CANDIDATES
 
 # ── Secret keys (from .env.local only) ───────────────────────────────────────
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
@@ -0,0 +1,110 @@
+"""
+Labelled requests for the local intent classifier (nodes/intent_classifier.py).
+
+The classifier is trained on these plus every classification the LLM made at
+run time (logged to .cache/intent_log.jsonl), so it improves as the agent is
+used.  Keep the prompts in example_prompt.py out of this list — the offline
+evaluation (evaluate_classifier.py) uses them as a held-out set.
+"""
+
+# Keyword hints per category — each hit becomes a feature of the linear model
+INTENT_KEYWORDS = {
+    "design_building": [
+        "building", "floors", "storey", "storeys", "stories", "sqm", "square meters",
+        "square metres", "floor area", "total area", "floor height", "design a",
+        "office", "residential", "compliant", "compliance", "size",
+    ],
+    "use_tool": [
+        "draw", "create", "make", "model", "generate", "bake", "sphere", "box",
+        "cylinder", "curve", "wall", "slab", "extrude", "loft", "viewport",
+        "screenshot", "capture", "script", "grasshopper", "rhino", "select",
+        "layer", "scene",
+    ],
+    "show_guide": [
+        "guideline", "guidelines", "rules", "constraints", "requirements",
+        "limits", "show me the", "list the", "display the",
+    ],
+    "general_question": [
+        "what is", "what are", "how does", "how do", "why", "explain",
+        "difference", "history", "trends", "latest", "best practice",
+    ],
+}
+
+# (request, category)
+INTENT_EXAMPLES = [
+    # ── design_building ──────────────────────────────────────────────────────
+    ("Design a building with 1200 sqm and 4 floors", "design_building"),
+    ("I need a 3 storey office of 900 square meters", "design_building"),
+    ("Size a residential block with 2000 sqm total area", "design_building"),
+    ("Design a two floor house with 300 sqm", "design_building"),
+    ("Make a compliant building of 1500 sqm with floor height 3.5 m", "design_building"),
+    ("Create an office building 18 m wide with 4 floors", "design_building"),
+    ("Plan a school building with 2500 square metres over 3 levels", "design_building"),
+    ("Design a building that satisfies the code with 800 sqm", "design_building"),
+    ("Check if a 5 storey 3000 sqm building is compliant", "design_building"),
+    ("Generate a building massing for 1000 sqm on 2 floors", "design_building"),
+    ("I want a small clinic, 600 m2, single storey", "design_building"),
+    ("Design a warehouse of 2800 sqm with 5 m floor height", "design_building"),
+    ("Propose building dimensions for 1800 sqm and 3 floors", "design_building"),
+    ("Design an apartment building with total area 2200 sqm", "design_building"),
+    ("Create a residential building 400 sqm 2 floors with emergency exits", "design_building"),
+    ("Size the building: area 950 sqm, floor height 3 m, 3 floors", "design_building"),
+    # ── use_tool ─────────────────────────────────────────────────────────────
+    ("Draw a box 10 by 8 by 5", "use_tool"),
+    ("Create a cylinder with radius 2 and height 9", "use_tool"),
+    ("Draw a sphere at the origin", "use_tool"),
+    ("Make a wall 6 m long and 3 m high", "use_tool"),
+    ("Bake the geometry to the Rhino document", "use_tool"),
+    ("Capture the viewport and tell me what you see", "use_tool"),
+    ("Take a screenshot of the perspective view", "use_tool"),
+    ("What objects are in the scene?", "use_tool"),
+    ("List the selected geometry", "use_tool"),
+    ("Run a C# script that counts the curves in the document", "use_tool"),
+    ("Extrude a circle of radius 3 by 12 units", "use_tool"),
+    ("Loft between two curves", "use_tool"),
+    ("Generate a slab 20 by 10 and 0.3 thick", "use_tool"),
+    ("Draw a tower 40 m tall on a 10 m square footprint", "use_tool"),
+    ("Model a curved roof surface", "use_tool"),
+    ("Put the baked objects on layer Massing", "use_tool"),
+    ("Create a grid of points 5 by 5", "use_tool"),
+    ("Run the grasshopper definition with width 12", "use_tool"),
+    # ── show_guide ───────────────────────────────────────────────────────────
+    ("Show the design rules", "show_guide"),
+    ("List the building constraints", "show_guide"),
+    ("What are the design guidelines?", "show_guide"),
+    ("Display the rules you check against", "show_guide"),
+    ("Which limits apply to my building?", "show_guide"),
+    ("Show me the requirements for floor height and area", "show_guide"),
+    ("What constraints does the design have to satisfy?", "show_guide"),
+    ("Print the guideline list", "show_guide"),
+    ("Tell me the maximum height and area rules", "show_guide"),
+    ("What rules do you use for compliance?", "show_guide"),
+    # ── general_question ─────────────────────────────────────────────────────
+    ("What is a load bearing wall?", "general_question"),
+    ("Explain passive solar design", "general_question"),
+    ("How does cross ventilation work in houses?", "general_question"),
+    ("Why are atriums used in office buildings?", "general_question"),
+    ("What is the difference between a beam and a girder?", "general_question"),
+    ("What are current trends in timber construction?", "general_question"),
+    ("How do green roofs reduce energy use?", "general_question"),
+    ("Explain the history of brutalist architecture", "general_question"),
+    ("What are best practices for acoustic insulation?", "general_question"),
+    ("Who designed the Sydney Opera House?", "general_question"),
+    ("What is the typical span of a concrete slab?", "general_question"),
+    ("How are fire codes enforced for high rises?", "general_question"),
+    ("What materials are best for hot climates?", "general_question"),
+    ("What is biophilic design?", "general_question"),
+    ("How tall should a handrail be?", "general_question"),
+    ("What are the newest regulations for accessible ramps?", "general_question"),
+    # ── unknown ──────────────────────────────────────────────────────────────
+    ("Hello", "unknown"),
+    ("Thanks!", "unknown"),
+    ("What's the weather tomorrow?", "unknown"),
+    ("Tell me a joke", "unknown"),
+    ("asdfgh", "unknown"),
+    ("Who won the football match yesterday?", "unknown"),
+    ("Can you book me a flight to Paris?", "unknown"),
+    ("What is 17 times 23?", "unknown"),
+    ("ok", "unknown"),
+    ("Translate good morning into French", "unknown"),
+]
@@ -0,0 +1,37 @@
+"""
+Answer templates for tool results.
+
+When every tool in a turn has a template (and none failed), the tool_use and
+plan branches phrase the answer from these instead of making a second LLM
+call.  Placeholders are the tool's declared outputs (from /api/list_tools),
+plus:
+
+    {tool}      tool name
+    {summary}   "- output: value" lines for every declared output present
+
+A template whose placeholders are not all present in the result is skipped
+and the LLM synthesises the answer as before.
+"""
+
+# Exact tool name → template
+TOOL_TEMPLATES = {
+    "bake_gh_geometry": (
+        "Baked {baked_count} object(s) onto layer '{layer}' "
+        "({skipped} component(s) skipped). Object ids: {baked_ids}"
+    ),
+    "get_scene_info": (
+        "'{doc_name}' contains {object_count} object(s) ({object_types}). "
+        "Active view: {active_view}."
+    ),
+    "get_selected_geometry": "{count} object(s) selected.",
+    "list_rhinocommon_types": "Found {count} matching RhinoCommon type(s).",
+    "run_csharp_script": "Script ran successfully. Return value: {return_value}",
+}
+
+# Tool category → template (first matching category wins)
+CATEGORY_TEMPLATES = {
+    "grasshopper": "Ran {tool}:\n{summary}",
+}
+
+# Used for any other tool that declares outputs
+DEFAULT_TEMPLATE = "Ran {tool}:\n{summary}"
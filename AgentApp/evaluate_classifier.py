@@ -0,0 +1,103 @@
+"""Offline evaluation of the local intent classifier.
+
+Usage (from AgentApp/ directory):
+    python evaluate_classifier.py              # k-fold CV + example_prompt.py
+    python evaluate_classifier.py --log        # also cross-validate logged LLM labels
+    python evaluate_classifier.py --folds 10
+
+For each confidence threshold it reports how many requests would still go to
+the LLM (fallback rate), the accuracy of the requests the classifier decides
+on its own, and the overall accuracy assuming the LLM is right on fallbacks.
+No LLM is called.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.intent_examples import INTENT_EXAMPLES
+from nodes.intent_classifier import IntentClassifier, intent_classifier
+
+THRESHOLDS = [0.0, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95]
+
+# example_prompt.py section heading → category
+_SECTIONS = {
+    "building design": "design_building",
+    "show guidelines": "show_guide",
+    "general architecture": "general_question",
+}
+
+
+def load_example_prompts(path: str) -> List[Tuple[str, str]]:
+    """Labelled prompts from the ``# Heading\\n\"\"\" … \"\"\"`` blocks of *path*."""
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    out = []
+    for heading, block in re.findall(r"#\s*([^\n]+)\n\"\"\"(.*?)\"\"\"", source, re.DOTALL):
+        label = next((v for k, v in _SECTIONS.items() if k in heading.lower()), None)
+        if label:
+            out += [(line.strip(), label) for line in block.splitlines() if line.strip()]
+    return out
+
+
+def cross_validate(data: Sequence[Tuple[str, str]], folds: int) -> List[Tuple[str, str, float]]:
+    """``[(true_label, predicted, confidence)]`` for every item, held out once."""
+    items = list(data)
+    preds = []
+    for k in range(folds):
+        test = items[k::folds]
+        train = [x for i, x in enumerate(items) if i % folds != k]
+        clf = IntentClassifier(examples=train).fit(train)
+        for text, label in test:
+            pred, conf = clf.predict(text)
+            preds.append((label, pred, conf))
+    return preds
+
+
+def report(name: str, preds: List[Tuple[str, str, float]]) -> None:
+    print(f"\n{name}  ({len(preds)} prompts)")
+    print(f"  {'threshold':>9}  {'LLM fallback':>12}  {'local acc':>9}  {'overall acc':>11}")
+    for th in THRESHOLDS:
+        local = [(y, p) for y, p, c in preds if c >= th]
+        fallback = len(preds) - len(local)
+        correct = sum(1 for y, p in local if y == p)
+        local_acc = correct / len(local) if local else 1.0
+        overall = (correct + fallback) / len(preds) if preds else 0.0
+        print(f"  {th:>9.2f}  {fallback / len(preds):>11.0%}  {local_acc:>9.0%}  {overall:>11.0%}")
+    wrong = [(y, p, c) for y, p, c in preds if y != p]
+    if wrong:
+        print(f"  misclassified (true → predicted @ confidence): "
+              + ", ".join(f"{y}→{p}@{c:.2f}" for y, p, c in wrong[:8]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--log", action="store_true", help="include logged LLM classifications")
+    args = parser.parse_args()
+
+    data = list(INTENT_EXAMPLES)
+    if args.log:
+        logged = intent_classifier.logged_examples()
+        print(f"  {len(logged)} logged classification(s) from {intent_classifier.log_path}")
+        data += logged
+
+    report(f"{args.folds}-fold cross-validation", cross_validate(data, args.folds))
+
+    held_out = load_example_prompts(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "example_prompt.py")
+    )
+    clf = IntentClassifier(examples=data).fit(data)
+    t0 = time.perf_counter()
+    preds = [(y, *clf.predict(text)) for text, y in held_out]
+    per_call = (time.perf_counter() - t0) / max(1, len(held_out))
+    report("example_prompt.py (held out)", preds)
+    print(f"\n  mean prediction time: {per_call * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Durable checkpointing for graph runs — lets interrupted plans be resumed.
+
+LangGraph saves the state after every node.  With the SQLite saver that
+means ``plan``, ``plan_step`` and ``plan_results`` hit the disk after every
+plan wave (every step when PLAN_MAX_PARALLEL = 1), so a crash or a failed
+step does not throw away the GH solves that already ran.
+
+Only resumable plans are kept: ``finish_run`` deletes a run's thread once it
+ends without a plan or with its plan finished cleanly, so the database holds
+one thread per interrupted plan rather than one per chat turn.
+
+Usage
+-----
+    from graphs.checkpoints import make_checkpointer, run_config, new_thread_id
+    graph = build_main_graph(checkpointer=make_checkpointer())
+    graph.invoke(state, config=run_config(new_thread_id()))
+
+    finish_run(graph, thread_id)       → True if the thread was kept (resumable)
+    list_interrupted_plans(graph)      → [{thread_id, user_input, done, total, …}]
+    resume_plan(graph, thread_id)      → final state dict
+"""
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+try:
+    from app.config import CHECKPOINT_PATH
+except ImportError:
+    CHECKPOINT_PATH = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "checkpoints.sqlite"
+    )
+
+RECURSION_LIMIT = 50
+
+
+def make_checkpointer(path: Optional[str] = CHECKPOINT_PATH):
+    """Return a SQLite-backed saver at *path* (in-memory if unavailable)."""
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        from langgraph.checkpoint.memory import MemorySaver
+        print("  [checkpoints] langgraph-checkpoint-sqlite not installed — "
+              "plans will not survive a restart")
+        return MemorySaver()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    saver = SqliteSaver(conn)
+    saver.setup()
+    return saver
+
+
+def new_thread_id(prefix: str = "run") -> str:
+    return f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def run_config(thread_id: str, recursion_limit: int = RECURSION_LIMIT) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}, "recursion_limit": recursion_limit}
+
+
+def _failed_keys(plan_results: Dict[str, Any]) -> List[str]:
+    return [k for k, v in (plan_results or {}).items() if str(v).startswith("Error")]
+
+
+def _resumable(snapshot) -> bool:
+    """Whether *snapshot* holds a plan that stopped early or has failed steps."""
+    values = snapshot.values or {}
+    plan = values.get("plan") or []
+    if not plan:
+        return False
+    results = values.get("plan_results") or {}
+    # Finished cleanly — unless the loop guard stopped it with steps left
+    return bool(snapshot.next or _failed_keys(results) or len(results) < len(plan))
+
+
+def delete_thread(graph, thread_id: str) -> None:
+    """Drop every checkpoint of *thread_id*."""
+    saver = graph.checkpointer
+    if saver is None:
+        return
+    try:
+        saver.delete_thread(thread_id)
+    except Exception as exc:
+        print(f"  [checkpoints] cannot delete {thread_id}: {exc}")
+
+
+def finish_run(graph, thread_id: str) -> bool:
+    """Keep *thread_id* only if it holds a resumable plan; True if kept."""
+    if graph.checkpointer is None:
+        return False
+    if _resumable(graph.get_state(run_config(thread_id))):
+        return True
+    delete_thread(graph, thread_id)
+    return False
+
+
+def _latest_threads(saver) -> List[str]:
+    """Thread ids, newest checkpoint first (one row per thread)."""
+    conn = getattr(saver, "conn", None)
+    if isinstance(conn, sqlite3.Connection):
+        # checkpoint ids are time-ordered, so MAX is the latest per thread
+        with saver.lock:
+            rows = conn.execute(
+                "SELECT thread_id, MAX(checkpoint_id) AS latest FROM checkpoints "
+                "WHERE checkpoint_ns = '' GROUP BY thread_id ORDER BY latest DESC"
+            ).fetchall()
+        return [tid for tid, _ in rows]
+
+    latest: Dict[str, str] = {}
+    for item in saver.list(None):
+        tid = item.config["configurable"]["thread_id"]
+        cid = item.config["configurable"].get("checkpoint_id", "")
+        if cid > latest.get(tid, ""):
+            latest[tid] = cid
+    return sorted(latest, key=latest.get, reverse=True)
+
+
+def list_interrupted_plans(graph) -> List[Dict[str, Any]]:
+    """Plans that stopped before finishing or finished with failed steps.
+
+    Newest first.  Threads that turn out not to be resumable (left by runs
+    from before ``finish_run``) are deleted on the way.
+    """
+    saver = graph.checkpointer
+    if saver is None:
+        return []
+
+    plans = []
+    for tid in _latest_threads(saver):
+        snapshot = graph.get_state(run_config(tid))
+        if not _resumable(snapshot):
+            delete_thread(graph, tid)
+            continue
+        values = snapshot.values or {}
+        results = values.get("plan_results") or {}
+        failed = _failed_keys(results)
+        plans.append({
+            "thread_id":  tid,
+            "user_input": (values.get("request") or {}).get("user_input", ""),
+            "done":       len(results) - len(failed),
+            "total":      len(values["plan"]),
+            "failed":     failed,
+            "next":       list(snapshot.next),
+            "updated_at": snapshot.created_at or "",
+        })
+    return plans
+
+
+def resume_plan(graph, thread_id: str) -> Dict[str, Any]:
+    """Continue a plan from its last successful step.
+
+    Failed step results — and results of steps that depended on them — are
+    discarded so those steps run again; everything else is kept.
+    """
+    config = run_config(thread_id)
+    snapshot = graph.get_state(config)
+    values = snapshot.values or {}
+    if not values.get("plan"):
+        raise ValueError(f"No plan found for thread '{thread_id}'")
+
+    results = values.get("plan_results") or {}
+    failed = _failed_keys(results)
+    if failed or not snapshot.next:
+        # Steps that consumed a failed result ran on bad input → re-run them too
+        from nodes.planning.nodes import step_dependencies, step_key
+        plan = values["plan"]
+        stale = set(failed)
+        for i, step in enumerate(plan):
+            if stale.intersection(step_dependencies(plan, i)):
+                stale.add(step_key(step, i))
+        kept = {k: v for k, v in results.items() if k not in stale}
+        # as_node="planner" → the next node is execute_plan_step
+        graph.update_state(
+            config,
+            {
+                "plan_results": kept, "plan_step": len(kept), "answer": None, "done": None,
+                # a fresh loop budget for the resumed run
+                "loops": {**(values.get("loops") or {}), "plan": {}},
+            },
+            as_node="planner",
+        )
+    try:
+        return graph.invoke(None, config=config)
+    finally:
+        finish_run(graph, thread_id)
@@ -10,12 +10,16 @@ from nodes.search import (
     answer_without_search_fn,
 )
 from nodes.building_design import (
+    extract_params_fn,
     retrieve_rules_fn,
+    solve_design_fn,
+    solve_design_router,
     thinking_fn,
     action_fn,
     draw_box_fn,
     compliance_check_fn,
     is_compliant_fn,
+    design_loop_router,
 )
 from nodes.tool_use import execute_gh_tool_fn
 from nodes.planning import (
@@ -26,23 +30,39 @@ from nodes.planning import (
 )
 
 
+def route_request(state: BoxState) -> str:
+    """Branch after classify_input.
+
+    When the classifier already decided the search gate for a general
+    question, determine_search_need is skipped.
+    """
+    if state.request_type == "general_question" and state.needs_search is not None:
+        return "needs_search" if state.needs_search else "no_search"
+    return state.request_type
+
+
 def build_main_graph(checkpointer=None):
     """Build the LangGraph agent.
 
     Branches
     ────────
-    plan             → planner → plan_step (loop) → plan_summary
+    plan             → planner → plan_step (guarded loop) → plan_summary
                          Chain multiple GH tools in sequence (plan mode).
 
     use_tool         → execute_gh_tool
                          Draw / model a single geometry via GH script.
 
-    design_building  → retrieve_rules → thinking → execute_action
-                     → draw_box → compliance_check → is_compliant
-                         Size a building against code constraints (ReAct loop).
+    design_building  → extract_params → retrieve_rules → solve_design
+                     [→ thinking → execute_action → draw_box
+                      → compliance_check → is_compliant]
+                         Size a building against code constraints: closed-form
+                         solver, ReAct loop only when it cannot decide
+                         (loop guard: best design returned on exit).
 
     show_guide       → show_guide
-    general_question → determine_search_need → [web_search |] → answer
+    general_question → [determine_search_need →] [web_search |] → answer
+                         (the gate is skipped when classify_input already
+                          returned needs_search / search_query)
     unknown          → handle_unknown
     """
     g = StateGraph(BoxState)
@@ -59,7 +79,9 @@ def build_main_graph(checkpointer=None):
     g.add_node("execute_gh_tool",      execute_gh_tool_fn)
 
     # ── Branch B: Building design ReAct loop ───────────────────────────
+    g.add_node("extract_params",       extract_params_fn)
     g.add_node("retrieve_rules",       retrieve_rules_fn)
+    g.add_node("solve_design",         solve_design_fn)
     g.add_node("thinking",             thinking_fn)
     g.add_node("execute_action",       action_fn)
     g.add_node("draw_box",             draw_box_fn)
@@ -81,13 +103,15 @@ def build_main_graph(checkpointer=None):
 
     g.add_conditional_edges(
         "classify_input",
-        lambda state: state.request_type,
+        route_request,
         {
             "plan":              "planner",
             "use_tool":          "execute_gh_tool",
-            "design_building":   "retrieve_rules",
+            "design_building":   "extract_params",
             "show_guide":        "show_guide",
             "general_question":  "determine_search_need",
+            "needs_search":      "perform_web_search",
+            "no_search":         "answer_without_search",
             "unknown":           "handle_unknown",
         },
     )
@@ -105,14 +129,20 @@ def build_main_graph(checkpointer=None):
     g.add_edge("execute_gh_tool", "__end__")
 
     # Branch C: ReAct loop
-    g.add_edge("retrieve_rules",   "thinking")
+    g.add_edge("extract_params",   "retrieve_rules")
+    g.add_edge("retrieve_rules",   "solve_design")
+    g.add_conditional_edges(
+        "solve_design",
+        solve_design_router,
+        {"solved": "__end__", "undecided": "thinking"},
+    )
     g.add_edge("thinking",         "execute_action")
     g.add_edge("execute_action",   "draw_box")
     g.add_edge("draw_box",         "compliance_check")
     g.add_edge("compliance_check", "is_compliant")
     g.add_conditional_edges(
         "is_compliant",
-        lambda state: "True" if state.compliant else "False",
+        design_loop_router,
         {"True": "__end__", "False": "thinking"},
     )
 
@@ -14,11 +14,17 @@ class BoxState(BaseModel):
 
     # GH tool execution results
     tool_results: Optional[Dict[str, Any]] = None
+    # Tool calls parsed straight from the input ("draw_box width=10 …") — no LLM
+    direct_calls: Optional[List[Dict[str, Any]]] = None
 
     # Building design
     box: Optional[Dict[str, Any]] = None
     compliant: Optional[bool] = None
     issues: Optional[List[str]] = None
+    violations: Optional[List[Dict[str, Any]]] = None    # structured issues (tools/building/rules.py)
+    # Last compliance check per rule + the box fields it read, so the next
+    # check only re-runs rules whose inputs changed (RuleSet.violations_incremental)
+    rule_cache: Dict[str, Any] = Field(default_factory=dict)
     rules: Optional[List[Dict[str, Any]]] = None
     current_width: Optional[float] = None
     
@@ -29,6 +35,7 @@ class BoxState(BaseModel):
     
     # Search components
     search_query: Optional[str] = None
+    search_queries: Optional[List[str]] = None           # sub-queries, searched concurrently
     search_results: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
     needs_search: Optional[bool] = None
     
@@ -38,14 +45,26 @@ class BoxState(BaseModel):
     aspect_ratio: Optional[float] = None
     
     # Plan execution (chained multi-tool tasks)
-    plan: Optional[List[Dict[str, Any]]] = None          # [{step, tool, intent, output_key}, ...]
-    plan_step: int = 0                                    # index of next step to execute
-    plan_results: Dict[str, Any] = Field(default_factory=dict)  # {output_key: result_str}
+    plan: Optional[List[Dict[str, Any]]] = None          # [{step, tool, intent, output_key, depends_on}, ...]
+    plan_step: int = 0                                    # number of steps completed
+    plan_results: Dict[str, Any] = Field(default_factory=dict)  # {output_key: result_str}, plan order
+    plan_metrics: Dict[str, Any] = Field(default_factory=dict)  # wall vs sequential seconds, waves
+
+    # Loop guards: iterations, recent signatures, best candidate and stop
+    # reason per graph loop ("design", "plan") — see nodes/loop_guard.py
+    loops: Dict[str, Any] = Field(default_factory=dict)
+
+    # Results of speculative work whose predicted branch was taken, keyed by the
+    # node that would otherwise compute them (see nodes/speculation.py)
+    speculative: Dict[str, Any] = Field(default_factory=dict)
 
     # Conversation memory – list of {"role": "user"|"assistant", "content": "..."}
     # Annotated with operator.add so LangGraph accumulates messages across turns
     # when a MemorySaver checkpointer is used (appended, not replaced).
     messages: Annotated[List[Dict[str, str]], operator.add] = Field(default_factory=list)
 
-    # History tracking
-    history: List[Dict[str, Any]] = Field(default_factory=list)
\ No newline at end of file
+    # History tracking — compact records of the last HISTORY_MAX_ENTRIES node
+    # events; full entries live in the on-disk log (see utils/history.py)
+    history: List[Dict[str, Any]] = Field(default_factory=list)
+    history_run: Optional[str] = None      # run id in the log (the checkpoint thread id)
+    history_dropped: int = 0               # older records trimmed from history
\ No newline at end of file
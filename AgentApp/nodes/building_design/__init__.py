@@ -3,24 +3,34 @@ nodes/building_design — ReAct loop for the design_building branch.
 
 Graph flow
 ──────────
-retrieve_rules → thinking → execute_action → draw_box → compliance_check
-    → is_compliant  (loops back to thinking if not compliant)
+extract_params → retrieve_rules → solve_design  (closed form; ends the branch when it decides)
+    → thinking → execute_action → draw_box → compliance_check
+    → is_compliant  (loops back to thinking if not compliant, until the
+                     loop guard stops it — nodes/loop_guard.py)
 """
 
 from .nodes import (
     action_fn,
     compliance_check_fn,
+    design_loop_router,
     draw_box_fn,
+    extract_params_fn,
     is_compliant_fn,
     retrieve_rules_fn,
+    solve_design_fn,
+    solve_design_router,
     thinking_fn,
 )
 
 __all__ = [
+    "extract_params_fn",
     "retrieve_rules_fn",
+    "solve_design_fn",
+    "solve_design_router",
     "thinking_fn",
     "action_fn",
     "draw_box_fn",
     "compliance_check_fn",
     "is_compliant_fn",
+    "design_loop_router",
 ]
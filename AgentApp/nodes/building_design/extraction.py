@@ -0,0 +1,170 @@
+"""
+Deterministic, unit-aware extraction of design parameters from a request.
+
+    "Design a 3-storey office of 10,000 sq ft, floor height 4 m"
+        → {"area": 929.03, "n_floors": 3, "floor_height": 4.0}
+
+Recognised (all values converted to metres / m²):
+
+    area          1,000 sqm · 500 m² · 10000 sq ft · 1.2 ha · 0.5 acres
+                  ("total" / "gross" area is split over the floors when known)
+    n_floors      3 floors · 3 stories · three-storey · 4 levels · single-story
+    floor_height  floor height of 4 m · 3.5 m floor-to-floor · 12 ft per floor
+    height        18 m tall · height of 18 m            (→ floors / floor height;
+                  alone, split into floors of about the default floor height)
+    width, depth  20 m wide · depth of 40 m
+    aspect_ratio  ratio 1:2 · aspect ratio of 0.5 · 1:3 width to depth
+
+Lengths without a unit are taken as metres.  ``extract_design_params``
+returns ``(params, ambiguities)``; an ambiguity (two different values for one
+field, or a number no pattern accounts for) is where the caller may ask the
+LLM.  Regexes are compiled once — a call takes tens of microseconds.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.building.solver import DEFAULTS
+
+FIELDS = ("area", "n_floors", "floor_height", "height", "width", "depth", "aspect_ratio")
+
+AREA_UNITS = {
+    "m2": 1.0, "ft2": 0.09290304, "ha": 10_000.0, "acre": 4046.8564224,
+}
+LENGTH_UNITS = {"m": 1.0, "ft": 0.3048}
+
+WORD_NUMBERS = {
+    "one": 1, "single": 1, "two": 2, "double": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+
+_NUM = r"(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)(\s*k\b)?"
+_END = r"(?![\w²])"
+_AREA_UNIT = (
+    r"(m²|m2|sq\.?\s*m(?:eters?|etres?)?|sqm|square\s+m(?:eters?|etres?)"
+    r"|ft²|ft2|sq\.?\s*f(?:ee|oo)?t|sqft|square\s+f(?:ee|oo)t"
+    r"|hectares?|ha|acres?)" + _END
+)
+_LEN_UNIT = r"(m|meters?|metres?|ft|feet|foot|')" + _END
+_WORDS = "|".join(WORD_NUMBERS)
+_STOREY = r"(?:floors?|stories|stor(?:e)?ys?|levels?)"
+_IS = r"\s*(?:of|is|=|:|at)?\s*(?:about\s+|around\s+|approximately\s+|~\s*)?"
+
+_PATTERNS: List[Tuple[str, "re.Pattern[str]"]] = [
+    ("aspect_ratio", re.compile(
+        r"(?:aspect\s+|width[\s-]*to[\s-]*depth\s+|w\s*/\s*d\s+)?ratio" + _IS +
+        r"(\d+(?:\.\d+)?)\s*(?::|/|to)\s*(\d+(?:\.\d+)?)")),
+    ("aspect_ratio", re.compile(
+        r"(\d+(?:\.\d+)?)\s*:\s*(\d+(?:\.\d+)?)\s*(?:aspect\s+ratio|ratio|width[\s-]*to[\s-]*depth)")),
+    # a single number is only a ratio when qualified ("window ratio of 0.15" is not)
+    ("aspect_ratio", re.compile(r"(?:aspect\s+|width[\s-]*to[\s-]*depth\s+)ratio" + _IS + r"(\d+(?:\.\d+)?)(?!\s*(?::|/|to)\s*\d)")),
+    ("area", re.compile(_NUM + r"\s*" + _AREA_UNIT)),
+    ("floor_height", re.compile(
+        r"(?:floor|stor(?:e)?y|level)[\s-]*(?:to[\s-]*floor[\s-]*)?heights?" + _IS + _NUM + r"\s*" + _LEN_UNIT + "?")),
+    ("floor_height", re.compile(
+        _NUM + r"\s*" + _LEN_UNIT + r"?\s*(?:floor|stor(?:e)?y|level)[\s-]*(?:to[\s-]*floor[\s-]*)?heights?")),
+    ("floor_height", re.compile(_NUM + r"\s*" + _LEN_UNIT + r"\s*(?:per|each|a)\s+(?:floor|stor(?:e)?y|level)")),
+    ("floor_height", re.compile(_NUM + r"\s*" + _LEN_UNIT + r"\s*floor[\s-]*to[\s-]*floor")),
+    ("n_floors", re.compile(r"(\d+|" + _WORDS + r")[\s-]*" + _STOREY + r"(?![\s-]*(?:to|height))")),
+    ("n_floors", re.compile(r"(?:floors|stories|stor(?:e)?ys|levels)" + r"\s*(?:=|:)\s*(\d+)")),
+    ("height", re.compile(r"height" + _IS + _NUM + r"\s*" + _LEN_UNIT + "?")),
+    ("height", re.compile(_NUM + r"\s*" + _LEN_UNIT + r"?\s*(?:tall|high|in\s+height)")),
+    ("width", re.compile(r"width" + _IS + _NUM + r"\s*" + _LEN_UNIT + "?")),
+    ("width", re.compile(_NUM + r"\s*" + _LEN_UNIT + r"?\s*wide")),
+    ("depth", re.compile(r"depth" + _IS + _NUM + r"\s*" + _LEN_UNIT + "?")),
+    ("depth", re.compile(_NUM + r"\s*" + _LEN_UNIT + r"?\s*deep")),
+]
+_TOTAL_RE = re.compile(r"\b(?:total|gross|overall|combined)\b[\w\s]{0,20}$")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def _number(text: str, k: Optional[str] = None) -> float:
+    value = float(text.replace(",", ""))
+    return value * 1000 if k else value
+
+
+def _area_unit(unit: str) -> str:
+    unit = unit.replace(" ", "")
+    if unit.startswith(("ft", "sqf", "squaref")) or "ft" in unit or "feet" in unit or "foot" in unit:
+        return "ft2"
+    if unit.startswith("h"):
+        return "ha"
+    if unit.startswith("acre"):
+        return "acre"
+    return "m2"
+
+
+def _length(value: float, unit: Optional[str]) -> float:
+    if unit and unit.startswith(("f", "'")):
+        return value * LENGTH_UNITS["ft"]
+    return value
+
+
+def _parse(field: str, m: "re.Match[str]", text: str) -> Tuple[Any, Dict[str, Any]]:
+    """Value (SI) and notes for one match."""
+    g = m.groups()
+    if field == "aspect_ratio":
+        if len(g) == 2:
+            a, b = float(g[0]), float(g[1])
+            return (a / b if b else None), {}
+        return float(g[0]), {}
+    if field == "area":
+        unit = _area_unit(g[2])
+        value = _number(g[0], g[1]) * AREA_UNITS[unit]
+        total = bool(_TOTAL_RE.search(text[max(0, m.start() - 40):m.start()]))
+        return value, {"total_area": total}
+    if field == "n_floors":
+        token = g[0]
+        return (int(token) if token.isdigit() else WORD_NUMBERS[token]), {}
+    # lengths: floor_height, height, width, depth
+    return _length(_number(g[0], g[1]), g[2]), {}
+
+
+def extract_design_params(text: str) -> Tuple[Dict[str, Any], List[str]]:
+    """``(params, ambiguities)`` parsed from *text* — no LLM involved."""
+    lowered = str(text).lower()
+    taken: List[Tuple[int, int]] = []
+    found: Dict[str, List[Any]] = {}
+    total_area = False
+
+    for field, pattern in _PATTERNS:
+        for m in pattern.finditer(lowered):
+            if any(m.start() < end and start < m.end() for start, end in taken):
+                continue
+            value, notes = _parse(field, m, lowered)
+            if value is None:
+                continue
+            taken.append(m.span())
+            found.setdefault(field, [])
+            if value not in found[field]:
+                found[field].append(value)
+            total_area = total_area or notes.get("total_area", False)
+
+    params: Dict[str, Any] = {}
+    ambiguities: List[str] = []
+    for field, values in found.items():
+        if len(values) > 1:
+            ambiguities.append(f"{field}: several values {values}")
+        params[field] = values[0]
+
+    for m in _NUMBER_RE.finditer(lowered):
+        if not any(start <= m.start() < end for start, end in taken):
+            ambiguities.append(f"unrecognised number {m.group(0)!r}")
+
+    # Derived values
+    n_floors, height, floor_height = params.get("n_floors"), params.get("height"), params.get("floor_height")
+    if height and n_floors and not floor_height:
+        params["floor_height"] = height / n_floors
+    elif height and floor_height and not n_floors:
+        params["n_floors"] = max(1, int(height // floor_height + 1e-9))
+    elif height and not n_floors and not floor_height:
+        # the solver only takes floors × floor height; keep the total height
+        params["n_floors"] = max(1, round(height / DEFAULTS["floor_height"]))
+        params["floor_height"] = height / params["n_floors"]
+    if total_area and "area" in params:
+        params["total_area"] = params["area"]
+        if params.get("n_floors"):
+            params["area"] = params["total_area"] / params["n_floors"]
+    for key in ("area", "floor_height", "height", "width", "depth", "aspect_ratio", "total_area"):
+        if key in params:
+            params[key] = round(float(params[key]), 4)
+    return params, ambiguities
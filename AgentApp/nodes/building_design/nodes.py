@@ -1,27 +1,140 @@
-from typing import Dict, Any, List, Optional
+import math
+import textwrap
+from typing import Dict, Any, List, Optional, Tuple
+from config.design_rules import DESIGN_GUIDE
 from models.state import BoxState
+from nodes.building_design.extraction import FIELDS, extract_design_params
+from nodes.loop_guard import best_candidate, guard_loop, loop_stopped, start_loop
+from tools.building.rules import compile_rules, format_issue
+from tools.building.solver import solve_box, width_bounds
+from utils import metrics
+from utils.history import record
+
+try:
+    from app.config import DESIGN_EXTRACTION_LLM, DESIGN_MAX_ITERATIONS, DESIGN_SOLVER
+except ImportError:
+    DESIGN_SOLVER = True
+    DESIGN_MAX_ITERATIONS = 8
+    DESIGN_EXTRACTION_LLM = True
+
+def _think(label: str, text: str):
+    prefix = f"  ┊ {label}: "
+    body = str(text).strip().replace("\n", " ")
+    for i, line in enumerate(textwrap.wrap(body, width=68)):
+        print((prefix if i == 0 else " " * len(prefix)) + line)
+
+def _llm_design_params(user_input: str, ambiguities: List[str]) -> Dict[str, Any]:
+    """Ask the LLM for the design parameters (only used for ambiguous text)."""
+    from nodes.search.nodes import parse_json_object
+    from utils.llm_utils import fast_llm
+    prompt = (
+        "Extract the building design parameters from the request below. Reply with "
+        "one JSON object using only these keys (omit unknown ones), in metres / "
+        f"square metres: {', '.join(FIELDS)}. `area` is the floor area of one storey.\n"
+        f"Unclear parts: {'; '.join(ambiguities)}\n\n"
+        f"Request: {user_input}"
+    )
+    try:
+        data = parse_json_object(str(fast_llm(prompt))) or {}
+    except Exception as exc:
+        _think("LLM error", exc)
+        return {}
+    params: Dict[str, Any] = {}
+    for key in FIELDS:
+        try:
+            value = float(data[key])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if value > 0:
+            params[key] = int(round(value)) if key == "n_floors" else value
+    return params
+
+def extract_params_fn(state: BoxState) -> BoxState:
+    """Fill ``state.request`` with design parameters parsed from the user's text.
+
+    Deterministic parsing first; the LLM is asked only when the text is
+    ambiguous.  Values already in the request (e.g. from the API) win.
+    """
+    user_input = state.request.get("user_input", "")
+    params, ambiguities = extract_design_params(user_input)
+    source = "local"
+    if ambiguities:
+        _think("ambiguous", "; ".join(ambiguities))
+        if DESIGN_EXTRACTION_LLM:
+            llm_params = _llm_design_params(user_input, ambiguities)
+            if llm_params:
+                params.update(llm_params)
+                source = "llm"
+    metrics.incr(f"design_extraction.{source}")
+
+    filled = {k: v for k, v in params.items() if state.request.get(k) is None}
+    state.request = {**state.request, **filled}
+    _think(
+        f"design parameters ({source})",
+        filled or ("already in the request" if params else "none found — using defaults"),
+    )
+    record(state, {
+        "node": "extract_params",
+        "params": filled,
+        "source": source,
+        "ambiguities": ambiguities,
+    })
+    return state
 
 def retrieve_rules_fn(state: BoxState) -> BoxState:
     """Retrieve the building code rules and constraints."""
-    # Define building code rules
-    rules = [
-        {
-            "id": "depth_constraint",
-            "description": "Building depth must not exceed 50 meters for safety reasons",
-        },
-        {
-            "id": "ratio_constraint",
-            "description": "Width to depth ratio must be at least 0.33 (1:3) for structural stability",
-        },
-        {
-            "id": "emergency_exit_constraint",
-            "description": "Buildings must have emergency exits",
-        }
-    ]
-    
-    state.rules = rules
+    state.rules = [dict(rule) for rule in DESIGN_GUIDE]
+    start_loop(state, "design")
     return state
 
+def solve_design_fn(state: BoxState) -> BoxState:
+    """Size the box in closed form; leaves ``compliant`` unset when undecided.
+
+    Feasible → compliant box.  Infeasible → the closest box plus the rules
+    that cannot be met together.  Undecided → the ReAct loop takes over.
+    """
+    if not DESIGN_SOLVER:
+        return state
+    result = solve_box(state.request, state.rules or DESIGN_GUIDE)
+    record(state, {
+        "node": "solve_design",
+        "status": result["status"],
+        "width_range": result["width_range"],
+        "issues": list(result["issues"]),
+    })
+    if result["status"] == "undecided":
+        state.observation = f"Solver could not decide: {'; '.join(result['issues'])}"
+        return state
+
+    box = result["box"]
+    state.box = box
+    state.current_width = box["width"]
+    state.emergency_exits = box["emergency_exits"]
+    state.window_area = box["window_area"]
+    state.aspect_ratio = box["aspect_ratio"]
+    state.issues = result["issues"]
+    state.violations = result["violations"]
+    state.compliant = result["status"] == "feasible"
+    if state.compliant:
+        lo, hi = result["width_range"]
+        upper = f"{hi:.2f}" if hi is not None else "∞"
+        state.observation = (
+            f"Solved: width {box['width']:.2f} m (feasible widths {lo:.2f}–{upper} m)."
+        )
+    elif result["binding"]:
+        state.observation = (
+            f"No width satisfies both {' and '.join(result['binding'])}; "
+            f"closest design: {', '.join(result['issues'])}"
+        )
+    else:
+        state.observation = (
+            f"No design satisfies all rules: {', '.join(result['issues'])}"
+        )
+    return state
+
+def solve_design_router(state: BoxState) -> str:
+    return "undecided" if state.compliant is None else "solved"
+
 def thinking_fn(state: BoxState) -> BoxState:
     """ReAct thinking step that analyzes the current state and decides what to do next."""
     box = state.box or {}
@@ -50,44 +163,106 @@ def thinking_fn(state: BoxState) -> BoxState:
     state.thought = thought
     
     # Add to history
-    if state.history is None:
-        state.history = []
-    state.history.append({
+    record(state, {
         "node": "thinking",
         "thought": thought
     })
     
     return state
 
+def _rule_width_bounds(rules: List[Dict[str, Any]], box: Dict[str, Any]) -> List[Tuple[float, float]]:
+    """Width interval of every applying width / depth / aspect-ratio rule."""
+    area = box.get("area") or 0
+    if area <= 0:
+        return []
+    return [
+        width_bounds(rule, area)
+        for rule in compile_rules(rules)
+        if rule.field in ("width", "depth", "aspect_ratio") and rule.kind == "range"
+        and set(rule.condition_fields) <= set(box) and rule.applies(box)
+    ]
+
+def _width_for(
+    violations: List[Dict[str, Any]], area: float, bounds: List[Tuple[float, float]] = ()
+) -> Tuple[float, bool]:
+    """Width that clears the violated width / depth / aspect-ratio bounds.
+
+        depth = area / width        →  width = area / depth_limit
+        ratio = width² / area       →  width = sqrt(ratio_limit * area)
+
+    *bounds* are the width intervals of all geometry rules, so a fix for one
+    bound does not break another.  Returns ``(width, resolvable)``; when no
+    width satisfies them all (largest lower bound above the smallest upper
+    bound) the width is clamped to the smallest upper bound and *resolvable*
+    is False.
+    """
+    lower = [lo for lo, _ in bounds if lo > 0]
+    upper = [hi for _, hi in bounds if math.isfinite(hi)]
+    for v in violations:
+        limit = v["limit"]
+        if v["field"] == "width":
+            target = limit
+        elif v["field"] == "depth":
+            target = area / limit
+        else:
+            target = math.sqrt(limit * area)
+        # A too-deep box or a too-small ratio needs a wider box
+        widen = (v["field"] == "depth") == (v["bound"] == "max")
+        (lower if widen else upper).append(target)
+    if lower and upper and max(lower) > min(upper):
+        return min(upper), False
+    if lower:
+        # Small margin above the largest lower bound, as before
+        width = math.ceil(max(lower)) + 1
+        return (min(width, min(upper)) if upper else width), True
+    return (math.floor(min(upper)) if min(upper) >= 1 else min(upper)), True
+
 def action_fn(state: BoxState) -> BoxState:
-    """Decide what action to take based on thinking."""
-    import math
-    issues = state.issues or []
-    area = state.request.get("area", 800)
-
-    # Compute the minimum width that satisfies both geometry constraints:
-    #   depth = area / width ≤ 50  →  width ≥ area / 50
-    #   ratio = width / depth ≥ 0.33  →  width² ≥ 0.33 * area  →  width ≥ sqrt(0.33 * area)
-    # Take the larger of the two, add a small margin and round up.
-    min_for_depth = area / 50.0
-    min_for_ratio = math.sqrt(0.33 * area)
-    required_width = math.ceil(max(min_for_depth, min_for_ratio)) + 1
-
-    has_depth  = any("depth_constraint"          in i for i in issues)
-    has_ratio  = any("ratio_constraint"          in i for i in issues)
-    has_exits  = any("emergency_exit_constraint" in i for i in issues)
-
-    if has_depth or has_ratio:
-        # Set width large enough to resolve both at once
-        state.action = {"action": "adjust_width", "params": {"width": required_width}}
-    elif has_exits:
+    """Decide what action to take based on the structured rule violations.
+
+    Geometry comes first — unless no width can clear it, in which case the
+    width stays clamped and the independent fixes (exits, windows, floors)
+    are applied instead of alternating between widths.
+    """
+    violations = state.violations or []
+    box = state.box or {}
+    area = box.get("area") or state.request.get("area", 800)
+    by_field: Dict[str, List[Dict[str, Any]]] = {}
+    for v in violations:
+        by_field.setdefault(v["field"], []).append(v)
+
+    geometry = [v for v in violations if v["field"] in ("width", "depth", "aspect_ratio") and v["limit"]]
+    width, resolvable = (
+        _width_for(geometry, area, _rule_width_bounds(state.rules or DESIGN_GUIDE, {**box, "area": area}))
+        if geometry else (None, True)
+    )
+    if geometry and (resolvable or width != state.current_width):
+        # Set width large (or small) enough to resolve all of them at once
+        # (or clamp it once to the tightest upper bound)
+        state.action = {"action": "adjust_width", "params": {"width": width}}
+    elif "emergency_exits" in by_field:
         state.action = {"action": "add_emergency_exits", "params": {"emergency_exits": True}}
+    elif "window_area_ratio" in by_field:
+        v = by_field["window_area_ratio"][0]
+        window_area = math.ceil(v["limit"] * area * 100) / 100
+        state.action = {"action": "adjust_window_area", "params": {"window_area": window_area}}
+    elif "floor_height" in by_field:
+        state.action = {"action": "adjust_floor_height", "params": {"floor_height": by_field["floor_height"][0]["limit"]}}
+    elif "n_floors" in by_field or "height" in by_field:
+        v = (by_field.get("n_floors") or by_field["height"])[0]
+        floor_height = box.get("floor_height") or 3
+        n_floors = v["limit"] if v["field"] == "n_floors" else math.floor(v["limit"] / floor_height)
+        state.action = {"action": "adjust_floors", "params": {"n_floors": max(1, int(n_floors))}}
+    elif geometry:
+        # Only unresolvable geometry is left — keep the clamped width; the
+        # loop guard sees the repeat and stops with this design
+        state.action = {"action": "adjust_width", "params": {"width": width}}
     else:
-        # No known issues — nudge width slightly and let compliance re-evaluate
+        # No fixable issue — nudge width slightly and let compliance re-evaluate
         state.action = {"action": "adjust_width", "params": {"width": (state.current_width or 16) + 4}}
     
     # Add to history
-    state.history.append({
+    record(state, {
         "node": "action",
         "action": state.action
     })
@@ -103,7 +278,7 @@ def draw_box_fn(state: BoxState) -> BoxState:
     
     # Default initialization for first run
     if not action or state.current_width is None:
-        state.current_width = 10
+        state.current_width = state.request.get("width") or 10
         width = state.current_width
         area = state.request.get("area", 800)
         n_floors = state.request.get("n_floors", 2)
@@ -163,7 +338,7 @@ def draw_box_fn(state: BoxState) -> BoxState:
     })
     
     # Add to history
-    state.history.append({
+    record(state, {
         "node": "draw_box",
         "box": state.box.copy()
     })
@@ -172,25 +347,16 @@ def draw_box_fn(state: BoxState) -> BoxState:
 
 def compliance_check_fn(state: BoxState) -> BoxState:
     """Check if the current box design meets all constraints."""
-    box = state.box
-    rules = state.rules or []
-    
-    # Check compliance against all rules
-    _validators = {
-        "depth_constraint": lambda b: b.get("depth", 0) <= 50,
-        "ratio_constraint": lambda b: b.get("aspect_ratio", 0) >= 0.33,
-        "emergency_exit_constraint": lambda b: b.get("emergency_exits", False) is True,
-    }
-    issues = []
-    for rule in rules:
-        try:
-            validate = _validators.get(rule["id"])
-            if validate and not validate(box):
-                issues.append(f"Failed {rule['id']}: {rule['description']}")
-        except Exception as e:
-            issues.append(f"Error checking {rule['id']}: {str(e)}")
-    
-    # Update the state with compliance issues
+    box = state.box or {}
+    ruleset = compile_rules(state.rules or DESIGN_GUIDE)
+
+    # Structured violations (with margins) for action_fn, strings for display.
+    # Only rules reading a box field that changed since the last check re-run.
+    violations, state.rule_cache, stats = ruleset.violations_incremental(box, state.rule_cache)
+    metrics.incr("rules.evaluated", stats["evaluated"])
+    metrics.incr("rules.reused", stats["reused"])
+    issues = [format_issue(v) for v in violations]
+    state.violations = violations
     state.issues = issues
     
     # Set observation for the ReAct agent
@@ -200,22 +366,85 @@ def compliance_check_fn(state: BoxState) -> BoxState:
         state.observation = "Design complies with all rules."
     
     # Add to history
-    state.history.append({
+    record(state, {
         "node": "compliance_check",
-        "issues": issues.copy() if issues else []
+        "issues": issues.copy() if issues else [],
+        "rules_evaluated": stats["evaluated"],
     })
     
     return state
 
+def _shortfall(violations: List[Dict[str, Any]]) -> float:
+    """How far the violated bounds are missed (1 per violation without a margin)."""
+    return sum(-v["margin"] if v.get("margin") is not None else 1.0 for v in violations)
+
+# Fixes that do not depend on the box's shape: field → action
+_INDEPENDENT_FIXES = {"emergency_exits": "add_emergency_exits", "window_area_ratio": "adjust_window_area"}
+
+def _apply_independent_fixes(state: BoxState) -> None:
+    """Apply exit / window fixes the stopped loop left on its best design.
+
+    The loop guard may stop on a candidate from before these were applied;
+    they never conflict with other rules, so the returned design gets them.
+    """
+    missing = [v for v in state.violations or [] if v["field"] in _INDEPENDENT_FIXES]
+    if not missing:
+        return
+    area = state.box.get("area") or state.request.get("area", 800)
+    for v in missing:
+        if v["field"] == "emergency_exits":
+            state.emergency_exits = state.box["emergency_exits"] = True
+        else:
+            state.window_area = state.box["window_area"] = math.ceil(v["limit"] * area * 100) / 100
+    _think("loop stopped", f"applied {', '.join(_INDEPENDENT_FIXES[v['field']] for v in missing)} to the best design")
+    metrics.incr("design.fixes_after_stop", len(missing))
+    compliance_check_fn(state)
+
 def is_compliant_fn(state: BoxState) -> BoxState:
-    """Determine if the design is compliant based on issues."""
+    """Determine if the design is compliant based on issues.
+
+    Non-compliant iterations pass through the design loop guard; when it
+    stops the loop, the best design seen so far is restored.
+    """
     # Design is compliant if there are no issues
     state.compliant = len(state.issues or []) == 0
+
+    if not state.compliant:
+        violations = state.violations or []
+        reason = guard_loop(
+            state, "design",
+            [state.box, sorted(v["id"] for v in violations)],
+            DESIGN_MAX_ITERATIONS,
+            score=(len(violations), _shortfall(violations)),
+            candidate={
+                "box": dict(state.box or {}),
+                "issues": list(state.issues or []),
+                "violations": violations,
+                "current_width": state.current_width,
+            },
+        )
+        if reason:
+            best = best_candidate(state, "design") or {}
+            state.box = best.get("box", state.box)
+            state.issues = best.get("issues", state.issues)
+            state.violations = best.get("violations", state.violations)
+            state.current_width = best.get("current_width", state.current_width)
+            _apply_independent_fixes(state)
+            state.compliant = not state.issues
+            iterations = state.loops["design"]["iterations"]
+            state.observation = (
+                f"Stopped after {iterations} iteration(s) ({reason}); best design "
+                f"has {len(state.issues or [])} remaining issue(s): {', '.join(state.issues or [])}"
+            )
     
     # Add to history
-    state.history.append({
+    record(state, {
         "node": "is_compliant",
         "compliant": state.compliant
     })
     
     return state
+
+def design_loop_router(state: BoxState) -> str:
+    """"True" ends the branch (compliant, or the loop guard stopped it)."""
+    return "True" if state.compliant or loop_stopped(state, "design") else "False"
@@ -1,6 +1,22 @@
 from models.state import BoxState
+from nodes.search import (
+    SEARCH_MAX_QUERIES,
+    apply_search_decision,
+    general_question_branch,
+    parse_json_object,
+    speculate_general_question,
+)
+from nodes.speculation import settle
+from utils import metrics
+from utils.history import record
 from utils.llm_utils import fast_llm
 
+try:
+    from app.config import INTENT_CLASSIFIER, INTENT_CONFIDENCE_THRESHOLD
+except ImportError:
+    INTENT_CLASSIFIER = True
+    INTENT_CONFIDENCE_THRESHOLD = 0.85
+
 _HR = "─" * 72
 
 
@@ -13,6 +29,19 @@ def _think(label: str, text: str):
         print((prefix if i == 0 else " " * len(prefix)) + line)
 
 
+def warm_up_classifier() -> None:
+    """Train the local classifier in the background (call once at startup)."""
+    if not INTENT_CLASSIFIER:
+        return
+    from nodes.intent_classifier import intent_classifier
+    try:
+        from tools import TOOL_CLASSES
+        intent_classifier.tool_names = sorted(t.name for t in TOOL_CLASSES)
+    except Exception:
+        pass
+    intent_classifier.refit_async()
+
+
 def classify_input_fn(state: BoxState) -> BoxState:
     """Classify the user input into one of five routing categories."""
     user_input = state.request.get("user_input", "")
@@ -26,6 +55,54 @@ def classify_input_fn(state: BoxState) -> BoxState:
         state.request_type = "use_tool"
         return state
 
+    # ── Explicit tool command ("draw_box width=10 …") → no LLM needed ────────
+    try:
+        from tools import TOOL_CLASSES
+        from nodes.tool_use.direct import parse_direct_calls
+        calls, reason = parse_direct_calls(user_input, TOOL_CLASSES)
+    except Exception:
+        calls, reason = None, None
+    if reason:
+        _think("direct call rejected", reason)
+    if calls:
+        state.request_type = "use_tool"
+        state.direct_calls = calls
+        print(f"  ⇒ classified as: use_tool (direct call, {len(calls)} command(s))")
+        print()
+        record(state, {
+            "node": "classify_input",
+            "request_type": state.request_type,
+            "direct_calls": calls,
+            "user_input": user_input,
+        })
+        return state
+
+    # ── Local classifier — the LLM is only asked when it is unsure ───────────
+    local_guess = None
+    if INTENT_CLASSIFIER:
+        from nodes.intent_classifier import intent_classifier
+        try:
+            from tools import TOOL_CLASSES
+            intent_classifier.set_tool_names(t.name for t in TOOL_CLASSES)
+        except Exception:
+            pass
+        label, confidence = intent_classifier.predict(user_input)
+        local_guess = label
+        if confidence >= INTENT_CONFIDENCE_THRESHOLD:
+            state.request_type = label
+            metrics.incr("classify.local")
+            print(f"  ⇒ classified as: {label} (local, confidence {confidence:.2f})")
+            print()
+            record(state, {
+                "node": "classify_input",
+                "request_type": label,
+                "confidence": confidence,
+                "user_input": user_input,
+            })
+            return state
+        _think("local classifier", f"{label} ({confidence:.2f}) below "
+               f"{INTENT_CONFIDENCE_THRESHOLD:.2f} — asking LLM")
+
     # ── Dynamic tool section ──────────────────────────────────────────────────
     try:
         from tools import TOOL_CLASSES
@@ -61,21 +138,36 @@ Categories:
 Rules:
 - Whole-building sizing with code compliance → design_building
 - Drawing / modelling any specific geometry shape or running a named tool → use_tool
-- Output ONLY the category name, nothing else.
-
-Classification:"""
+- For general_question, also decide whether answering needs CURRENT information
+  from the web (current codes, new techniques, recent trends) or only general
+  architectural knowledge, and if so write 1 to {SEARCH_MAX_QUERIES} concise web search
+  queries — one per distinct aspect of a broad question, one for a narrow one.
+
+Respond with ONLY this JSON object:
+{{"category": "<category name>", "needs_search": true|false, "search_queries": ["<query>", ...]}}"""
+
+    # ── Speculation: start the locally predicted branch alongside the LLM ────
+    speculations = []
+    if local_guess == "use_tool":
+        from nodes.tool_use import speculate_tool_selection
+        speculations.append(speculate_tool_selection(user_input))
+    elif local_guess == "general_question":
+        speculations.append(speculate_general_question(user_input))
 
     try:
         response = fast_llm(prompt)
     except Exception as exc:
+        settle(speculations, None, state)
         print(f"  ┊ LLM error: {exc}")
         print(f"  ⇒ classified as: unknown (LLM unreachable)")
         state.request_type = "unknown"
-        state.history.append({"node": "classify_input", "request_type": "unknown", "user_input": user_input})
+        record(state, {"node": "classify_input", "request_type": "unknown", "user_input": user_input})
         return state
 
-    classification = str(response).strip().lower()
-    _think("LLM raw", classification)
+    raw = str(response).strip()
+    _think("LLM raw", raw)
+    routing = parse_json_object(raw)
+    classification = str(routing.get("category", "") if routing else raw).lower()
 
     if "design_building" in classification:
         state.request_type = "design_building"
@@ -88,11 +180,28 @@ Classification:"""
     else:
         state.request_type = "unknown"
 
+    # The search gate was answered in the same call → determine_search_need is skipped
+    if state.request_type == "general_question" and routing and "needs_search" in routing:
+        apply_search_decision(state, routing)
+
+    settle(
+        speculations,
+        general_question_branch(state) if state.request_type == "general_question" else state.request_type,
+        state,
+    )
+
+    metrics.incr("classify.llm")
+    if local_guess is not None:
+        metrics.incr("classify.local_agreed" if local_guess == state.request_type else "classify.local_disagreed")
+        from nodes.intent_classifier import intent_classifier
+        intent_classifier.record(user_input, state.request_type)
+
     print(f"  ⇒ classified as: {state.request_type}")
     print()
-    state.history.append({
+    record(state, {
         "node": "classify_input",
         "request_type": state.request_type,
+        "needs_search": state.needs_search,
         "user_input": user_input,
     })
     return state
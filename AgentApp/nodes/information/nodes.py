@@ -1,28 +1,18 @@
 from models.state import BoxState
 from utils.llm_utils import llm
-from config.design_rules import DESIGN_GUIDE
+from tools.building.rules import design_rules
+from utils.history import record
 
 def show_guide_fn(state: BoxState) -> BoxState:
     """Return the design guidelines in a readable format."""
     guide_text = "# Building Design Guidelines\n\n"
-    
-    for rule in DESIGN_GUIDE:
-        rule_text = rule["rule"]
-        if "min" in rule and "max" in rule:
-            guide_text += f"- {rule_text} (Min: {rule['min']}, Max: {rule['max']})\n"
-        elif "min" in rule:
-            guide_text += f"- {rule_text} (Min: {rule['min']})\n"
-        elif "max" in rule:
-            guide_text += f"- {rule_text} (Max: {rule['max']})\n"
-        elif "condition" in rule:
-            guide_text += f"- {rule_text} (When: {rule['condition']})\n"
-        else:
-            guide_text += f"- {rule_text}\n"
+    for line in design_rules.describe():
+        guide_text += f"- {line}\n"
     
     state.answer = guide_text
     state.done = True
     
-    state.history.append({
+    record(state, {
         "node": "show_guide",
         "answer": guide_text
     })
@@ -46,7 +36,7 @@ Please try rephrasing your request.
 """
     state.done = True
     
-    state.history.append({
+    record(state, {
         "node": "handle_unknown",
         "answer": state.answer
     })
@@ -0,0 +1,268 @@
+"""
+Local intent classifier — answers classify_input without an LLM round trip.
+
+A small softmax-regression model over sparse features:
+
+    w:<word>  b:<word>_<word>      words and bigrams of the request
+    kw:<category>                  keyword hits (config/intent_examples.py)
+    tool                           the request names a loaded GH tool
+    num / unit:area / unit:floors  numbers, areas, floor counts
+    question                       ends with "?" or starts with a wh-word
+
+It is trained on INTENT_EXAMPLES plus every LLM classification logged at
+run time, and predicts in microseconds.  ``predict`` returns the category
+with a softmax confidence; classify_input_fn only asks the LLM when the
+confidence is below INTENT_CONFIDENCE_THRESHOLD, then feeds the LLM's
+answer back with ``record`` so the model keeps learning.
+
+Training never runs on a request: ``refit_async`` retrains on a background
+thread (at startup and whenever the loaded tools change) and swaps the new
+weights in; until the first fit lands, ``predict`` returns a flat
+distribution, so the request goes to the LLM.  The log keeps the last
+INTENT_LOG_MAX_ENTRIES classifications.
+
+Usage
+-----
+    from nodes.intent_classifier import intent_classifier
+    intent_classifier.refit_async()                  # at startup
+    label, confidence = intent_classifier.predict("draw a box 10 by 8")
+    intent_classifier.record("draw a box 10 by 8", "use_tool")
+"""
+import json
+import math
+import os
+import random
+import re
+import tempfile
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.intent_examples import INTENT_EXAMPLES, INTENT_KEYWORDS
+
+try:
+    from app.config import CACHE_DIR, INTENT_LOG_MAX_ENTRIES
+except ImportError:
+    CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+    INTENT_LOG_MAX_ENTRIES = 5000
+
+LABELS = ["design_building", "use_tool", "show_guide", "general_question", "unknown"]
+
+_WORD_RE = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+_AREA_RE = re.compile(r"\d\s*(sqm|m2|m²|sq\s?ft|square\s+(meters|metres|feet))", re.IGNORECASE)
+_FLOORS_RE = re.compile(r"\d\s*(floors?|storeys?|stories|levels)", re.IGNORECASE)
+_WH_WORDS = {"what", "why", "how", "who", "when", "where", "which", "is", "are", "does", "do", "can"}
+_KEYWORD_RES = {
+    label: re.compile(r"\b(?:" + "|".join(map(re.escape, words)) + r")\b")
+    for label, words in INTENT_KEYWORDS.items()
+}
+
+
+def _tokens(text: str) -> List[str]:
+    return ["<n>" if t[0].isdigit() else t for t in _WORD_RE.findall(text.lower())]
+
+
+def featurize(text: str, tool_names: Iterable[str] = ()) -> Dict[str, float]:
+    """Sparse feature vector for *text*."""
+    lower = text.lower()
+    words = _tokens(text)
+    feats: Dict[str, float] = {"bias": 1.0}
+    for w in words:
+        feats[f"w:{w}"] = 1.0
+    for a, b in zip(words, words[1:]):
+        feats[f"b:{a}_{b}"] = 1.0
+    for label, pattern in _KEYWORD_RES.items():
+        hits = len(pattern.findall(lower))
+        if hits:
+            feats[f"kw:{label}"] = float(min(hits, 3))
+    for name in tool_names:
+        if name.lower() in lower or name.lower().replace("_", " ") in lower:
+            feats["tool"] = 1.0
+            break
+    if "<n>" in words:
+        feats["num"] = 1.0
+    if _AREA_RE.search(text):
+        feats["unit:area"] = 1.0
+    if _FLOORS_RE.search(text):
+        feats["unit:floors"] = 1.0
+    if lower.rstrip().endswith("?") or (words and words[0] in _WH_WORDS):
+        feats["question"] = 1.0
+    return feats
+
+
+class IntentClassifier:
+    """Softmax regression trained with SGD; thread-safe, persisted via a JSONL log."""
+
+    def __init__(
+        self,
+        log_path: Optional[str] = None,
+        examples: Sequence[Tuple[str, str]] = INTENT_EXAMPLES,
+        epochs: int = 30,
+        lr: float = 0.3,
+        l2: float = 1e-4,
+        max_logged: int = INTENT_LOG_MAX_ENTRIES,
+    ) -> None:
+        self.log_path = log_path
+        self.max_logged = max_logged
+        self.examples = list(examples)
+        self.epochs = epochs
+        self.lr = lr
+        self.l2 = l2
+        self.tool_names: List[str] = []
+        self._weights: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._trained = False
+        self._fitting: Optional[threading.Thread] = None
+        self._stale = False                     # tools changed during a fit
+        self._pending: List[Tuple[str, str]] = []   # recorded during a fit
+        self._log_lines: Optional[int] = None
+
+    # ── data ──────────────────────────────────────────────────────────────────
+    def logged_examples(self) -> List[Tuple[str, str]]:
+        """The last ``max_logged`` logged classifications."""
+        if not self.log_path:
+            return []
+        out: "deque[Tuple[str, str]]" = deque(maxlen=self.max_logged)
+        try:
+            with open(self.log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        continue
+                    if item.get("label") in LABELS and item.get("text"):
+                        out.append((item["text"], item["label"]))
+        except OSError:
+            pass
+        return list(out)
+
+    def _append_log(self, text: str, label: str) -> None:
+        """Append one classification; rewrite the log once it is twice the cap."""
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"text": text, "label": label}) + "\n")
+        if self._log_lines is None:
+            with open(self.log_path, "rb") as f:
+                self._log_lines = sum(1 for _ in f)
+        else:
+            self._log_lines += 1
+        if self._log_lines <= 2 * self.max_logged:
+            return
+        kept = self.logged_examples()
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.log_path), prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for t, y in kept:
+                f.write(json.dumps({"text": t, "label": y}) + "\n")
+        os.replace(tmp, self.log_path)
+        self._log_lines = len(kept)
+
+    # ── model ─────────────────────────────────────────────────────────────────
+    def _scores(self, feats: Dict[str, float], weights=None) -> Dict[str, float]:
+        weights = self._weights if weights is None else weights
+        scores = dict.fromkeys(LABELS, 0.0)
+        for f, v in feats.items():
+            for label, w in weights.get(f, {}).items():
+                scores[label] += w * v
+        return scores
+
+    @staticmethod
+    def _softmax(scores: Dict[str, float]) -> Dict[str, float]:
+        top = max(scores.values())
+        exp = {k: math.exp(v - top) for k, v in scores.items()}
+        total = sum(exp.values())
+        return {k: v / total for k, v in exp.items()}
+
+    def _update(self, feats: Dict[str, float], label: str, lr: float, weights=None) -> None:
+        weights = self._weights if weights is None else weights
+        probs = self._softmax(self._scores(feats, weights))
+        for f, v in feats.items():
+            row = weights.setdefault(f, {})
+            for k in LABELS:
+                grad = (probs[k] - (1.0 if k == label else 0.0)) * v
+                w = row.get(k, 0.0)
+                row[k] = w - lr * (grad + self.l2 * w)
+
+    def fit(self, data: Optional[Sequence[Tuple[str, str]]] = None) -> "IntentClassifier":
+        """(Re)train on *data* (default: built-in examples + logged classifications).
+
+        Trains on a private copy; predictions keep using the old weights until
+        the new ones are swapped in.
+        """
+        if data is None:
+            data = self.examples + self.logged_examples()
+        tool_names = list(self.tool_names)
+        featurized = [(featurize(t, tool_names), y) for t, y in data if y in LABELS]
+        rng = random.Random(0)
+        weights: Dict[str, Dict[str, float]] = {}
+        for epoch in range(self.epochs):
+            rng.shuffle(featurized)
+            lr = self.lr / (1 + epoch * 0.2)
+            for feats, y in featurized:
+                self._update(feats, y, lr, weights)
+        with self._lock:
+            # classifications recorded while training are not in *data* yet
+            for text, label in self._pending:
+                self._update(featurize(text, tool_names), label, self.lr / 2, weights)
+            self._pending = []
+            self._weights = weights
+            self._trained = True
+        return self
+
+    def refit_async(self) -> None:
+        """Retrain on a background thread (once more if asked again mid-fit)."""
+        with self._lock:
+            if self._fitting is not None:
+                self._stale = True
+                return
+            self._fitting = threading.Thread(target=self._fit_loop, name="intent-fit", daemon=True)
+            self._fitting.start()
+
+    def _fit_loop(self) -> None:
+        while True:
+            try:
+                self.fit()
+            except Exception as exc:
+                print(f"  [intent] retraining failed: {exc}")
+            with self._lock:
+                if not self._stale:
+                    self._fitting = None
+                    return
+                self._stale = False
+
+    def set_tool_names(self, names: Iterable[str]) -> None:
+        names = sorted(names)
+        if names != self.tool_names:
+            self.tool_names = names
+            self.refit_async()
+
+    def probabilities(self, text: str) -> Dict[str, float]:
+        if not self._trained:
+            self.refit_async()
+            return dict.fromkeys(LABELS, 1.0 / len(LABELS))
+        with self._lock:
+            return self._softmax(self._scores(featurize(text, self.tool_names)))
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Return ``(category, confidence)``."""
+        probs = self.probabilities(text)
+        label = max(probs, key=probs.get)
+        return label, probs[label]
+
+    def record(self, text: str, label: str) -> None:
+        """Log an authoritative (LLM) classification and learn from it online."""
+        if label not in LABELS or not text:
+            return
+        if self.log_path:
+            try:
+                with self._lock:
+                    self._append_log(text, label)
+            except OSError:
+                pass  # logging is best-effort
+        with self._lock:
+            if self._fitting is not None:
+                self._pending.append((text, label))
+            if self._trained:
+                self._update(featurize(text, self.tool_names), label, self.lr / 2)
+
+
+intent_classifier = IntentClassifier(os.path.join(CACHE_DIR, "intent_log.jsonl"))
@@ -0,0 +1,103 @@
+"""
+Loop guards for the graph's cycles (design ReAct loop, plan step loop).
+
+Without a guard a loop only ends at LangGraph's ``recursion_limit``, which
+raises.  Each guarded loop records one signature per iteration in
+``state.loops[<loop>]`` and stops when
+
+  - the signature equals the previous one        → "no progress"
+  - it repeats an earlier one                    → "oscillation"
+  - the iteration budget is used up              → "budget"
+
+Loops that pass a ``score`` (lower is better) also keep their best
+candidate, so the caller can return it with its remaining issues instead
+of the last (possibly worse) one.  Metrics: ``loop.<loop>.<reason>``.
+
+Usage
+-----
+    start_loop(state, "design")                     # on entering the loop
+    reason = guard_loop(state, "design", [box, issue_ids], budget=8,
+                        score=(len(issues), shortfall), candidate={...})
+    if reason: … restore best_candidate(state, "design") and exit …
+"""
+import hashlib
+import json
+import textwrap
+from typing import Any, Dict, List, Optional, Sequence
+
+from models.state import BoxState
+from utils import metrics
+
+SIGNATURE_WINDOW = 16
+
+
+def _think(label: str, text: str):
+    prefix = f"  ┊ {label}: "
+    body = str(text).strip().replace("\n", " ")
+    for i, line in enumerate(textwrap.wrap(body, width=68)):
+        print((prefix if i == 0 else " " * len(prefix)) + line)
+
+
+def loop_signature(parts: Any) -> str:
+    """Stable short hash of *parts* (floats rounded to 6 decimals)."""
+    def _round(value: Any) -> Any:
+        if isinstance(value, float):
+            return round(value, 6)
+        if isinstance(value, dict):
+            return {str(k): _round(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [_round(v) for v in value]
+        return value
+    data = json.dumps(_round(parts), sort_keys=True, default=str)
+    return hashlib.sha1(data.encode()).hexdigest()[:16]
+
+
+def start_loop(state: BoxState, loop: str) -> None:
+    """Reset the guard for *loop* (a new run of it begins)."""
+    state.loops[loop] = {"iterations": 0, "signatures": [], "best": None, "stopped": None}
+
+
+def guard_loop(
+    state: BoxState,
+    loop: str,
+    signature_parts: Any,
+    budget: int,
+    score: Optional[Sequence[float]] = None,
+    candidate: Optional[Dict[str, Any]] = None,
+) -> Optional[str]:
+    """Record one iteration of *loop*; return why it must stop, or None."""
+    info = state.loops.get(loop) or {"iterations": 0, "signatures": [], "best": None, "stopped": None}
+    info["iterations"] += 1
+    signature = loop_signature(signature_parts)
+
+    if score is not None:
+        best = info.get("best")
+        if best is None or list(score) < best["score"]:
+            info["best"] = {"score": list(score), "iteration": info["iterations"], "candidate": candidate}
+
+    signatures: List[str] = info["signatures"]
+    reason = None
+    if signatures and signatures[-1] == signature:
+        reason = "no progress"
+    elif signature in signatures:
+        reason = "oscillation"
+    elif info["iterations"] >= budget:
+        reason = "budget"
+    info["signatures"] = (signatures + [signature])[-SIGNATURE_WINDOW:]
+
+    if reason:
+        info["stopped"] = reason
+        metrics.incr(f"loop.{loop}.{reason.replace(' ', '_')}")
+        _think(f"{loop} loop stopped", f"{reason} after {info['iterations']} iteration(s)")
+    state.loops[loop] = info
+    return reason
+
+
+def loop_stopped(state: BoxState, loop: str) -> Optional[str]:
+    """The reason *loop* was stopped, or None while it may continue."""
+    return (state.loops.get(loop) or {}).get("stopped")
+
+
+def best_candidate(state: BoxState, loop: str) -> Optional[Dict[str, Any]]:
+    best = (state.loops.get(loop) or {}).get("best")
+    return best["candidate"] if best else None
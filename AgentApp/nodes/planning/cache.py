@@ -0,0 +1,271 @@
+"""Plan cache — reuse plan structures for requests that differ only in numbers.
+
+"Draw a podium 30 m wide and a tower of height 40" and "… 25 m wide … 60"
+normalise to the same key (numbers + units → ``<n>`` slots, plus the tool
+registry version), so the second request skips the planner LLM call:
+the stored template is copied and its slots are filled with the new values.
+
+Templates only keep an argument value when it maps unambiguously to one
+number of the original request.  A step whose args contain anything else
+(derived values, constants, numbers inside strings) has its args dropped, so
+plan_step_fn asks the LLM for them instead of replaying stale values.
+
+Numbers that shape the plan are not slots: a count before a plural noun
+("3 boxes") stays in the key, and a slot equal to the plan's step count
+(or to one tool's) must match for the template to be reused.
+
+Entries are keyed by tool registry version; the first lookup after the tools
+change evicts every entry built for the old registry.
+"""
+import copy
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import metrics
+
+try:
+    from app.config import CACHE_DIR, PLAN_CACHE_MAX_ENTRIES
+except ImportError:
+    CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)))), ".cache")
+    PLAN_CACHE_MAX_ENTRIES = 200
+
+# metres per unit — values with a length unit are stored in metres
+_LENGTH_UNITS = {
+    "mm": 0.001, "cm": 0.01, "m": 1.0, "meter": 1.0, "meters": 1.0,
+    "metre": 1.0, "metres": 1.0, "ft": 0.3048, "feet": 0.3048, "foot": 0.3048,
+    "in": 0.0254, "inch": 0.0254, "inches": 0.0254,
+}
+_OTHER_UNITS = r"sqm|m2|m²|sq\s?ft|ft2|ft²|%|°|deg|degrees|floors?|storeys?|stories"
+_NUM_RE = re.compile(
+    r"(?<![\w.])(-?\d+(?:\.\d+)?)\s*("
+    + "|".join(sorted(map(re.escape, _LENGTH_UNITS), key=len, reverse=True))
+    + r"|" + _OTHER_UNITS + r")?(?![\w²])",
+    re.IGNORECASE,
+)
+_SLOT = "$slot"
+
+
+# An integer right before a plural noun ("3 boxes", "5 columns") is a count:
+# it decides how many steps the plan has, so it stays in the key
+_COUNT_RE = re.compile(r"\s+[a-z]{2,}s\b")
+
+
+def extract_slots(text: str) -> Tuple[str, List[float]]:
+    """Return ``(normalised_text, slot_values)`` for a user request.
+
+    Counts are kept literally, so "draw 3 boxes" and "draw 5 boxes" differ.
+    """
+    values: List[float] = []
+
+    def _sub(m: "re.Match") -> str:
+        value = float(m.group(1))
+        unit = (m.group(2) or "").lower()
+        if not unit and value.is_integer() and _COUNT_RE.match(m.string, m.end()):
+            return m.group(0)
+        values.append(value * _LENGTH_UNITS.get(unit, 1.0))
+        return "<n>"
+
+    normalised = _NUM_RE.sub(_sub, text.lower())
+    normalised = re.sub(r"[^\w<>]+", " ", normalised).strip()
+    return normalised, values
+
+
+def structural_slots(plan: List[Dict[str, Any]], slots: List[float]) -> Dict[str, float]:
+    """Slots whose value equals the plan's step count (or one tool's).
+
+    Such a number probably set the plan's shape ("a row of 4", "repeat 3
+    times"), so the template is only reused when it is the same.
+    """
+    counts = {len(plan)}
+    per_tool: Dict[str, int] = {}
+    for step in plan:
+        per_tool[step.get("tool", "")] = per_tool.get(step.get("tool", ""), 0) + 1
+    counts.update(per_tool.values())
+    return {
+        str(i): v for i, v in enumerate(slots)
+        if float(v).is_integer() and int(v) > 1 and int(v) in counts
+    }
+
+
+def _number(value: float) -> Any:
+    return int(value) if float(value).is_integer() else value
+
+
+def _slot_index(value: Any, slots: List[float]) -> Optional[int]:
+    """Index of the single slot equal to *value* (None if none or ambiguous)."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    hits = [i for i, s in enumerate(slots) if abs(s - float(value)) < 1e-9]
+    return hits[0] if len(hits) == 1 else None
+
+
+def _template_intent(intent: str, slots: List[float]) -> str:
+    """Turn request numbers in an intent sentence into ``{i}`` format fields."""
+    def _sub(m: "re.Match") -> str:
+        unit = (m.group(2) or "").lower()
+        if unit and _LENGTH_UNITS.get(unit) != 1.0:
+            return m.group(0)
+        idx = _slot_index(float(m.group(1)), slots)
+        if idx is None:
+            return m.group(0)
+        return "{%d}" % idx + m.group(0)[len(m.group(1)):]
+
+    return _NUM_RE.sub(_sub, intent.replace("{", "{{").replace("}", "}}"))
+
+
+def build_template(plan: List[Dict[str, Any]], slots: List[float]) -> List[Dict[str, Any]]:
+    """Replace request numbers in *plan* with slot references."""
+    template = copy.deepcopy(plan)
+    for step in template:
+        args = step.get("args")
+        if isinstance(args, dict):
+            templated = {}
+            for k, v in args.items():
+                idx = _slot_index(v, slots)
+                if idx is not None:
+                    templated[k] = {_SLOT: idx}
+                elif isinstance(v, (int, float)) or (
+                    isinstance(v, str) and _NUM_RE.search(v)
+                ):
+                    templated = None      # not traceable to the request → let the LLM redo it
+                    break
+                else:
+                    templated[k] = v
+            step["args"] = templated
+        step["intent"] = _template_intent(step.get("intent", ""), slots)
+    return template
+
+
+def fill_template(template: List[Dict[str, Any]], slots: List[float]) -> List[Dict[str, Any]]:
+    """Instantiate a stored template with this request's slot values."""
+    plan = copy.deepcopy(template)
+    values = [_number(v) for v in slots]
+    for step in plan:
+        args = step.get("args")
+        if isinstance(args, dict):
+            step["args"] = {
+                k: values[v[_SLOT]] if isinstance(v, dict) and _SLOT in v else v
+                for k, v in args.items()
+            }
+        try:
+            step["intent"] = step.get("intent", "").format(*values)
+        except (IndexError, KeyError, ValueError):
+            pass
+    return plan
+
+
+class PlanCache:
+    """Size-bounded LRU of plan templates, persisted as JSON."""
+
+    def __init__(self, path: str, max_entries: int = PLAN_CACHE_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._version: Optional[str] = None     # registry version already evicted for
+        self._load()
+
+    # ── persistence ───────────────────────────────────────────────────────────
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._entries = OrderedDict(json.load(f))
+        except (OSError, ValueError):
+            self._entries = OrderedDict()
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # cache is best-effort
+
+    # ── API ───────────────────────────────────────────────────────────────────
+    def evict_stale(self, version: str) -> int:
+        """Drop entries built for another tool registry version."""
+        with self._lock:
+            if version == self._version:
+                return 0
+            self._version = version
+            stale = [k for k, e in self._entries.items() if e.get("version") != version]
+            for k in stale:
+                del self._entries[k]
+            if stale:
+                self._save()
+        if stale:
+            metrics.incr("plan_cache.evicted", len(stale))
+        return len(stale)
+
+    def lookup(self, user_input: str, version: str) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        """Return ``(plan, planner_seconds_saved)`` on a hit, else None.
+
+        Hit counts and LRU order are updated in memory only; they reach the
+        file with the next write (store / eviction).
+        """
+        self.evict_stale(version)
+        normalised, slots = extract_slots(user_input)
+        key = f"{version}:{normalised}"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and any(
+                int(i) >= len(slots) or slots[int(i)] != v
+                for i, v in entry.get("structural", {}).items()
+            ):
+                metrics.incr("plan_cache.count_mismatch")
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry["hits"] = entry.get("hits", 0) + 1
+                entry["last_used"] = time.time()
+        if entry is None:
+            metrics.incr("plan_cache.miss")
+            return None
+        saved = float(entry.get("planner_seconds", 0.0))
+        metrics.incr("plan_cache.hit")
+        metrics.incr("plan_cache.saved_seconds", saved)
+        return fill_template(entry["template"], slots), saved
+
+    def store(
+        self, user_input: str, version: str, plan: List[Dict[str, Any]], planner_seconds: float
+    ) -> None:
+        normalised, slots = extract_slots(user_input)
+        key = f"{version}:{normalised}"
+        with self._lock:
+            self._entries[key] = {
+                "version": version,
+                "template": build_template(plan, slots),
+                "structural": structural_slots(plan, slots),
+                "planner_seconds": planner_seconds,
+                "hits": 0,
+                "created": time.time(),
+                "last_used": time.time(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+        metrics.incr("plan_cache.stored")
+
+    def stats(self) -> Dict[str, Any]:
+        counters = metrics.snapshot()["counters"]
+        hits = counters.get("plan_cache.hit", 0)
+        misses = counters.get("plan_cache.miss", 0)
+        return {
+            "entries": len(self._entries),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "saved_seconds": counters.get("plan_cache.saved_seconds", 0.0),
+        }
+
+
+plan_cache = PlanCache(os.path.join(CACHE_DIR, "plan_cache.json"))
@@ -3,13 +3,26 @@
 Flow
 ────
 planner_fn       Ask the LLM to break the user's request into an ordered list
-                 of tool calls (JSON). No concrete args yet.
-
-plan_step_fn     Execute the current step: give the LLM the step intent +
-                 all previous results → it makes a tool call → store result →
-                 advance the counter.  Looped by plan_step_router.
-
-plan_step_router Return "continue" when more steps remain, "done" otherwise.
+                 of tool calls (JSON) with explicit ``depends_on`` output keys
+                 and, when PLAN_CONCRETE_ARGS is on, concrete ``args`` for steps
+                 whose values are already in the request.
+
+validate_plan    (validation.py) Repair tool-name typos, missing fields,
+                 duplicate keys and bad dependencies locally; only plans with
+                 unknown tools or cycles get one targeted LLM repair prompt.
+
+plan_step_fn     Execute the next wave: every step whose dependencies are done
+                 (up to PLAN_MAX_PARALLEL) runs concurrently — except that
+                 steps sent to a GH server that gets a document-changing step
+                 run one after another in plan order (draw → bake → capture),
+                 as for tool calls (nodes/tool_use).  Steps with valid
+                 concrete args call their tool directly; the rest ask the LLM
+                 (step intent + dependencies' results) for a tool call.
+                 Results are stored in plan order.  Looped by plan_step_router.
+
+plan_step_router Return "continue" when more steps remain, "done" otherwise
+                 (or when the loop guard stopped the plan: no progress, or
+                 more than PLAN_MAX_WAVES waves).
 
 plan_summary_fn  Synthesise all step results into a final natural-language
                  answer for the user.
@@ -17,15 +30,33 @@ plan_summary_fn  Synthesise all step results into a final natural-language
 import json
 import re
 import textwrap
-from typing import Any, Dict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from config.prompts import build_csharp_system_prompt
 from models.state import BoxState
+from nodes.loop_guard import guard_loop, loop_stopped, start_loop
+from nodes.planning.validation import validate_plan
+from tools.base import validate_tool_args
+from utils import metrics
+from utils.artifacts import resolve, stash
+from utils.history import record
 from utils.llm_utils import chat_llm, fast_llm
 
+try:
+    from app.config import PLAN_CACHE, PLAN_CONCRETE_ARGS, PLAN_MAX_PARALLEL, PLAN_MAX_WAVES
+except ImportError:
+    PLAN_MAX_PARALLEL = 4
+    PLAN_CONCRETE_ARGS = True
+    PLAN_CACHE = True
+    PLAN_MAX_WAVES = 30
+
 _HR = "─" * 72
+# Characters of each dependency's result passed to a step's LLM prompt
+DEPENDENCY_CONTEXT_CHARS = 8000
 
 
 def _think(label: str, text: str):
@@ -35,13 +66,43 @@ def _think(label: str, text: str):
         print((prefix if i == 0 else " " * len(prefix)) + line)
 
 
+def _signature(tool) -> str:
+    """``name: type, …`` summary of a tool's arguments for the planner prompt."""
+    return ", ".join(
+        f"{name}: {meta.get('type', 'any')}" for name, meta in (tool.args or {}).items()
+        if name != "no_params"
+    )
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 1.  Planner — produce the step list
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _start_plan(state: BoxState, plan: List[Dict[str, Any]], source: str, planner_seconds: float) -> BoxState:
+    """Install *plan* in the state and print it."""
+    state.plan = plan
+    state.plan_step = 0
+    state.plan_results = {}
+    start_loop(state, "plan")
+    state.plan_metrics = {
+        "wall_seconds": 0.0, "sequential_seconds": 0.0, "waves": 0,
+        "source": source, "planner_seconds": planner_seconds,
+    }
+
+    print(f"  ┊ {len(plan)}-step plan ({source}):")
+    for s in plan:
+        deps = s.get("depends_on")
+        after = f"  (after {', '.join(deps)})" if deps else ""
+        print(f"  ┊   [{s.get('step','?')}] {s.get('tool','?')}  —  {s.get('intent','')}{after}")
+
+    record(state, {"node": "planner", "plan": plan, "source": source})
+    return state
+
+
 def planner_fn(state: BoxState) -> BoxState:
     """Decompose the user's multi-step request into an ordered tool-call plan."""
-    from tools import TOOL_CLASSES
+    from tools import TOOL_CLASSES, tool_registry_version
+    from nodes.planning.cache import plan_cache
 
     user_input: str = state.request.get("user_input", "")
 
@@ -53,9 +114,23 @@ def planner_fn(state: BoxState) -> BoxState:
         state.done = True
         return state
 
-    tool_descriptions = "\n".join(
-        f"- {t.name}: {t.description}" for t in TOOL_CLASSES
-    )
+    if PLAN_CONCRETE_ARGS:
+        tool_descriptions = "\n".join(
+            f"- {t.name}({_signature(t)}): {t.description}" for t in TOOL_CLASSES
+        )
+        args_field = (
+            '\n  "args"       : object with concrete values for every argument of the tool\n'
+            "                 when they are all known from the user's request; null when\n"
+            "                 the step needs results of earlier steps or values you would\n"
+            "                 have to guess"
+        )
+        example_args = (', "args": {"width": 20, "depth": 12, "height": 6}', ', "args": null')
+    else:
+        tool_descriptions = "\n".join(
+            f"- {t.name}: {t.description}" for t in TOOL_CLASSES
+        )
+        args_field = ""
+        example_args = ("", "")
 
     prompt = f"""You are a planning assistant for a Grasshopper 3D-modelling agent.
 The user wants to perform a multi-step design task.
@@ -71,11 +146,16 @@ Respond with ONLY a valid JSON array — no markdown, no extra text. Each item:
   "tool"       : exact tool name from the list above
   "intent"     : one sentence describing what this step accomplishes
   "output_key" : short camelCase key to reference this result in later steps
+  "depends_on" : list of output_keys of EARLIER steps whose results this step
+                 needs ([] if it only needs values from the user's request){args_field}
+
+Steps that do not depend on each other are run in parallel, so only list a
+dependency when the step really uses that result.
 
 Example:
 [
-  {{"step": 1, "tool": "draw_box", "intent": "Draw the rectangular building base", "output_key": "base"}},
-  {{"step": 2, "tool": "draw_cylinder", "intent": "Add a cylindrical tower on top of the base", "output_key": "tower"}}
+  {{"step": 1, "tool": "draw_box", "intent": "Draw the rectangular building base", "output_key": "base", "depends_on": []{example_args[0]}}},
+  {{"step": 2, "tool": "draw_cylinder", "intent": "Add a cylindrical tower on top of the base", "output_key": "tower", "depends_on": ["base"]{example_args[1]}}}
 ]
 
 Plan:"""
@@ -85,6 +165,17 @@ Plan:"""
     print(_HR)
     _think("request", user_input)
 
+    version = tool_registry_version(TOOL_CLASSES)
+    if PLAN_CACHE:
+        cached = plan_cache.lookup(user_input, version)
+        if cached is not None:
+            plan, saved = cached
+            stats = plan_cache.stats()
+            print(f"  ┊ plan cache hit — skipped planner LLM (~{saved:.2f}s saved, "
+                  f"hit rate {stats['hit_rate']:.0%})")
+            return _start_plan(state, plan, "cache", 0.0)
+
+    t0 = time.perf_counter()
     try:
         raw = fast_llm(prompt)
     except Exception as exc:
@@ -93,8 +184,35 @@ Plan:"""
         return state
 
     raw_str = str(raw).strip()
+    plan = _parse_plan(raw_str)
+    if not plan:
+        state.answer = f"Could not parse a plan from the LLM output:\n{raw_str}"
+        state.done = True
+        return state
+
+    # ── Local validation; only irreparable plans go back to the LLM ──────────
+    plan, repairs, errors = validate_plan(plan, TOOL_CLASSES)
+    for r in repairs:
+        _think("plan repair", r)
+    metrics.incr("plan.validate.local_repairs", len(repairs))
+    if errors:
+        for e in errors:
+            _think("plan error", e)
+        metrics.incr("plan.validate.llm_replans")
+        plan, errors = _repair_plan_with_llm(raw_str, errors, TOOL_CLASSES, user_input)
+        if errors:
+            state.answer = "The planner produced an invalid plan:\n" + "\n".join(f"- {e}" for e in errors)
+            state.done = True
+            record(state, {"node": "planner", "errors": errors})
+            return state
+
+    return _start_plan(state, plan, "llm", time.perf_counter() - t0)
+
+
+def _parse_plan(raw_str: str) -> Any:
+    """Extract the JSON plan array from raw LLM output (None if impossible)."""
     # Strip markdown code fences if present
-    raw_str = re.sub(r"^```(?:json)?\s*", "", raw_str)
+    raw_str = re.sub(r"^```(?:json)?\s*", "", raw_str.strip())
     raw_str = re.sub(r"\s*```$", "", raw_str)
 
     plan = None
@@ -102,58 +220,173 @@ Plan:"""
         plan = json.loads(raw_str)
         assert isinstance(plan, list) and len(plan) > 0
     except Exception:
-        m = re.search(r"\[.*?\]", raw_str, re.DOTALL)
+        plan = None
+        m = re.search(r"\[.*\]", raw_str, re.DOTALL)
         if m:
             try:
                 plan = json.loads(m.group())
             except Exception:
                 pass
+    return plan
 
-    if not plan:
-        state.answer = f"Could not parse a plan from the LLM output:\n{raw_str}"
-        state.done = True
-        return state
 
-    state.plan = plan
-    state.plan_step = 0
-    state.plan_results = {}
+def _repair_plan_with_llm(
+    raw_plan: str, errors: List[str], tools: List[Any], user_input: str
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """One targeted LLM pass over an irreparable plan. Returns (plan, errors)."""
+    tool_names = ", ".join(t.name for t in tools)
+    prompt = f"""The following Grasshopper tool plan is invalid.
 
-    print(f"  ┊ {len(plan)}-step plan:")
-    for s in plan:
-        print(f"  ┊   [{s.get('step','?')}] {s.get('tool','?')}  —  {s.get('intent','')}")
+User request: "{user_input}"
 
-    state.history.append({"node": "planner", "plan": plan})
-    return state
+Plan:
+{raw_plan}
+
+Problems:
+{chr(10).join(f"- {e}" for e in errors)}
+
+Valid tool names: {tool_names}
+
+Fix ONLY these problems and keep everything else unchanged.
+Respond with ONLY the corrected JSON array — no markdown, no extra text."""
+    print(f"  ┊ asking LLM to repair the plan...")
+    try:
+        plan = _parse_plan(str(fast_llm(prompt)))
+    except Exception as exc:
+        return [], [f"repair LLM error: {exc}"]
+    plan, repairs, errors = validate_plan(plan, tools)
+    for r in repairs:
+        _think("plan repair", r)
+    metrics.incr("plan.validate.local_repairs", len(repairs))
+    return plan, errors
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 2.  Step executor — looped once per plan step
+# 2.  Step executor — looped once per wave of independent steps
 # ─────────────────────────────────────────────────────────────────────────────
 
-def plan_step_fn(state: BoxState) -> BoxState:
-    """Execute the current plan step via LLM tool-calling, then advance the counter."""
-    from tools import TOOL_CLASSES
+def step_key(step: Dict[str, Any], idx: int) -> str:
+    """The plan_results key a step writes to."""
+    return step.get("output_key") or f"step_{step.get('step', idx + 1)}"
 
-    plan = state.plan or []
-    idx = state.plan_step
 
-    # Safety guard (should not happen)
-    if idx >= len(plan):
-        return state
+def step_dependencies(plan: List[Dict[str, Any]], idx: int) -> List[str]:
+    """Output keys step *idx* waits for.
+
+    Steps without ``depends_on`` (older plans, or the planner left it out)
+    wait for every earlier step, which keeps them strictly sequential.
+    """
+    deps = plan[idx].get("depends_on")
+    if deps is None:
+        return [step_key(s, i) for i, s in enumerate(plan[:idx])]
+    if isinstance(deps, str):
+        deps = [deps]
+    known = {step_key(s, i) for i, s in enumerate(plan)}
+    return [d for d in deps if d in known]
+
 
+def ready_steps(plan: List[Dict[str, Any]], done: Dict[str, Any]) -> List[int]:
+    """Indices (in plan order) of pending steps whose dependencies are all done."""
+    return [
+        i for i, s in enumerate(plan)
+        if step_key(s, i) not in done
+        and all(d in done for d in step_dependencies(plan, i))
+    ]
+
+
+_PLACEHOLDER_RE = re.compile(r"PASTE-|PLACEHOLDER|\bTODO\b", re.IGNORECASE)
+
+
+def _references_result(value: str, keys: set) -> bool:
+    """True if *value* is (or contains) a reference like {base}, <base>, $base."""
+    if _PLACEHOLDER_RE.search(value):
+        return True
+    return any(
+        re.search(rf"\{{\s*{re.escape(k)}\b[^}}]*\}}|<{re.escape(k)}>|\${re.escape(k)}\b", value)
+        for k in keys
+    )
+
+
+def concrete_step_args(
+    plan: List[Dict[str, Any]], idx: int, tools: List[Any]
+) -> Tuple[Any, Dict[str, Any], str]:
+    """Decide whether step *idx* can call its tool without an LLM round trip.
+
+    Returns ``(tool, clean_args, "")`` when the step carries concrete ``args``
+    that validate against the tool's ``args_schema`` and reference no earlier
+    result; otherwise ``(None, {}, reason)``.  Dependencies alone do not rule
+    the args out — a step can wait for an earlier one without using its result.
+    """
+    step = plan[idx]
+    args = step.get("args")
+    if not PLAN_CONCRETE_ARGS or args is None:
+        return None, {}, "no concrete args"
+    other_keys = {step_key(s, i) for i, s in enumerate(plan) if i != idx}
+    for value in (args.values() if isinstance(args, dict) else []):
+        if isinstance(value, str) and _references_result(value, other_keys):
+            return None, {}, f"placeholder argument {value!r}"
+    matching = [t for t in tools if t.name == step.get("tool")]
+    if not matching:
+        return None, {}, f"unknown tool '{step.get('tool')}'"
+    clean, error = validate_tool_args(matching[0], args)
+    if error:
+        return None, {}, error
+    return matching[0], clean, ""
+
+
+def _dependency_text(value: Any) -> str:
+    """An earlier step's full result (artifact stubs resolved), capped in size.
+
+    The prompt gets the data itself, not the artifact preview.
+    """
+    from tools.mcp.loader import find_guids
+    text = resolve(str(value))
+    if len(text) <= DEPENDENCY_CONTEXT_CHARS:
+        return text
+    # Object ids past the cut are still listed — later steps usually need them
+    omitted = list(dict.fromkeys(find_guids(text[DEPENDENCY_CONTEXT_CHARS:])))
+    note = f"… [truncated, {len(text)} chars in total"
+    if omitted:
+        note += f"; further object ids: {', '.join(omitted)}"
+    return f"{text[:DEPENDENCY_CONTEXT_CHARS]}{note}]"
+
+
+def _execute_step(
+    plan: List[Dict[str, Any]],
+    idx: int,
+    done: Dict[str, Any],
+    user_input: str,
+    endpoint: Optional[str] = None,
+) -> Tuple[str, float, bool]:
+    """Run one plan step (on *endpoint*, if pinned). Returns (result, seconds, called_llm)."""
+    from tools import TOOL_CLASSES
+    from nodes.tool_use import _handle_image_result, call_tool
+
+    t0 = time.perf_counter()
     step = plan[idx]
     total = len(plan)
     step_num   = step.get("step", idx + 1)
     intent     = step.get("intent", "")
     target_tool = step.get("tool", "")
-    output_key  = step.get("output_key", f"step_{step_num}")
 
     print(f"\n  ── Step {step_num}/{total}: {intent}")
 
-    # ── Context from previous steps ──────────────────────────────────────────
+    # ── Concrete args from the planner → call the tool directly ──────────────
+    tool, tool_args, reason = concrete_step_args(plan, idx, TOOL_CLASSES)
+    if tool is not None:
+        args_str = ", ".join(f"{k}={v}" for k, v in tool_args.items())
+        print(f"  ┊ [{step_num}] calling (planned args): {tool.name}({args_str})")
+        result_str = stash(_handle_image_result(call_tool(tool, tool_args, endpoint), user_input))
+        _think(f"[{step_num}] {tool.name} result", result_str)
+        return result_str, time.perf_counter() - t0, False
+    if step.get("args") is not None:
+        _think(f"[{step_num}] planned args not used", reason)
+
+    # ── Context from the steps this one depends on ───────────────────────────
     prev_context = ""
-    if state.plan_results:
-        lines = [f"  • {k}: {v}" for k, v in state.plan_results.items()]
+    deps = step_dependencies(plan, idx)
+    if deps:
+        lines = [f"  • {k}: {_dependency_text(done[k])}" for k in deps]
         prev_context = "\nResults from previous steps:\n" + "\n".join(lines)
 
     tool_list = "\n".join(f"- {t.name}: {t.description}" for t in TOOL_CLASSES)
@@ -174,15 +407,15 @@ def plan_step_fn(state: BoxState) -> BoxState:
         else f"{base}\n\nAvailable tools:\n{tool_list}"
     )
     system_msg = SystemMessage(content=prompt_content)
-    user_msg = HumanMessage(content=state.request.get("user_input", ""))
+    user_msg = HumanMessage(content=user_input)
 
     llm_with_tools = chat_llm.bind_tools(TOOL_CLASSES)
-    print(f"  ┊ asking LLM for tool arguments...")
+    print(f"  ┊ [{step_num}] asking LLM for tool arguments...")
     response = llm_with_tools._generate([system_msg, user_msg])
     ai_msg = response.generations[0].message
 
     if ai_msg.content:
-        _think("LLM thought", ai_msg.content)
+        _think(f"[{step_num}] LLM thought", ai_msg.content)
 
     # ── Execute tool call ─────────────────────────────────────────────────────
     if not ai_msg.tool_calls:
@@ -193,39 +426,124 @@ def plan_step_fn(state: BoxState) -> BoxState:
         tool_name = tc["name"]
         tool_args: Dict[str, Any] = tc.get("args", {})
         args_str = ", ".join(f"{k}={v}" for k, v in tool_args.items())
-        print(f"  ┊ calling: {tool_name}({args_str})")
+        print(f"  ┊ [{step_num}] calling: {tool_name}({args_str})")
 
         matching = [t for t in TOOL_CLASSES if t.name == tool_name]
         if not matching:
             result_str = f"Error: tool '{tool_name}' not found."
         else:
-            result_str = matching[0]._run(**tool_args)
-
-        # Vision result: forward image to VLM rather than passing raw base64
-        from nodes.tool_use import _handle_image_result
-        result_str = _handle_image_result(result_str, state.request.get("user_input", ""))
-
-        _think(f"{tool_name} result", result_str)
-
-    # ── Store result and advance ──────────────────────────────────────────────
-    plan_results = dict(state.plan_results or {})
-    plan_results[output_key] = result_str
-    state.plan_results = plan_results
-    state.plan_step = idx + 1
-
-    state.history.append({
-        "node":       "plan_step",
-        "step":       step_num,
-        "tool":       target_tool,
-        "output_key": output_key,
-        "result":     result_str,
-    })
+            result_str = call_tool(matching[0], tool_args, endpoint)
+
+        # Vision result: forward image to VLM rather than passing raw base64;
+        # large outputs are kept as artifact stubs (utils/artifacts.py)
+        result_str = stash(_handle_image_result(result_str, user_input))
+
+        _think(f"[{step_num}] {tool_name} result", result_str)
+
+    return result_str, time.perf_counter() - t0, True
+
+
+def _execute_step_safely(
+    plan: List[Dict[str, Any]], idx: int, done: Dict[str, Any], user_input: str,
+    endpoint: Optional[str] = None,
+) -> Tuple[str, float, bool]:
+    """Like _execute_step, but a crash becomes an "Error: …" result.
+
+    Sibling steps of the same wave are then still stored (and checkpointed),
+    and a resumed plan only re-runs the failed step.
+    """
+    try:
+        return _execute_step(plan, idx, done, user_input, endpoint)
+    except Exception as exc:
+        _think(f"step {plan[idx].get('step', idx + 1)} failed", str(exc))
+        return f"Error: step failed: {exc}", 0.0, True
+
+
+def plan_step_fn(state: BoxState) -> BoxState:
+    """Execute every ready plan step (concurrently, up to PLAN_MAX_PARALLEL).
+
+    Steps that share a GH server ordering key (``schedule_calls``) run in plan
+    order within the wave.
+
+    Results and history entries are written in plan order regardless of
+    which step finishes first, so the outcome does not depend on timing.
+    """
+    plan = state.plan or []
+    done = dict(state.plan_results or {})
+    user_input = state.request.get("user_input", "")
+
+    pending = [i for i, s in enumerate(plan) if step_key(s, i) not in done]
+    # Safety guard (should not happen)
+    if not pending:
+        return state
+
+    wave = ready_steps(plan, done)
+    if not wave:
+        # Dependencies can never be satisfied (cycle / bad keys): fall back to plan order
+        _think("warning", "unresolvable dependencies — running next step in plan order")
+        wave = pending[:1]
+    wave = wave[:max(1, PLAN_MAX_PARALLEL)]
+
+    # Steps acting on the same GH server's document run in plan order
+    from nodes.tool_use import schedule_calls
+    from tools import TOOL_CLASSES
+    scheduled = schedule_calls(
+        [(plan[i].get("tool", ""), plan[i].get("args") or {}) for i in wave], TOOL_CLASSES
+    )
+    groups: Dict[str, List[int]] = {}
+    for pos, (key, _) in enumerate(scheduled):
+        groups.setdefault(key, []).append(pos)
+
+    outcomes: List[Tuple[str, float, bool]] = [("", 0.0, False)] * len(wave)
+
+    def _run_group(positions: List[int]) -> None:
+        for pos in positions:
+            outcomes[pos] = _execute_step_safely(plan, wave[pos], done, user_input, scheduled[pos][1])
+
+    t0 = time.perf_counter()
+    if len(groups) == 1:
+        _run_group(list(groups.values())[0])
+    else:
+        print(f"\n  ┊ running {len(wave)} independent steps in {len(groups)} parallel group(s)")
+        with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            for f in [pool.submit(_run_group, positions) for positions in groups.values()]:
+                f.result()
+    wall = time.perf_counter() - t0
+
+    # ── Store results (plan order) and advance ────────────────────────────────
+    for idx, (result_str, seconds, called_llm) in zip(wave, outcomes):
+        metrics.incr("plan.step.llm" if called_llm else "plan.step.direct")
+        step = plan[idx]
+        done[step_key(step, idx)] = result_str
+        record(state, {
+            "node":       "plan_step",
+            "step":       step.get("step", idx + 1),
+            "tool":       step.get("tool", ""),
+            "output_key": step_key(step, idx),
+            "result":     result_str,
+        })
+
+    state.plan_results = {
+        step_key(s, i): done[step_key(s, i)]
+        for i, s in enumerate(plan) if step_key(s, i) in done
+    }
+    state.plan_step = len(state.plan_results)
+
+    timing = dict(state.plan_metrics or {})
+    timing["wall_seconds"] = timing.get("wall_seconds", 0.0) + wall
+    timing["sequential_seconds"] = timing.get("sequential_seconds", 0.0) + sum(o[1] for o in outcomes)
+    timing["waves"] = timing.get("waves", 0) + 1
+    timing["llm_steps"] = timing.get("llm_steps", 0) + sum(1 for o in outcomes if o[2])
+    state.plan_metrics = timing
+
+    if state.plan_step < len(plan):
+        guard_loop(state, "plan", [state.plan_step, sorted(state.plan_results)], PLAN_MAX_WAVES)
     return state
 
 
 def plan_step_router(state: BoxState) -> str:
     """Continue executing steps, or finish when all are done."""
-    if state.plan and state.plan_step < len(state.plan):
+    if state.plan and state.plan_step < len(state.plan) and not loop_stopped(state, "plan"):
         return "continue"
     return "done"
 
@@ -245,14 +563,71 @@ def plan_summary_fn(state: BoxState) -> BoxState:
         f"Step results:\n{results_text}\n\n"
         "Write a short, clear summary for the user: what was created and any key values."
     )
-    print(f"\n  ┊ synthesising plan summary...")
-    try:
-        resp = chat_llm._generate([HumanMessage(content=prompt)])
-        state.answer = resp.generations[0].message.content
-    except Exception:
-        state.answer = (
-            f"Plan completed in {len(state.plan or [])} steps.\n\n{results_text}"
+    stopped = loop_stopped(state, "plan")
+    if stopped:
+        headline = (
+            f"Plan stopped after {len(state.plan_results or {})} of "
+            f"{len(state.plan or [])} steps ({stopped})."
         )
+        prompt += f"\nNote: the plan was stopped early ({stopped}); say which steps did not run."
+    else:
+        headline = f"Plan completed in {len(state.plan or [])} steps."
+    timing = state.plan_metrics or {}
+    if timing.get("waves"):
+        wall, seq = timing["wall_seconds"], timing["sequential_seconds"]
+        speedup = seq / wall if wall else 1.0
+        print(f"\n  ┊ {len(state.plan_results or {})} steps in {timing['waves']} wave(s): "
+              f"{wall:.2f}s wall vs {seq:.2f}s sequential ({speedup:.1f}×)")
+        metrics.observe("plan.wall_seconds", wall)
+        metrics.observe("plan.sequential_seconds", seq)
+        # planner + per-step argument calls + this summary
+        print(f"  ┊ LLM round trips: {timing.get('llm_steps', 0) + 2} "
+              f"(baseline {len(state.plan or []) + 2})")
+
+    from nodes.tool_use.synthesis import synthesis_mode, template_answer
+    from tools import TOOL_CLASSES
+    rendered = template_answer(
+        [
+            (step.get("tool", ""), (state.plan_results or {}).get(step_key(step, i), ""))
+            for i, step in enumerate(state.plan or [])
+            if step_key(step, i) in (state.plan_results or {})
+        ],
+        TOOL_CLASSES,
+        synthesis_mode(state.request),
+    )
+    if rendered is not None:
+        print(f"\n  ┊ plan summary rendered from result templates (LLM call skipped)")
+        state.answer = f"{headline}\n\n{rendered}"
+    else:
+        print(f"\n  ┊ synthesising plan summary...")
+        try:
+            resp = chat_llm._generate([HumanMessage(content=prompt)])
+            state.answer = resp.generations[0].message.content
+        except Exception:
+            state.answer = f"{headline}\n\n{results_text}"
     state.done = True
-    state.history.append({"node": "plan_summary", "answer": state.answer})
+
+    # Remember the structure of LLM-built plans that ran cleanly
+    results = state.plan_results or {}
+    if (
+        PLAN_CACHE
+        and timing.get("source") == "llm"
+        and state.plan
+        and len(results) == len(state.plan)
+        and not any(str(v).startswith("Error") for v in results.values())
+    ):
+        from tools import TOOL_CLASSES, tool_registry_version
+        from nodes.planning.cache import plan_cache
+        plan_cache.store(
+            state.request.get("user_input", ""),
+            tool_registry_version(TOOL_CLASSES),
+            state.plan,
+            timing.get("planner_seconds", 0.0),
+        )
+
+    record(state, {
+        "node": "plan_summary",
+        "answer": state.answer,
+        "timing": timing,
+    })
     return state
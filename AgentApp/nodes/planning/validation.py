@@ -0,0 +1,174 @@
+"""Local plan validation and repair — runs between planner_fn and execution.
+
+Most planner mistakes are mechanical and can be fixed without another LLM
+round trip:
+
+  - tool names with the wrong case / separators or a small typo are resolved
+    against the loaded registry (fuzzy match);
+  - missing ``step`` / ``intent`` / ``output_key`` are filled (a missing
+    ``depends_on`` stays missing: the step runs after every earlier step, but
+    is not treated as using their results);
+  - duplicate output keys are renamed;
+  - dependencies on unknown keys or on the step itself are dropped;
+  - planned ``args`` that fail the tool's schema are dropped (the step then
+    asks the LLM for its arguments at execution time).
+
+What cannot be fixed locally — unknown tools, dependency cycles, items that
+are not steps at all — is returned as errors so the planner can send a
+targeted repair prompt.
+"""
+import difflib
+import re
+from typing import Any, Dict, List, Tuple
+
+from tools.base import validate_tool_args
+
+
+def _normalise_name(name: str) -> str:
+    return re.sub(r"[\s\-\.]+", "_", str(name).strip()).lower()
+
+
+def resolve_tool_name(name: Any, names: List[str]) -> Tuple[str, str]:
+    """Return ``(resolved_name, how)``; how is "", "normalised", "fuzzy" or "unknown"."""
+    if name in names:
+        return name, ""
+    by_norm = {_normalise_name(n): n for n in names}
+    norm = _normalise_name(name or "")
+    if norm in by_norm:
+        return by_norm[norm], "normalised"
+    close = difflib.get_close_matches(norm, list(by_norm), n=1, cutoff=0.75)
+    if close:
+        return by_norm[close[0]], "fuzzy"
+    return str(name), "unknown"
+
+
+def _find_cycle(deps: Dict[str, List[str]]) -> List[str]:
+    """Return one dependency cycle as a key list (empty if the graph is a DAG)."""
+    WHITE, GREY, BLACK = 0, 1, 2
+    colour = {k: WHITE for k in deps}
+    stack: List[str] = []
+
+    def visit(k: str) -> List[str]:
+        colour[k] = GREY
+        stack.append(k)
+        for d in deps.get(k, []):
+            if colour.get(d) == GREY:
+                return stack[stack.index(d):] + [d]
+            if colour.get(d) == WHITE:
+                found = visit(d)
+                if found:
+                    return found
+        stack.pop()
+        colour[k] = BLACK
+        return []
+
+    for k in deps:
+        if colour[k] == WHITE:
+            found = visit(k)
+            if found:
+                return found
+    return []
+
+
+def validate_plan(
+    plan: Any, tools: List[Any]
+) -> Tuple[List[Dict[str, Any]], List[str], List[str]]:
+    """Check and repair *plan* against the loaded *tools*.
+
+    Returns ``(plan, repairs, errors)``: the repaired copy, one message per
+    local fix, and one message per problem that needs the LLM.
+    """
+    if not isinstance(plan, list) or not plan:
+        return [], [], ["plan must be a non-empty JSON array of steps"]
+
+    names = [t.name for t in tools]
+    by_name = {t.name: t for t in tools}
+    repairs: List[str] = []
+    errors: List[str] = []
+    steps: List[Dict[str, Any]] = []
+
+    # ── per-step fields ──────────────────────────────────────────────────────
+    for idx, raw in enumerate(plan):
+        n = idx + 1
+        if not isinstance(raw, dict):
+            errors.append(f"item {n} is not a step object: {raw!r}")
+            continue
+        step = dict(raw)
+
+        if step.get("step") != n:
+            if "step" in step:
+                repairs.append(f"step {n}: renumbered from {step.get('step')!r}")
+            else:
+                repairs.append(f"step {n}: added missing step number")
+            step["step"] = n
+
+        tool, how = resolve_tool_name(step.get("tool"), names)
+        if how == "unknown":
+            errors.append(f"step {n}: unknown tool {step.get('tool')!r}")
+        elif how:
+            repairs.append(f"step {n}: tool {step.get('tool')!r} → {tool!r} ({how})")
+        step["tool"] = tool
+
+        if not step.get("intent"):
+            step["intent"] = f"Run {tool}"
+            repairs.append(f"step {n}: added missing intent")
+
+        if not step.get("output_key"):
+            step["output_key"] = f"step_{n}"
+            repairs.append(f"step {n}: added missing output_key")
+        step["output_key"] = str(step["output_key"])
+
+        args = step.get("args")
+        if args is not None and tool in by_name:
+            clean, error = validate_tool_args(by_name[tool], args)
+            if error:
+                step["args"] = None
+                repairs.append(f"step {n}: dropped planned args ({error})")
+            else:
+                step["args"] = clean
+        steps.append(step)
+
+    # ── output keys must be unique ───────────────────────────────────────────
+    seen: Dict[str, int] = {}
+    for step in steps:
+        key = step["output_key"]
+        if key in seen:
+            seen[key] += 1
+            new_key = f"{key}_{seen[key]}"
+            while new_key in seen:
+                seen[key] += 1
+                new_key = f"{key}_{seen[key]}"
+            repairs.append(f"step {step['step']}: duplicate output_key {key!r} → {new_key!r}")
+            step["output_key"] = new_key
+            seen[new_key] = 1
+        else:
+            seen[key] = 1
+
+    # ── dependencies ─────────────────────────────────────────────────────────
+    keys = [s["output_key"] for s in steps]
+    order: Dict[str, List[str]] = {}
+    for i, step in enumerate(steps):
+        deps = step.get("depends_on")
+        if deps is None:
+            order[step["output_key"]] = keys[:i]      # waits for all earlier steps
+            continue
+        if isinstance(deps, str):
+            deps = [deps]
+        if not isinstance(deps, list):
+            deps = []
+        kept = []
+        for d in deps:
+            if d == step["output_key"]:
+                repairs.append(f"step {step['step']}: dropped dependency on itself")
+            elif d not in keys:
+                repairs.append(f"step {step['step']}: dropped unknown dependency {d!r}")
+            elif d not in kept:
+                kept.append(d)
+        step["depends_on"] = kept
+        order[step["output_key"]] = kept
+
+    cycle = _find_cycle(order)
+    if cycle:
+        errors.append(f"dependency cycle: {' → '.join(cycle)}")
+
+    return steps, repairs, errors
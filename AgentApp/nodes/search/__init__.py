@@ -5,18 +5,34 @@ Graph flow
 ──────────
 determine_search_need → perform_web_search → answer_with_search
                       ↘ answer_without_search
+
+determine_search_need is skipped when classify_input's routing call already
+returned needs_search / search_query.
 """
 
 from .nodes import (
+    SEARCH_MAX_QUERIES,
+    apply_search_decision,
     answer_with_search_fn,
     answer_without_search_fn,
     determine_search_need_fn,
+    general_question_branch,
+    parse_json_object,
     perform_web_search_fn,
+    search_decision,
+    speculate_general_question,
 )
+from .packing import pack_context
 
 __all__ = [
     "determine_search_need_fn",
     "perform_web_search_fn",
     "answer_with_search_fn",
     "answer_without_search_fn",
+    "parse_json_object",
+    "search_decision",
+    "apply_search_decision",
+    "general_question_branch",
+    "speculate_general_question",
+    "pack_context",
 ]
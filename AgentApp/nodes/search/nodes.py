@@ -1,8 +1,27 @@
 from models.state import BoxState
+from nodes.search.packing import pack_context
+from nodes.speculation import settle, speculate
 from utils.llm_utils import llm, fast_llm
+from tools.retrieval import bm25_scores, search_codes
 from tools.search import search_web
+from utils import metrics
+from utils.history import record
+import hashlib
 import json
+import re
 import textwrap
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from app.config import CODE_SEARCH, CODE_SEARCH_MIN_COVERAGE, SEARCH_MAX_QUERIES, SEARCH_TOP_K
+except ImportError:
+    CODE_SEARCH = True
+    CODE_SEARCH_MIN_COVERAGE = 0.6
+    SEARCH_MAX_QUERIES = 3
+    SEARCH_TOP_K = 5
+
 
 def _think(label: str, text: str):
     prefix = f"  ┊ {label}: "
@@ -10,8 +29,81 @@ def _think(label: str, text: str):
     for i, line in enumerate(textwrap.wrap(body, width=68)):
         print((prefix if i == 0 else " " * len(prefix)) + line)
 
+def parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """First JSON object in an LLM reply (fences / prose tolerated), else None."""
+    match = re.search(r"\{.*\}", str(text), re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def search_decision(data: Dict[str, Any], user_input: str) -> Tuple[bool, List[str]]:
+    """``(needs_search, search_queries)`` from a routing / search-gate JSON reply.
+
+    Accepts ``search_queries`` (list) and/or ``search_query`` (string); at
+    most SEARCH_MAX_QUERIES distinct queries are kept.
+    """
+    needs = data.get("needs_search")
+    if isinstance(needs, str):
+        needs = needs.strip().lower() in ("true", "yes", "1")
+    needs = bool(needs)
+    raw = data.get("search_queries")
+    queries = [str(q).strip() for q in raw] if isinstance(raw, list) else []
+    queries.insert(0, str(data.get("search_query") or "").strip())
+    queries = list(dict.fromkeys(q for q in queries if q))[:max(1, SEARCH_MAX_QUERIES)]
+    if needs and not queries:
+        queries = [user_input]
+    return needs, (queries if needs else [])
+
+
+def apply_search_decision(state: BoxState, data: Dict[str, Any]) -> None:
+    """Store a search decision on *state* and print it."""
+    needs, queries = search_decision(data, state.request.get("user_input", ""))
+    state.needs_search = needs
+    state.search_queries = queries
+    state.search_query = queries[0] if queries else None
+    _think("search needed", str(needs))
+    if needs:
+        _think("search queries" if len(queries) > 1 else "search query", " | ".join(queries))
+
+
+_CURRENT_INFO_RE = re.compile(
+    r"\b(latest|current(ly)?|recent(ly)?|new(est)?|trends?|today|this year|"
+    r"changed|updates?|regulations?|codes?|20\d\d)\b",
+    re.IGNORECASE,
+)
+
+
+def likely_needs_search(user_input: str) -> bool:
+    """Cheap guess of the search gate's answer (used only for speculation)."""
+    return bool(_CURRENT_INFO_RE.search(user_input))
+
+
+def speculate_general_question(user_input: str):
+    """Start the plain answer in the background unless a search looks likely.
+
+    Web searches are never speculated: the gate rewrites the question into
+    its own queries, so a search on the raw question would rarely be kept.
+    """
+    if likely_needs_search(user_input):
+        return None
+    return speculate("general_question:no_search", "answer_without_search",
+                     _answer_without_search, user_input)
+
+
+def general_question_branch(state: BoxState) -> Optional[str]:
+    """Branch name used to settle speculations (None if the gate is undecided)."""
+    if state.request_type != "general_question" or state.needs_search is None:
+        return None
+    return "general_question:search" if state.needs_search else "general_question:no_search"
+
+
 def determine_search_need_fn(state: BoxState) -> BoxState:
-    """Determine if a web search is needed to answer the general question."""
+    """Determine if a web search is needed, and the query — in one LLM call."""
     user_input = state.request.get("user_input", "")
     
     prompt = f"""
@@ -23,61 +115,156 @@ def determine_search_need_fn(state: BoxState) -> BoxState:
     
     Questions about general architectural principles, basic design concepts, or 
     standard practices can be answered without a search.
-    
-    Respond with only "Yes" or "No".
-    """
-    
-    response = fast_llm(prompt)    # yes/no — short timeout is fine
-    search_needed = "yes" in str(response).lower()
 
-    state.needs_search = search_needed
-    _think("search needed", str(search_needed))
+    If a search is needed, also write 1 to {SEARCH_MAX_QUERIES} concise web search
+    queries related to architecture — one per distinct aspect of a broad
+    question, a single query for a narrow one.
 
-    if search_needed:
-        # Create a search query based on the user input
-        prompt = f"""
-        Transform this user question into a concise web search query related to architecture:
-        "{user_input}"
-
-        Return only the search query with no additional text.
-        """
+    Respond with ONLY this JSON object:
+    {{"needs_search": true|false, "search_queries": ["<query>", ...]}}
+    """
+    
+    spec = speculate_general_question(user_input)
+    response = fast_llm(prompt)    # short reply — short timeout is fine
+    data = parse_json_object(response)
+    if data is None:
+        # Plain "Yes"/"No" reply — search with the question itself
+        data = {"needs_search": "yes" in str(response).lower()}
+    apply_search_decision(state, data)
 
-        search_query = str(llm(prompt)).strip()
-        state.search_query = search_query
-        _think("search query", search_query)
+    settle([spec], general_question_branch(state), state)
     
-    state.history.append({
+    record(state, {
         "node": "determine_search_need",
         "needs_search": state.needs_search,
-        "search_query": state.search_query if state.needs_search else None
+        "search_queries": state.search_queries if state.needs_search else None
     })
     
     return state
 
+def _search_local_codes(query: str) -> Optional[Dict[str, Any]]:
+    """Local building-code results when they answer *query* well enough, else None."""
+    if not CODE_SEARCH:
+        return None
+    try:
+        response = search_codes.invoke({"query": query})
+    except Exception as exc:
+        _think("code search failed", str(exc))
+        return None
+    results = response.get("results") or []
+    if not results or results[0].get("coverage", 0.0) < CODE_SEARCH_MIN_COVERAGE:
+        return None
+    return {"query": query, "results": results, "source": "local_codes"}
+
+
+def _run_search(query: str) -> Dict[str, Any]:
+    """Local codes first, then Tavily → ``{"query", "results", "source"}``."""
+    local = _search_local_codes(query)
+    if local is not None:
+        return local
+    results = search_web.invoke(query)
+    items = results.get("results") if isinstance(results, dict) else None
+    return {"query": query, "results": items if isinstance(items, list) else [], "source": "web"}
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha1(" ".join(str(text).lower().split()).encode("utf-8")).hexdigest()
+
+
+def _normalize_url(url: str) -> str:
+    url = str(url).strip().lower().rstrip("/")
+    return re.sub(r"^https?://(www\.)?", "", url)
+
+
+def _fan_out(queries: List[str], question: str) -> Dict[str, Any]:
+    """Run *queries* concurrently, de-duplicate and rerank against *question*.
+
+    Returns ``{"results", "sources", "candidates", "duplicates", "slowest_ms"}``.
+    """
+    timings: List[float] = []
+
+    def _timed(q: str) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        try:
+            return _run_search(q)
+        finally:
+            timings.append((time.perf_counter() - t0) * 1000)
+
+    if len(queries) == 1:
+        found = [_timed(queries[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            found = list(pool.map(_timed, queries))
+
+    # De-duplicate by URL and by content hash, keeping the first occurrence
+    seen_urls, seen_hashes = set(), set()
+    merged: List[Dict[str, Any]] = []
+    candidates = 0
+    for f in found:
+        for r in f["results"]:
+            if not isinstance(r, dict):
+                continue
+            candidates += 1
+            url, digest = _normalize_url(r.get("url", "")), _content_hash(r.get("content", ""))
+            if (url and url in seen_urls) or digest in seen_hashes:
+                continue
+            seen_urls.add(url)
+            seen_hashes.add(digest)
+            merged.append(r)
+
+    duplicates = candidates - len(merged)
+    if len(queries) > 1 and merged:
+        # Rerank the merged pool against the user's question (title weighted in)
+        scores = bm25_scores(question, [f"{r.get('title', '')} {r.get('content', '')}" for r in merged])
+        order = sorted(range(len(merged)), key=lambda i: scores[i], reverse=True)
+        merged = [{**merged[i], "rerank_score": round(scores[i], 4)} for i in order[:SEARCH_TOP_K]]
+
+    metrics.incr("search.queries", len(queries))
+    metrics.incr("search.duplicates", duplicates)
+    return {
+        "results": merged,
+        "sources": {f["source"] for f in found},
+        "candidates": candidates,
+        "duplicates": duplicates,
+        "slowest_ms": max(timings) if timings else 0.0,
+    }
+
+
 def perform_web_search_fn(state: BoxState) -> BoxState:
-    """Perform a web search using Tavily search."""
+    """Search the local building codes first, then the web (Tavily)."""
     query = state.search_query
-    
+
+    queries = state.search_queries or ([query] if query else [])
     try:
-        # Use the search_web tool
-        results = search_web.invoke(query)
-        
-        # Check if results contains a list of search items
-        if "results" in results and isinstance(results["results"], list):
-            state.search_results = results["results"]
-        else:
-            state.search_results = []
+        t0 = time.perf_counter()
+        found = _fan_out(queries, state.request.get("user_input", "") or query)
+        state.search_results = found["results"]
+        ms = (time.perf_counter() - t0) * 1000
+        sources = found["sources"]
+        if len(queries) > 1:
+            _think("search", f"{len(queries)} queries → {found['candidates']} results, "
+                   f"{found['duplicates']} duplicate(s) dropped, top {len(state.search_results)} "
+                   f"kept in {ms:.0f} ms (slowest query {found['slowest_ms']:.0f} ms)")
+        if sources == {"local_codes"}:
+            _think("search", f"{len(state.search_results)} local code passage(s) in {ms:.1f} ms — web skipped")
+            metrics.incr("search.local_codes")
+        cached = any(isinstance(r, dict) and r.get("cached") for r in state.search_results)
+        if cached and "local_codes" not in sources:
+            _think("search", f"served from cache ({state.search_results[0].get('cache_age', 0):.0f}s old)")
         
-        state.history.append({
+        record(state, {
             "node": "perform_web_search",
-            "query": query,
-            "results_count": len(state.search_results)
+            "queries": queries,
+            "results_count": len(state.search_results),
+            "source": "+".join(sorted(sources)),
+            "cached": cached,
+            "duplicates": found["duplicates"],
         })
     except Exception as e:
         state.search_results = []
-        state.history.append({
+        record(state, {
             "node": "perform_web_search",
-            "query": query,
+            "queries": queries,
             "error": str(e)
         })
     
@@ -88,12 +275,12 @@ def answer_with_search_fn(state: BoxState) -> BoxState:
     user_input = state.request.get("user_input", "")
     search_results = state.search_results or []
     
-    # Format search results for the prompt
-    formatted_results = ""
-    for i, result in enumerate(search_results):
-        formatted_results += f"Source {i+1}: {result.get('title', 'No title')}\n"
-        formatted_results += f"URL: {result.get('url', 'No URL')}\n"
-        formatted_results += f"Content: {result.get('content', 'No content')}\n\n"
+    # Best passages within the token budget, source numbering preserved
+    formatted_results, packing = pack_context(user_input, search_results)
+    if packing["tokens_saved"]:
+        _think("context", f"{packing['passages_kept']}/{packing['passages_total']} passages, "
+               f"~{packing['tokens_packed']} tokens (saved ~{packing['tokens_saved']})")
+    metrics.incr("search.context_tokens_saved", packing["tokens_saved"])
     
     prompt = f"""
     You are an architectural assistant that helps with building design questions.
@@ -114,17 +301,16 @@ def answer_with_search_fn(state: BoxState) -> BoxState:
     state.answer = answer
     state.done = True
     
-    state.history.append({
+    record(state, {
         "node": "answer_with_search",
-        "answer": answer
+        "answer": answer,
+        "context_tokens": packing["tokens_packed"],
+        "context_tokens_saved": packing["tokens_saved"],
     })
     
     return state
 
-def answer_without_search_fn(state: BoxState) -> BoxState:
-    """Answer general questions about architecture without web search."""
-    user_input = state.request.get("user_input", "")
-    
+def _answer_without_search(user_input: str) -> str:
     prompt = f"""
     You are an architectural assistant that helps with building design questions.
     
@@ -136,13 +322,21 @@ def answer_without_search_fn(state: BoxState) -> BoxState:
     If the question requires current data or recent trends that you don't have access to, 
     acknowledge this limitation in your response.
     """
-    
-    answer = str(llm(prompt))
+    return str(llm(prompt))
+
+
+def answer_without_search_fn(state: BoxState) -> BoxState:
+    """Answer general questions about architecture without web search."""
+    user_input = state.request.get("user_input", "")
+
+    answer = state.speculative.get("answer_without_search")
+    if answer is None:
+        answer = _answer_without_search(user_input)
 
     state.answer = answer
     state.done = True
 
-    state.history.append({
+    record(state, {
         "node": "answer_without_search",
         "answer": answer
     })
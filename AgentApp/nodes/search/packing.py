@@ -0,0 +1,138 @@
+"""
+Token-budgeted context packing for search-grounded answers.
+
+Search results are split into passages of a few sentences, scored against
+the question with BM25, and the best passages are packed until the token
+budget (SEARCH_CONTEXT_TOKENS) is reached.  Each kept passage stays under
+its original "Source N" heading, in document order, so the answer's
+[Source N] citations still point at the right result.
+
+Tokens are estimated as characters / 4 — close enough for budgeting and
+needs no tokenizer.
+"""
+import re
+from typing import Any, Dict, List, Tuple
+
+from tools.retrieval.text import bm25_scores
+
+try:
+    from app.config import SEARCH_CONTEXT_TOKENS
+except ImportError:
+    SEARCH_CONTEXT_TOKENS = 1500
+
+PASSAGE_WORDS = 60
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def split_passages(content: str, max_words: int = PASSAGE_WORDS) -> List[str]:
+    """Group sentences into passages of at most ~*max_words* words.
+
+    Text without sentence breaks (lists, tables, scraped snippets) is cut
+    every *max_words* words, so no passage is much larger than that.
+    """
+    passages: List[str] = []
+    buf: List[str] = []
+    words = 0
+    for sentence in _SENTENCE_RE.split(" ".join(str(content).split())):
+        tokens = sentence.split()
+        pieces = [
+            " ".join(tokens[k:k + max_words]) for k in range(0, len(tokens), max_words)
+        ] or [sentence]
+        for piece in pieces:
+            n = len(piece.split())
+            if buf and words + n > max_words:
+                passages.append(" ".join(buf))
+                buf, words = [], 0
+            buf.append(piece)
+            words += n
+    if buf:
+        passages.append(" ".join(buf))
+    return [p for p in passages if p.strip()]
+
+
+def _truncate(text: str, tokens: int) -> str:
+    """*text* cut to about *tokens* tokens (at a word boundary when possible)."""
+    chars = max(0, tokens * 4 - 1)
+    if len(text) <= chars:
+        return text
+    cut = text[:chars]
+    return (cut.rsplit(" ", 1)[0] if " " in cut else cut) + "…"
+
+
+def _source_header(i: int, result: Dict[str, Any]) -> str:
+    return (
+        f"Source {i + 1}: {result.get('title', 'No title')}\n"
+        f"URL: {result.get('url', 'No URL')}\n"
+    )
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """Every result in full — the unpacked prompt block."""
+    return "".join(
+        f"{_source_header(i, r)}Content: {r.get('content', 'No content')}\n\n"
+        for i, r in enumerate(results)
+    )
+
+
+def pack_context(
+    question: str, results: List[Dict[str, Any]], budget: int = SEARCH_CONTEXT_TOKENS
+) -> Tuple[str, Dict[str, int]]:
+    """Return ``(prompt_block, stats)`` holding the best passages within *budget* tokens.
+
+    stats: tokens_full, tokens_packed, tokens_saved, passages_total, passages_kept.
+    """
+    full = format_results(results)
+    tokens_full = estimate_tokens(full)
+
+    passages: List[Tuple[int, int, str]] = []       # (source, position, text)
+    for i, r in enumerate(results):
+        for j, text in enumerate(split_passages(r.get("content", ""))):
+            passages.append((i, j, text))
+
+    if tokens_full <= budget or not passages:
+        return full, {
+            "tokens_full": tokens_full, "tokens_packed": tokens_full, "tokens_saved": 0,
+            "passages_total": len(passages), "passages_kept": len(passages),
+        }
+
+    scores = bm25_scores(question, [f"{results[i].get('title', '')} {t}" for i, _, t in passages])
+    # Ties go to higher-ranked sources and earlier passages
+    order = sorted(range(len(passages)), key=lambda k: (-scores[k], passages[k][0], passages[k][1]))
+
+    kept: Dict[int, List[Tuple[int, str]]] = {}
+    used = 0
+    any_match = scores[order[0]] > 0
+    for k in order:
+        i, j, text = passages[k]
+        if any_match and scores[k] <= 0:
+            break                       # only unrelated passages left
+        cost = estimate_tokens(text) + 2
+        if i not in kept:
+            cost += estimate_tokens(_source_header(i, results[i])) + 3
+        if used + cost > budget:
+            continue
+        kept.setdefault(i, []).append((j, text))
+        used += cost
+
+    if not kept:
+        # Not even the best passage fits — send it truncated rather than nothing
+        i, j, text = passages[order[0]]
+        room = budget - estimate_tokens(_source_header(i, results[i])) - 5
+        kept[i] = [(j, _truncate(text, max(room, 1)))]
+
+    block = ""
+    for i in sorted(kept):
+        body = " … ".join(text for _, text in sorted(kept[i]))
+        block += f"{_source_header(i, results[i])}Content: {body}\n\n"
+    tokens_packed = estimate_tokens(block)
+    return block, {
+        "tokens_full": tokens_full,
+        "tokens_packed": tokens_packed,
+        "tokens_saved": max(0, tokens_full - tokens_packed),
+        "passages_total": len(passages),
+        "passages_kept": sum(len(v) for v in kept.values()),
+    }
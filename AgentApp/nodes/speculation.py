@@ -0,0 +1,119 @@
+"""
+Speculative branch execution — start the likely next step while routing runs.
+
+Routing calls (the LLM classifier, the search gate) sit on the critical
+path, but the branch they pick is usually predictable.  With
+SPECULATIVE_ROUTING on, a routing node starts the predicted branch's first
+side-effect-free step in the background, makes its routing call, then
+settles the speculation:
+
+  - prediction matched  → the result is committed to ``state.speculative``
+                          under the downstream node's name, and that node
+                          uses it instead of repeating the work;
+  - prediction missed   → the work is cancelled (or, if already running,
+                          its result is dropped when it finishes).
+
+Only read-only LLM calls are speculated — never GH tool calls or paid web
+searches.  Metrics: ``speculation.{started,committed,discarded}``,
+``speculation.saved_seconds`` (time the committed work overlapped routing)
+and ``speculation.wasted_seconds`` (time spent on discarded work).
+
+Usage
+-----
+    spec = speculate("general_question:no_search", "answer_without_search",
+                     _answer_without_search, user_input)
+    … routing call …
+    settle([spec], actual_branch, state)
+"""
+import textwrap
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from models.state import BoxState
+from utils import metrics
+
+try:
+    from app.config import SPECULATIVE_ROUTING
+except ImportError:
+    SPECULATIVE_ROUTING = False
+
+_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculate")
+
+
+def _think(label: str, text: str):
+    prefix = f"  ┊ {label}: "
+    body = str(text).strip().replace("\n", " ")
+    for i, line in enumerate(textwrap.wrap(body, width=68)):
+        print((prefix if i == 0 else " " * len(prefix)) + line)
+
+
+class Speculation:
+    """One background call, committed only if its branch is taken."""
+
+    def __init__(self, branch: str, key: str, fn: Callable[..., Any], *args: Any) -> None:
+        self.branch = branch
+        self.key = key
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._future = _POOL.submit(self._call, fn, *args)
+        metrics.incr("speculation.started")
+
+    def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        try:
+            return fn(*args)
+        finally:
+            self.finished = time.perf_counter()
+
+    def commit(self) -> Any:
+        """Wait for the result (None if the call failed)."""
+        routed_at = time.perf_counter()
+        try:
+            result = self._future.result()
+        except Exception as exc:
+            _think("speculation failed", f"{self.key}: {exc}")
+            metrics.incr("speculation.failed")
+            return None
+        saved = min(self.finished or routed_at, routed_at) - self.started
+        metrics.incr("speculation.committed")
+        metrics.incr("speculation.saved_seconds", saved)
+        _think("speculation hit", f"{self.key} — {saved:.2f}s overlapped routing")
+        return result
+
+    def discard(self) -> None:
+        """Cancel if not started yet; otherwise count the work as wasted when it ends."""
+        metrics.incr("speculation.discarded")
+        if self._future.cancel():
+            _think("speculation miss", f"{self.key} cancelled before it started")
+            return
+
+        def _wasted(future) -> None:
+            try:
+                future.result()
+            except (CancelledError, Exception):
+                pass
+            metrics.incr("speculation.wasted_seconds", (self.finished or time.perf_counter()) - self.started)
+
+        self._future.add_done_callback(_wasted)
+        _think("speculation miss", f"{self.key} discarded")
+
+
+def speculate(branch: str, key: str, fn: Callable[..., Any], *args: Any) -> Optional[Speculation]:
+    """Start *fn(*args)* for *branch* when SPECULATIVE_ROUTING is on (else None)."""
+    if not SPECULATIVE_ROUTING:
+        return None
+    _think("speculating", f"{branch} → {key}")
+    return Speculation(branch, key, fn, *args)
+
+
+def settle(speculations: List[Optional[Speculation]], branch: Optional[str], state: BoxState) -> None:
+    """Commit speculations for the taken *branch* into ``state.speculative``; discard the rest."""
+    for spec in speculations:
+        if spec is None:
+            continue
+        if spec.branch == branch:
+            result = spec.commit()
+            if result is not None:
+                state.speculative[spec.key] = result
+        else:
+            spec.discard()
@@ -6,6 +6,26 @@ Graph flow
 execute_gh_tool → __end__
 """
 
-from .nodes import _handle_image_result, execute_gh_tool_fn
+from .direct import parse_direct_calls
+from .nodes import (
+    _handle_image_result,
+    call_tool,
+    execute_gh_tool_fn,
+    schedule_calls,
+    select_tool_calls,
+    speculate_tool_selection,
+)
+from .synthesis import render_tool_result, synthesis_mode, template_answer
 
-__all__ = ["execute_gh_tool_fn", "_handle_image_result"]
+__all__ = [
+    "execute_gh_tool_fn",
+    "_handle_image_result",
+    "call_tool",
+    "schedule_calls",
+    "parse_direct_calls",
+    "select_tool_calls",
+    "speculate_tool_selection",
+    "render_tool_result",
+    "synthesis_mode",
+    "template_answer",
+]
@@ -0,0 +1,110 @@
+"""
+Direct tool invocations — the zero-LLM fast path.
+
+Messages that are already tool calls skip classification and tool
+selection entirely:
+
+    draw_box width=10 depth=8 height=5
+    draw_box {"width": 10, "depth": 8, "height": 5}
+    draw_box(width=10, depth=8, height=5)
+    draw_box width=10 depth=8 height=5; capture_viewport
+
+A command must start with the exact name of a loaded tool and its
+arguments must pass the tool's ``args_schema``.  Several commands can be
+separated by ``;`` or new lines; they run sequentially, in the order typed
+(never on the parallel tool-call pool).  If any command on the line does not
+parse, nothing is treated as direct and the normal LLM route runs.
+"""
+import json
+import re
+import shlex
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.base import validate_tool_args
+
+_NAME_RE = re.compile(r"^([A-Za-z_][\w\-\.]*)\s*(.*)$", re.DOTALL)
+
+
+def split_commands(text: str) -> List[str]:
+    """Split on ``;`` / new lines outside quotes, braces and brackets."""
+    parts: List[str] = []
+    buf: List[str] = []
+    depth, quote = 0, ""
+    for ch in text:
+        if quote:
+            if ch == quote:
+                quote = ""
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "{[(":
+            depth += 1
+        elif ch in "}])":
+            depth = max(0, depth - 1)
+        elif ch in ";\n" and depth == 0:
+            parts.append("".join(buf))
+            buf = []
+            continue
+        buf.append(ch)
+    parts.append("".join(buf))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _value(raw: str) -> Any:
+    """``10`` → 10, ``true`` → True, ``[1,2]`` → [1, 2], anything else → str."""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def parse_arguments(text: str) -> Optional[Dict[str, Any]]:
+    """Arguments from a JSON object or ``key=value`` tokens (None if neither)."""
+    text = text.strip()
+    if text.startswith("(") and text.endswith(")"):
+        text = text[1:-1].strip()
+    if not text:
+        return {}
+    if text.startswith("{"):
+        try:
+            args = json.loads(text)
+        except ValueError:
+            return None
+        return args if isinstance(args, dict) else None
+
+    try:
+        tokens = shlex.split(text.replace(",", " "), posix=True)
+    except ValueError:
+        return None
+    args: Dict[str, Any] = {}
+    for token in tokens:
+        key, sep, raw = token.partition("=")
+        if not sep or not key.isidentifier():
+            return None
+        args[key] = _value(raw)
+    return args
+
+
+def parse_direct_calls(
+    text: str, tools: List[Any]
+) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    """Return ``(tool_calls, None)`` when every command in *text* is a valid call.
+
+    Otherwise ``(None, reason)`` — reason is None when the text simply is not a
+    command line, or an error message when it named a tool but its arguments
+    were rejected.
+    """
+    by_name = {t.name: t for t in tools}
+    calls: List[Dict[str, Any]] = []
+    for i, command in enumerate(split_commands(text or "")):
+        m = _NAME_RE.match(command)
+        if not m or m.group(1) not in by_name:
+            return None, None
+        tool = by_name[m.group(1)]
+        args = parse_arguments(m.group(2))
+        if args is None:
+            return None, None
+        clean, error = validate_tool_args(tool, args)
+        if error:
+            return None, error
+        calls.append({"name": tool.name, "args": clean, "id": f"direct_{i + 1}"})
+    return (calls or None), None
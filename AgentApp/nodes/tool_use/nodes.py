@@ -9,17 +9,57 @@ Vision tools (capture_viewport, etc.)
 If a tool result is a JSON object that contains an "image_base64" key,
 the node automatically forwards it to the vision-capable LLM so a VLM
 can reason about the rendered scene.
+
+Several tool calls in one LLM message
+-------------------------------------
+With TOOL_CALL_SERIALIZE_MUTATIONS on, every call is first routed to the GH
+server it will run on (calls referencing baked GUIDs go to the server owning
+the objects).  The calls on a server that gets a document-changing call run
+one after another in the order the LLM issued them; calls on other servers,
+read-only calls and native tools run concurrently (up to
+TOOL_CALL_MAX_PARALLEL).  ToolMessages are always assembled in the original
+order.
+
+Speculation
+-----------
+The tool-selection call has no side effects, so classify_input may run it
+while its own routing call is pending (SPECULATIVE_ROUTING); the committed
+AIMessage is picked up from state.speculative["execute_gh_tool"].
+
+Direct calls
+------------
+When classify_input parsed the message as explicit tool commands
+(state.direct_calls, see direct.py) the tool-selection LLM call is skipped,
+the commands run one after another in the order they were typed, and the
+answer is always rendered from templates.
+
+Answer synthesis
+----------------
+Structured results are phrased from templates (see synthesis.py); the second
+LLM call only runs for failures, image analyses and tools without a template.
 """
 import json
 import textwrap
-from typing import Any, Dict, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
 
 from config.prompts import build_csharp_system_prompt
 from models.state import BoxState
+from nodes.tool_use.synthesis import synthesis_mode, template_answer
+from utils import metrics
+from utils.artifacts import keep, stash
+from utils.history import record
 from utils.llm_utils import chat_llm, reason_about_image
 
+try:
+    from app.config import TOOL_CALL_MAX_PARALLEL, TOOL_CALL_SERIALIZE_MUTATIONS
+except ImportError:
+    TOOL_CALL_MAX_PARALLEL = 4
+    TOOL_CALL_SERIALIZE_MUTATIONS = True
+
 _HR = "─" * 72
 
 
@@ -56,55 +96,205 @@ def _handle_image_result(result_str: str, user_input: str) -> str:
     view_name  = data.get("view_name", "")
     w, h       = data.get("width", "?"), data.get("height", "?")
     analysis   = _reason_about_image(base64_png, user_input, view_name)
+    # Keep the capture itself out of state — only its handle travels on
+    handle     = keep(result_str)
+    image      = f" · image {handle}" if handle else ""
+
+    return f"[Viewport capture {w}×{h} — {view_name}{image}]\n\n{analysis}"
+
+
+def schedule_calls(calls: List[Tuple[str, Dict[str, Any]]], tools: List[Any]) -> List[Tuple[str, Optional[str]]]:
+    """Group key and pinned server for each ``(tool name, args)`` of a batch.
+
+    Calls sharing a key run sequentially, in batch order; each call is sent to
+    its pinned server (None → routed when it runs).  See ``ROUTER.schedule``.
+    """
+    free = [(f"call:{i}", None) for i in range(len(calls))]
+    if not TOOL_CALL_SERIALIZE_MUTATIONS:
+        return free
+    from tools.mcp import ROUTER
+    by_name = {t.name: t for t in tools}
+    routed = ROUTER.schedule([
+        (getattr(by_name.get(name), "mcp_endpoints", None) or None, args or {},
+         getattr(by_name.get(name), "read_only", False))
+        for name, args in calls
+    ])
+    return [
+        (f"server:{key}" if key else default, endpoint)
+        for (default, _), (endpoint, key) in zip(free, routed)
+    ]
 
-    return f"[Viewport capture {w}×{h} — {view_name}]\n\n{analysis}"
-
-
-def execute_gh_tool_fn(state: BoxState) -> BoxState:
-    """Use LLM + tool-calling to invoke the appropriate GH MCP tool."""
-    # Lazily import to avoid circular deps and to pick up any reload
-    from tools import TOOL_CLASSES
-
-    user_input: str = state.request.get("user_input", "")
-
-    if not TOOL_CLASSES:
-        state.answer = (
-            "No GH tools are currently loaded. "
-            "Make sure the Grasshopper plugin is running and set to Active, "
-            "then reload tools in the sidebar."
-        )
-        state.done = True
-        state.history.append({"node": "execute_gh_tool", "status": "no_tools"})
-        return state
 
+def call_tool(tool: Any, args: Dict[str, Any], endpoint: Optional[str] = None) -> str:
+    """Run *tool* with *args*, on *endpoint* for MCP tools when one is pinned."""
+    if endpoint and hasattr(tool, "call_on"):
+        return tool.call_on(endpoint, **args)
+    return tool._run(**args)
+
+
+def _run_tool_call(
+    tool_call: Dict[str, Any], tools: List[Any], user_input: str, endpoint: Optional[str] = None
+) -> str:
+    """Execute one LLM tool call (on *endpoint*, if pinned) and post-process its result."""
+    tool_name: str = tool_call["name"]
+    tool_args: Dict[str, Any] = tool_call.get("args", {})
+
+    args_str = ", ".join(f"{k}={v}" for k, v in tool_args.items())
+    print(f"  ┊ calling tool: {tool_name}({args_str})")
+
+    matching = [t for t in tools if t.name == tool_name]
+    if not matching:
+        result_str = f"Error: tool '{tool_name}' not found."
+    else:
+        try:
+            result_str = call_tool(matching[0], tool_args, endpoint)
+        except Exception as exc:
+            result_str = f"Error calling tool: {exc}"
+
+    # ── Vision result: send image to VLM instead of raw base64 ───────────────
+    result_str = _handle_image_result(result_str, user_input)
+    # Large outputs go to the artifact store; state and prompts get a stub
+    result_str = stash(result_str)
+
+    _think(f"{tool_name} result", result_str)
+    return result_str
+
+
+def run_tool_calls(
+    tool_calls: List[Dict[str, Any]], tools: List[Any], user_input: str
+) -> List[str]:
+    """Run *tool_calls* on a bounded pool; results come back in call order."""
+    scheduled = schedule_calls([(tc["name"], tc.get("args", {})) for tc in tool_calls], tools)
+    groups: "OrderedDict[str, List[int]]" = OrderedDict()
+    for i, (key, _) in enumerate(scheduled):
+        groups.setdefault(key, []).append(i)
+
+    results: List[str] = [""] * len(tool_calls)
+
+    def _run_group(indices: List[int]) -> None:
+        for i in indices:
+            results[i] = _run_tool_call(tool_calls[i], tools, user_input, scheduled[i][1])
+
+    width = max(1, min(TOOL_CALL_MAX_PARALLEL, len(groups)))
+    if width == 1:
+        for indices in groups.values():
+            _run_group(indices)
+    else:
+        print(f"  ┊ running {len(tool_calls)} tool calls in {len(groups)} "
+              f"group(s), {width} at a time")
+        with ThreadPoolExecutor(max_workers=width) as pool:
+            for f in [pool.submit(_run_group, idx) for idx in groups.values()]:
+                f.result()
+    return results
+
+
+def _tool_selection_messages(user_input: str, tools: List[Any]) -> List[Any]:
+    """System + user messages for the tool-selection LLM call."""
     # Build tool descriptions for the system prompt
     tool_list = "\n".join(
-        f"- `{t.name}`: {t.description}" for t in TOOL_CLASSES
+        f"- `{t.name}`: {t.description}" for t in tools
     )
-    tool_names = [t.name for t in TOOL_CLASSES]
-    print(f"  ┊ tools available: {', '.join(tool_names)}")
+    tool_names = [t.name for t in tools]
 
     has_csharp = "run_csharp_script" in tool_names
     base = (
         "You are a Rhino/Grasshopper design assistant. "
         "Pick the most relevant tool, supply the required arguments, and call it. "
-        "If several tools are needed, call them in sequence."
+        "If several tools are needed, call them in the order they must run."
     )
     system_prompt = (
         build_csharp_system_prompt(base, tool_list)
         if has_csharp
         else f"{base}\n\nAvailable tools:\n{tool_list}"
     )
-
-    llm_with_tools = chat_llm.bind_tools(TOOL_CLASSES)
-    messages = [
+    return [
         SystemMessage(content=system_prompt),
         HumanMessage(content=user_input),
     ]
 
-    # First LLM call — use .invoke() so RunnableBinding (Gemini) passes tools correctly
+
+def select_tool_calls(user_input: str, tools: List[Any], messages: Optional[List[Any]] = None):
+    """First LLM call: pick the tool(s) and arguments.  Has no side effects."""
+    if messages is None:
+        messages = _tool_selection_messages(user_input, tools)
+    llm_with_tools = chat_llm.bind_tools(tools)
+    # Use .invoke() so RunnableBinding (Gemini) passes tools correctly
     print(f"  ┊ asking LLM which tool to call...")
-    ai_msg = llm_with_tools.invoke(messages)
+    return llm_with_tools.invoke(messages)
+
+
+def speculate_tool_selection(user_input: str):
+    """Run the tool-selection call in the background while routing is pending."""
+    from nodes.speculation import speculate
+    from tools import TOOL_CLASSES
+    if not TOOL_CLASSES:
+        return None
+    return speculate("use_tool", "execute_gh_tool", select_tool_calls, user_input, list(TOOL_CLASSES))
+
+
+def _execute_direct_calls(state: BoxState, tools: List[Any]) -> BoxState:
+    """Run pre-parsed tool calls and template the answer — no LLM round trip."""
+    user_input: str = state.request.get("user_input", "")
+    calls = state.direct_calls or []
+    print(f"  ┊ direct call(s) — skipping tool selection")
+    # Typed commands are an explicit sequence: one after another, in order
+    outputs = [_run_tool_call(tc, tools, user_input) for tc in calls]
+
+    # "llm" is still honoured when explicitly requested; otherwise never call it
+    mode = "template" if synthesis_mode(state.request) != "llm" else "llm"
+    answer = template_answer(
+        [(tc["name"], r) for tc, r in zip(calls, outputs)], tools, mode
+    )
+    if answer is None:
+        print(f"  ┊ synthesising answer...")
+        results_text = "\n".join(f"{tc['name']}: {r}" for tc, r in zip(calls, outputs))
+        answer = chat_llm.invoke([
+            HumanMessage(content=(
+                f"The user ran: {user_input}\n\nTool results:\n{results_text}\n\n"
+                "Summarise the results for the user in a few sentences."
+            )),
+        ]).content
+    metrics.incr("direct_calls.turns")
+    metrics.incr("direct_calls.tool_calls", len(calls))
+
+    results = {tc["name"]: r for tc, r in zip(calls, outputs)}
+    state.answer = answer
+    state.tool_results = results
+    state.done = True
+    record(state, {
+        "node": "execute_gh_tool",
+        "direct": True,
+        "tools_called": list(results.keys()),
+        "results": results,
+    })
+    return state
+
+
+def execute_gh_tool_fn(state: BoxState) -> BoxState:
+    """Use LLM + tool-calling to invoke the appropriate GH MCP tool."""
+    # Lazily import to avoid circular deps and to pick up any reload
+    from tools import TOOL_CLASSES
+
+    user_input: str = state.request.get("user_input", "")
+
+    if not TOOL_CLASSES:
+        state.answer = (
+            "No GH tools are currently loaded. "
+            "Make sure the Grasshopper plugin is running and set to Active, "
+            "then reload tools in the sidebar."
+        )
+        state.done = True
+        record(state, {"node": "execute_gh_tool", "status": "no_tools"})
+        return state
+
+    if state.direct_calls:
+        return _execute_direct_calls(state, TOOL_CLASSES)
+
+    print(f"  ┊ tools available: {', '.join(t.name for t in TOOL_CLASSES)}")
+    messages = _tool_selection_messages(user_input, TOOL_CLASSES)
+    ai_msg = state.speculative.get("execute_gh_tool")
+    if ai_msg is None:
+        ai_msg = select_tool_calls(user_input, TOOL_CLASSES, messages)
 
     if ai_msg.content:
         _think("LLM thought", ai_msg.content)
@@ -115,44 +305,35 @@ def execute_gh_tool_fn(state: BoxState) -> BoxState:
         # LLM answered without calling a tool
         state.answer = ai_msg.content
         state.done = True
-        state.history.append({"node": "execute_gh_tool", "status": "direct_answer"})
+        record(state, {"node": "execute_gh_tool", "status": "direct_answer"})
         return state
 
-    # Execute each requested tool call
+    # Execute the requested tool calls (concurrently where independent)
     tool_messages: List[ToolMessage] = []
-    for tc in ai_msg.tool_calls:
-        tool_name: str = tc["name"]
-        tool_args: Dict[str, Any] = tc.get("args", {})
-        tool_id: str = tc.get("id", tool_name)
-
-        args_str = ", ".join(f"{k}={v}" for k, v in tool_args.items())
-        print(f"  ┊ calling tool: {tool_name}({args_str})")
-
-        matching = [t for t in TOOL_CLASSES if t.name == tool_name]
-        if not matching:
-            result_str = f"Error: tool '{tool_name}' not found."
-        else:
-            result_str = matching[0]._run(**tool_args)
-
-        # ── Vision result: send image to VLM instead of raw base64 ───────────
-        result_str = _handle_image_result(result_str, user_input)
-
-        _think(f"{tool_name} result", result_str)
-
-        results[tool_name] = result_str
+    outputs = run_tool_calls(ai_msg.tool_calls, TOOL_CLASSES, user_input)
+    for tc, result_str in zip(ai_msg.tool_calls, outputs):
+        results[tc["name"]] = result_str
         tool_messages.append(
-            ToolMessage(content=result_str, tool_call_id=tool_id)
+            ToolMessage(content=result_str, tool_call_id=tc.get("id", tc["name"]))
         )
 
-    # Second LLM call — synthesise results into natural language
-    print(f"  ┊ synthesising answer...")
-    followup_messages = [*messages, ai_msg, *tool_messages]
-    final_answer = chat_llm.invoke(followup_messages).content
+    final_answer = template_answer(
+        [(tc["name"], r) for tc, r in zip(ai_msg.tool_calls, outputs)],
+        TOOL_CLASSES,
+        synthesis_mode(state.request),
+    )
+    if final_answer is not None:
+        print(f"  ┊ answer rendered from result templates (LLM call skipped)")
+    else:
+        # Second LLM call — synthesise results into natural language
+        print(f"  ┊ synthesising answer...")
+        followup_messages = [*messages, ai_msg, *tool_messages]
+        final_answer = chat_llm.invoke(followup_messages).content
 
     state.answer = final_answer
     state.tool_results = results
     state.done = True
-    state.history.append({
+    record(state, {
         "node": "execute_gh_tool",
         "tools_called": list(results.keys()),
         "results": results,
@@ -0,0 +1,147 @@
+"""
+Template answer synthesis — phrase tool results without a second LLM call.
+
+Tool results are structured: native tools return a JSON object, .gh tools
+return ``name: value`` lines for their declared outputs.  When every result
+of a turn parses and has a template (config/result_templates.py), the
+answer is rendered locally.  The LLM is still used when:
+
+  - a tool has no template and declares no outputs,
+  - a template placeholder is missing from the result,
+  - a result is an error (``Error…``, ``"success": false``, ``"error": …``),
+  - a result is a viewport analysis (it needs to be read, not reformatted).
+
+Modes (``request["synthesis"]``, default ANSWER_SYNTHESIS):
+    "auto"      templates when possible, LLM otherwise
+    "template"  never call the LLM — fall back to the raw result text
+    "llm"       always call the LLM (previous behaviour)
+"""
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config.result_templates import CATEGORY_TEMPLATES, DEFAULT_TEMPLATE, TOOL_TEMPLATES
+from utils import metrics
+from utils.artifacts import resolve
+
+try:
+    from app.config import ANSWER_SYNTHESIS
+except ImportError:
+    ANSWER_SYNTHESIS = "auto"
+
+SYNTHESIS_MODES = ("auto", "template", "llm")
+_MAX_VALUE_CHARS = 300
+
+
+def synthesis_mode(request: Dict[str, Any]) -> str:
+    mode = str((request or {}).get("synthesis") or ANSWER_SYNTHESIS).lower()
+    return mode if mode in SYNTHESIS_MODES else "auto"
+
+
+def parse_tool_result(result_str: str, outputs: Sequence[str] = ()) -> Optional[Dict[str, Any]]:
+    """Structured fields of a tool result (None if it is free text).
+
+    JSON objects are returned as-is.  ``name: value`` lines are accepted when
+    the name is a declared output (any name when none are declared); lines
+    that do not start a new field continue the previous value.
+    """
+    text = str(result_str).strip()
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        data = None
+    if isinstance(data, dict):
+        return data
+
+    fields: Dict[str, Any] = {}
+    last: Optional[str] = None
+    for line in text.splitlines():
+        name, sep, value = line.partition(":")
+        name = name.strip()
+        if sep and name and (name in outputs or (not outputs and name.isidentifier())):
+            fields[name] = value.strip()
+            last = name
+        elif last is not None and line.strip():
+            fields[last] = f"{fields[last]}\n{line.strip()}"
+        elif line.strip():
+            return None          # free text before any field
+    return fields or None
+
+
+def _is_failure(result_str: str, fields: Optional[Dict[str, Any]]) -> bool:
+    if str(result_str).startswith("Error"):
+        return True
+    if fields is None:
+        return False
+    return fields.get("success") is False or bool(fields.get("error"))
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, list):
+        text = ", ".join(_format_value(v) for v in value)
+    elif isinstance(value, dict):
+        text = ", ".join(f"{k}: {_format_value(v)}" for k, v in value.items())
+    else:
+        text = str(value)
+    if len(text) > _MAX_VALUE_CHARS:
+        text = text[:_MAX_VALUE_CHARS] + " …"
+    return text
+
+
+def _template_for(tool: Any) -> Optional[str]:
+    name = getattr(tool, "name", "")
+    if name in TOOL_TEMPLATES:
+        return TOOL_TEMPLATES[name]
+    for category in getattr(tool, "categories", None) or []:
+        if category in CATEGORY_TEMPLATES:
+            return CATEGORY_TEMPLATES[category]
+    if getattr(tool, "outputs", None):
+        return DEFAULT_TEMPLATE
+    return None
+
+
+def render_tool_result(tool: Any, result_str: str) -> Optional[str]:
+    """Answer text for one tool result, or None if the LLM should phrase it."""
+    if str(result_str).startswith("[Viewport capture"):
+        return None
+    template = _template_for(tool)
+    if template is None:
+        return None
+    outputs = list(getattr(tool, "outputs", None) or {})
+    fields = parse_tool_result(result_str, outputs)
+    if fields is None or _is_failure(result_str, fields):
+        return None
+
+    shown = [k for k in (outputs or fields) if k in fields and k != "image_base64"]
+    values = {k: _format_value(v) for k, v in fields.items()}
+    values["tool"] = tool.name
+    values["summary"] = "\n".join(f"- {k}: {values[k]}" for k in shown)
+    try:
+        return template.format_map(values)
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+def template_answer(
+    items: List[Tuple[str, str]], tools: List[Any], mode: str = "auto"
+) -> Optional[str]:
+    """Render ``[(tool_name, result_str), …]`` into one answer.
+
+    Returns None when the caller should make the LLM synthesis call.
+    """
+    if mode == "llm" or not items:
+        metrics.incr("synthesis.llm")
+        return None
+    by_name = {t.name: t for t in tools}
+    parts: List[str] = []
+    for tool_name, result_str in items:
+        tool = by_name.get(tool_name)
+        # Templates need the full result, not an artifact stub
+        text = render_tool_result(tool, resolve(result_str)) if tool is not None else None
+        if text is None:
+            if mode != "template":
+                metrics.incr("synthesis.llm")
+                return None
+            text = f"{tool_name}: {result_str}"
+        parts.append(text)
+    metrics.incr("synthesis.template")
+    return "\n\n".join(parts)
@@ -6,6 +6,10 @@ Usage (from AgentApp/ directory):
 Commands during chat:
     reload   — re-fetch GH tools from the MCP server
     tools    — list currently loaded GH tools
+    stats    — show runtime metrics (plan speed-ups, cache hits, …)
+    plans    — list interrupted / partly failed plans
+    /resume <n|thread_id>  — resume a plan from its last successful step
+    synthesis auto|template|llm  — how tool results are turned into answers
     quit / exit / Ctrl-C  — exit
 """
 import os
@@ -51,7 +55,7 @@ def _banner():
     print(HR2)
     print("  Design Agent  (terminal mode)")
     print(HR2)
-    print("  Commands:  reload · tools · plan on/off · history · quit")
+    print("  Commands:  reload · tools · plan on/off · plans · /resume <n> · synthesis <mode> · history · stats · quit")
     print(HR)
 
 
@@ -77,21 +81,61 @@ def _reload_tools():
         print(f"  [reload] error: {exc}")
 
 
-def _run(graph, user_input: str, messages: list, force_plan: bool = False):
+def _print_plans(plans: list):
+    if not plans:
+        print("  [plans] no interrupted plans.")
+        return
+    print(f"  [plans] {len(plans)} resumable plan(s):")
+    for i, p in enumerate(plans, 1):
+        failed = f", failed: {', '.join(p['failed'])}" if p["failed"] else ""
+        print(f"    {i}. {p['thread_id']}  {p['done']}/{p['total']} steps{failed}")
+        print(f"       {p['user_input'][:80]}")
+
+
+def _run(graph, user_input: str, messages: list, force_plan: bool = False,
+         synthesis: str = None):
+    from graphs.checkpoints import finish_run, new_thread_id, run_config
     from models.state import BoxState
+    thread_id = new_thread_id("plan" if force_plan else "run")
     state = BoxState(
-        request={"user_input": user_input},
+        request={"user_input": user_input, "synthesis": synthesis},
         messages=list(messages),
         # Skip classifier — route straight to planner when plan mode is on
         request_type="plan" if force_plan else None,
+        history_run=thread_id,
     )
     print()
     print(f"  ┊ input: {user_input}")
     try:
-        result = graph.invoke(state, config={"recursion_limit": 50})
+        result = graph.invoke(state, config=run_config(thread_id))
+    except Exception as exc:
+        print(f"\n  [error] {exc}")
+        if finish_run(graph, thread_id):
+            print(f"  [plans] progress saved — type '/resume {thread_id}' to continue.")
+        return None
+    finish_run(graph, thread_id)
+    return _show_result(result)
+
+
+def _resume(graph, ref: str):
+    from graphs.checkpoints import list_interrupted_plans, resume_plan
+    thread_id = ref
+    if ref.isdigit():
+        plans = list_interrupted_plans(graph)
+        if not 1 <= int(ref) <= len(plans):
+            print(f"  [resume] no plan #{ref} — type 'plans' to list them.")
+            return None
+        thread_id = plans[int(ref) - 1]["thread_id"]
+    print(f"  [resume] {thread_id}")
+    try:
+        result = resume_plan(graph, thread_id)
     except Exception as exc:
         print(f"\n  [error] {exc}")
         return None
+    return _show_result(result)
+
+
+def _show_result(result: dict):
 
     answer = result.get("answer") or ""
     request_type  = result.get("request_type", "?")
@@ -138,8 +182,11 @@ def main():
     _print_tools()
     print()
 
+    from graphs.checkpoints import make_checkpointer
     from graphs.main_graph import build_main_graph
-    graph = build_main_graph()
+    from nodes.classification import warm_up_classifier
+    graph = build_main_graph(checkpointer=make_checkpointer())
+    warm_up_classifier()
 
     # ── save + open graph image on startup ───────────────────────────────────
     try:
@@ -157,6 +204,7 @@ def main():
 
     import settings as _s
     plan_mode: bool = _s.PLAN_MODE       # default from settings.py; toggled via 'plan on/off'
+    synthesis: str = _s.ANSWER_SYNTHESIS # toggled via 'synthesis auto|template|llm'
 
     while True:
         try:
@@ -177,6 +225,22 @@ def main():
         elif user_input.lower() == "tools":
             _print_tools()
             continue
+        elif user_input.lower() == "plans":
+            from graphs.checkpoints import list_interrupted_plans
+            _print_plans(list_interrupted_plans(graph))
+            print()
+            continue
+        elif user_input.split()[0].lower() == "/resume" and len(user_input.split()) <= 2:
+            ref = (user_input.split()[1:] or ["1"])[0]
+            answer = _resume(graph, ref)
+            if answer:
+                conversation_messages.append({"role": "assistant", "content": answer})
+            continue
+        elif user_input.lower() == "stats":
+            from utils import metrics
+            print(metrics.format_snapshot())
+            print()
+            continue
         elif user_input.lower() in ("history", "mem"):
             if not conversation_messages:
                 print("  (no conversation history yet)")
@@ -197,6 +261,14 @@ def main():
             print("  [plan mode] OFF  — back to normal routing.")
             print()
             continue
+        elif user_input.split()[0].lower() == "synthesis" and len(user_input.split()) <= 2:
+            from nodes.tool_use.synthesis import SYNTHESIS_MODES
+            mode = (user_input.lower().split()[1:] or [""])[0]
+            if mode in SYNTHESIS_MODES:
+                synthesis = mode
+            print(f"  [synthesis] {synthesis}  (options: {' · '.join(SYNTHESIS_MODES)})")
+            print()
+            continue
         elif user_input.lower() == "plan status":
             print(f"  [plan mode] {'ON' if plan_mode else 'OFF'}")
             print()
@@ -205,7 +277,8 @@ def main():
         if plan_mode:
             print("  [plan mode ON]")
 
-        answer = _run(graph, user_input, conversation_messages, force_plan=plan_mode)
+        answer = _run(graph, user_input, conversation_messages, force_plan=plan_mode,
+                      synthesis=synthesis)
 
         # Accumulate conversation memory (keep last 20 turns to avoid unbounded growth)
         conversation_messages.append({"role": "user", "content": user_input})
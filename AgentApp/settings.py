@@ -23,7 +23,136 @@ GEMINI_MODEL = "gemini-2.5-flash-lite"
 MCP_GH_ENDPOINT = "http://localhost:5100"
 MCP_TIMEOUT     = 30     # seconds
 
+# Several Rhino/GH workstations can serve tools at once. Their catalogs are
+# merged; stateless calls go to the least-loaded server exposing the tool,
+# calls that reference baked object GUIDs stay on the server that owns them.
+# A stateless call that cannot connect is retried on the next server.
+MCP_GH_ENDPOINTS = [MCP_GH_ENDPOINT]   # e.g. [..., "http://rhino-02:5100"]
+# GUID → server entries remembered for routing (least recently used dropped).
+MCP_GUID_OWNERS_MAX = 10_000
+# Tools without document side effects that the server does not flag
+# "readOnly" itself (e.g. read-only .gh tools); their calls may run in parallel.
+MCP_READ_ONLY_TOOLS = []     # e.g. ["measure_site"]
+
 # ── Plan mode default ─────────────────────────────────────────────────────────
 # True  → agent always decomposes prompts into multi-tool sequences
 # False → normal classifier-based routing (can still be toggled at runtime)
 PLAN_MODE = False
+
+# Independent plan steps (no depends_on link between them) run concurrently,
+# at most this many at a time. 1 → strictly sequential execution.
+PLAN_MAX_PARALLEL = 4
+
+# Let the planner emit concrete tool arguments for steps whose values are in
+# the request. Valid ones skip the per-step LLM call; others fall back to it.
+PLAN_CONCRETE_ARGS = True
+
+# Reuse plan structures for requests that only differ in their numbers.
+# Entries are dropped automatically when the loaded tools change.
+PLAN_CACHE             = True
+PLAN_CACHE_MAX_ENTRIES = 200
+
+# Plan loop guard: at most this many waves of steps; a plan that stops
+# making progress or runs out of waves ends with the results it has.
+PLAN_MAX_WAVES = 30
+
+# ── Input classification ──────────────────────────────────────────────────────
+# Route with the local classifier (nodes/intent_classifier.py) and only ask the
+# LLM when its confidence is below the threshold.  Tune with
+# `python evaluate_classifier.py`.
+INTENT_CLASSIFIER = True
+INTENT_CONFIDENCE_THRESHOLD = 0.85
+# LLM classifications kept in the classifier's training log (oldest dropped).
+INTENT_LOG_MAX_ENTRIES = 5000
+# While a routing LLM call is pending, start the predicted branch's first
+# read-only step (tool selection, plain answer) in the background.
+# Costs extra LLM calls when the prediction is wrong.
+SPECULATIVE_ROUTING = False
+
+# ── Tool execution ────────────────────────────────────────────────────────────
+# Several tool calls in one LLM message run concurrently, at most this many.
+TOOL_CALL_MAX_PARALLEL = 4
+# Route each call of a batch to its server first, then run the calls on a
+# server that gets a document-changing call one after another, in the order
+# issued; calls on other servers and read-only calls run in parallel.
+TOOL_CALL_SERIALIZE_MUTATIONS = True
+# How tool results become the answer: "auto" (templates from
+# config/result_templates.py, LLM when none fits), "template" or "llm".
+ANSWER_SYNTHESIS = "auto"
+
+# ── Local caches / on-disk state ──────────────────────────────────────────────
+CACHE_DIR = ".cache"     # relative to AgentApp/
+
+# Graph state is checkpointed to SQLite after every node, so interrupted or
+# partly failed plans can be listed and resumed ('plans' / 'resume' in the
+# REPL, GET /plans and POST /plans/{thread_id}/resume in the API).
+CHECKPOINT_FILE = "checkpoints.sqlite"   # inside CACHE_DIR
+
+# Tavily results are cached in SQLite by normalised query.  Fresh for
+# SEARCH_CACHE_TTL seconds; until SEARCH_CACHE_STALE_TTL the stale result is
+# returned at once and refreshed in the background; older entries are refetched.
+SEARCH_CACHE = True
+SEARCH_CACHE_FILE = "search_cache.sqlite"   # inside CACHE_DIR
+SEARCH_CACHE_TTL = 6 * 3600
+SEARCH_CACHE_STALE_TTL = 7 * 24 * 3600
+SEARCH_CACHE_MAX_ENTRIES = 1000
+
+# Local building-code retrieval: .txt / .md documents in CODE_DOCS_DIR are
+# indexed (BM25) and searched before the web.  The local results are used when
+# the best passage covers at least CODE_SEARCH_MIN_COVERAGE of the query terms.
+CODE_SEARCH = True
+CODE_DOCS_DIR = "data/building_codes"     # relative to AgentApp/
+CODE_INDEX_DIR = "code_index"             # inside CACHE_DIR
+CODE_INDEX_CHECK_SECONDS = 60             # how often to look for changed documents
+CODE_SEARCH_MIN_COVERAGE = 0.6
+
+# Broad questions are split into up to SEARCH_MAX_QUERIES sub-queries that run
+# concurrently; the merged results are de-duplicated (URL + content hash),
+# reranked against the question and cut to SEARCH_TOP_K.
+SEARCH_MAX_QUERIES = 3
+SEARCH_TOP_K = 5
+# Token budget for search passages in the answer prompt (best passages first).
+SEARCH_CONTEXT_TOKENS = 1500
+
+# ── State history ─────────────────────────────────────────────────────────────
+# state.history keeps compact records of the last HISTORY_MAX_ENTRIES node
+# events; fields longer than HISTORY_INLINE_CHARS are cut to a preview.  With
+# HISTORY_LOG every full entry is appended to HISTORY_LOG_FILE (read it with
+# utils.history.read_log or GET /history/{thread_id}).
+HISTORY_MAX_ENTRIES = 100
+HISTORY_INLINE_CHARS = 1000
+HISTORY_LOG = True
+HISTORY_LOG_FILE = "history.log"          # inside CACHE_DIR
+
+# ── Artifacts ─────────────────────────────────────────────────────────────────
+# Tool outputs longer than ARTIFACT_MIN_CHARS (geometry dumps, script JSON,
+# viewport captures) are stored once by content hash under ARTIFACT_DIR; state
+# and prompts carry a handle plus an ARTIFACT_PREVIEW_CHARS preview.  The most
+# recently used artifacts stay in memory up to ARTIFACT_MEMORY_BYTES.
+ARTIFACTS = True
+ARTIFACT_DIR = "artifacts"                # inside CACHE_DIR
+ARTIFACT_MIN_CHARS = 2000
+ARTIFACT_PREVIEW_CHARS = 300
+ARTIFACT_MEMORY_BYTES = 64 * 1024 * 1024
+
+# ── Building design ───────────────────────────────────────────────────────────
+# Size the box in closed form against config/design_rules.DESIGN_GUIDE
+# (tools/building/solver.py); the ReAct loop only runs when the solver
+# cannot decide.  False → always use the ReAct loop.
+DESIGN_SOLVER = True
+# Design parameters (area, floors, heights, ratio) are parsed from the request
+# text without an LLM; the LLM is only asked when the text is ambiguous.
+DESIGN_EXTRACTION_LLM = True
+# ReAct loop guard (when the solver is off or undecided): stop after this many
+# iterations, or earlier when the design repeats, and return the best design
+# found with its remaining issues.
+DESIGN_MAX_ITERATIONS = 8
+# Direct sizing (POST /design, tools/building/design.py): batches of at least
+# DESIGN_BATCH_MIN_PARALLEL sites run on a pool of DESIGN_BATCH_WORKERS
+# processes (0 → one per CPU); smaller ones run inline.
+DESIGN_BATCH_WORKERS = 0
+DESIGN_BATCH_MIN_PARALLEL = 2000
+DESIGN_BATCH_MAX_SITES = 100_000
+# Design-space sweeps (POST /design/sweep, sweep_design_space) larger than
+# this many candidates are rejected.
+SWEEP_MAX_CANDIDATES = 5_000_000
@@ -5,6 +5,7 @@ Sub-packages
 ────────────
   tools/mcp/       Dynamic tools loaded from the GH MCP Server (Grasshopper).
   tools/search/    Web-search tool (Tavily-backed).
+  tools/retrieval/ Local building-code search (on-disk BM25 index).
   tools/building/  Static building-calculation helpers (design_building branch).
   tools/base.py    BaseAgentTool — subclass this when adding a new tool.
 
@@ -13,13 +14,21 @@ Public API (backward-compatible)
   TOOL_CLASSES        List[BaseTool]  auto-loaded from MCP server at startup
   load_mcp_tools()    → List[BaseTool]
   reload_mcp_tools()  → List[BaseTool]  re-fetches from running GH server
+  tool_registry_version(tools) → str   changes whenever tools/schemas change
 """
 
-from .mcp import TOOL_CLASSES, DynamicMCPTool, load_mcp_tools, reload_mcp_tools
+from .mcp import (
+    TOOL_CLASSES,
+    DynamicMCPTool,
+    load_mcp_tools,
+    reload_mcp_tools,
+    tool_registry_version,
+)
 
 __all__ = [
     "TOOL_CLASSES",
     "DynamicMCPTool",
     "load_mcp_tools",
     "reload_mcp_tools",
+    "tool_registry_version",
 ]
@@ -25,11 +25,13 @@ Notes
   concrete subclass must implement it.
 - ``args_schema`` (a Pydantic model) is recommended for structured inputs.
   See ``tools/mcp/loader.py`` for an example of building one from JSON Schema.
+  ``validate_tool_args`` checks arguments against it without calling the tool.
 """
 
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain_core.tools import BaseTool
+from pydantic import BaseModel, ValidationError
 
 
 class BaseAgentTool(BaseTool):
@@ -44,3 +46,31 @@ class BaseAgentTool(BaseTool):
     async def _arun(self, **kwargs) -> str:  # type: ignore[override]
         """Default async implementation — runs the sync version."""
         return self._run(**kwargs)
+
+
+def validate_tool_args(
+    tool: BaseTool, args: Any
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Validate *args* locally against ``tool.args_schema``.
+
+    Returns ``(clean_args, None)`` on success — values coerced to the declared
+    types, unset optionals dropped — or ``(None, error_message)``.
+    Unknown argument names are rejected rather than silently ignored.
+    """
+    if not isinstance(args, dict):
+        return None, f"arguments must be an object, got {type(args).__name__}"
+    schema = tool.args_schema
+    if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+        return dict(args), None
+
+    unknown = sorted(set(args) - set(schema.model_fields))
+    if unknown:
+        return None, f"unexpected argument(s) for {tool.name}: {', '.join(unknown)}"
+    try:
+        model = schema.model_validate(args)
+    except ValidationError as exc:
+        problems = "; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()
+        )
+        return None, f"invalid arguments for {tool.name}: {problems}"
+    return model.model_dump(exclude_none=True), None
@@ -4,6 +4,10 @@ tools/building — Static building-calculation tools for the design_building bra
 Usage
 -----
     from tools.building import calculate_aspect_ratio, calculate_total_height
+    from tools.building import design_rules   # compiled DESIGN_GUIDE (scalar + batch checks)
+    from tools.building import solve_box      # closed-form sizing against DESIGN_GUIDE
+    from tools.building import sweep_design   # vectorised grid sweep + Pareto front
+    from tools.building import design, design_many   # direct sizing, /chat response shape
 """
 
 from .tools import (
@@ -16,14 +20,30 @@ from .tools import (
     calculate_window_area,
     compute_other_dimension,
 )
+from .rules import RuleSet, compile_rules, design_rules, format_issue
+from .solver import solve_box
+from .design import design, design_many, format_design
+from .sweep import DesignSweepTool, sweep_design, sweep_design_space, sweep_summary
 
 __all__ = [
     "ComputeOtherDimensionTool",
     "CalculateAspectRatioTool",
     "CalculateTotalHeightTool",
     "CalculateWindowAreaTool",
+    "DesignSweepTool",
+    "RuleSet",
     "compute_other_dimension",
     "calculate_aspect_ratio",
     "calculate_total_height",
     "calculate_window_area",
+    "sweep_design_space",
+    "compile_rules",
+    "design_rules",
+    "format_issue",
+    "design",
+    "design_many",
+    "format_design",
+    "solve_box",
+    "sweep_design",
+    "sweep_summary",
 ]
@@ -0,0 +1,168 @@
+"""
+Direct design API — rule-checked sizing without the graph.
+
+/chat sends a design request through classification and the design_building
+branch.  The sizing itself is arithmetic, so this module runs the same
+closed-form solver (tools/building/solver.py) directly and answers in the
+design branch's response shape:
+
+    {"response": "Building Design Results: …", "type": "design",
+     "data": {"box": {…}, "compliant": True, "issues": []}}
+
+A parameter set is a dict of ``area`` / ``n_floors`` / ``floor_height``
+(optionally ``width``, ``depth`` or ``aspect_ratio``); a ``message`` is parsed
+for the values it leaves out, as extract_params_fn does (without the LLM).
+
+Batches are cut into chunks and sized on a process pool of
+DESIGN_BATCH_WORKERS processes; batches smaller than
+DESIGN_BATCH_MIN_PARALLEL run inline, where handing them to the pool costs
+more than it saves.  Metrics: ``design_batch.sites``, ``design_batch.seconds``.
+
+Usage
+-----
+    design({"area": 1000, "n_floors": 3})
+    design({"message": "a 3-storey office of 10,000 sq ft"})
+    design_many([{"area": a} for a in areas])      # results in input order
+"""
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.design_rules import DESIGN_GUIDE
+from tools.building.solver import solve_box
+from utils import metrics
+
+try:
+    from app.config import DESIGN_BATCH_MIN_PARALLEL, DESIGN_BATCH_WORKERS
+except ImportError:
+    DESIGN_BATCH_WORKERS = 0          # 0 → one per CPU
+    DESIGN_BATCH_MIN_PARALLEL = 2000
+
+# Chunks per worker: enough to even out uneven chunks, few enough to keep
+# pickling overhead small
+CHUNKS_PER_WORKER = 4
+
+
+def format_design(box: Optional[Dict[str, Any]], compliant: Any, issues: List[str]) -> Dict[str, Any]:
+    """Response payload of the design_building branch (shared with /chat)."""
+    box = box or {}
+    response_text = "Building Design Results:\n"
+    response_text += f"Compliant: {compliant}\n"
+
+    if issues:
+        response_text += f"Issues: {', '.join(issues)}\n"
+
+    response_text += "\nDimensions:\n"
+    for key, value in box.items():
+        if value is not None:
+            if isinstance(value, float):
+                response_text += f"- {key}: {value:.2f}\n"
+            else:
+                response_text += f"- {key}: {value}\n"
+
+    return {
+        "response": response_text,
+        "type": "design",
+        "data": {
+            "box": box,
+            "compliant": compliant,
+            "issues": issues
+        }
+    }
+
+
+def _resolve_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Explicit values, completed from ``message`` when one is given."""
+    params = {k: v for k, v in params.items() if v is not None}
+    message = params.pop("message", None)
+    if message:
+        from nodes.building_design.extraction import extract_design_params
+        parsed, _ = extract_design_params(message)
+        params = {**parsed, **params}
+    return params
+
+
+def design(params: Dict[str, Any], rules: List[Dict[str, Any]] = DESIGN_GUIDE) -> Dict[str, Any]:
+    """Size one box for *params* and return it in the design response shape."""
+    if not isinstance(params, dict):
+        return format_design(None, False, [f"Invalid design parameters: {params!r}"])
+    result = solve_box(_resolve_params(params), rules)
+    if result["status"] == "undecided":
+        return format_design(None, False, [f"Solver could not decide: {'; '.join(result['issues'])}"])
+    return format_design(result["box"], result["status"] == "feasible", result["issues"])
+
+
+def _design_chunk(param_sets: List[Dict[str, Any]], rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Worker entry point: size one chunk of a batch."""
+    return [design(params, rules) for params in param_sets]
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _worker_count(workers: Optional[int]) -> int:
+    workers = DESIGN_BATCH_WORKERS if workers is None else workers
+    return workers if workers and workers > 0 else (os.cpu_count() or 1)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """The shared process pool, (re)created when the worker count changes."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool, _pool_workers = ProcessPoolExecutor(max_workers=workers), workers
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+atexit.register(_reset_pool)
+
+
+def design_many(
+    param_sets: Iterable[Dict[str, Any]],
+    rules: List[Dict[str, Any]] = DESIGN_GUIDE,
+    workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Size every parameter set; results are in input order.
+
+    *workers* overrides DESIGN_BATCH_WORKERS (0 → one per CPU, 1 → inline).
+    """
+    started = time.perf_counter()
+    param_sets = list(param_sets)
+    workers = _worker_count(workers)
+
+    results: Optional[List[Dict[str, Any]]] = None
+    if workers > 1 and len(param_sets) >= DESIGN_BATCH_MIN_PARALLEL:
+        size = -(-len(param_sets) // (workers * CHUNKS_PER_WORKER))
+        chunks = [param_sets[i:i + size] for i in range(0, len(param_sets), size)]
+        try:
+            pool = _get_pool(workers)
+            results = [
+                result
+                for chunk in pool.map(_design_chunk, chunks, [rules] * len(chunks))
+                for result in chunk
+            ]
+        except BrokenProcessPool:
+            # A worker died — size this batch inline; the next one gets a new pool
+            _reset_pool()
+    if results is None:
+        results = _design_chunk(param_sets, rules)
+
+    metrics.incr("design_batch.sites", len(param_sets))
+    metrics.observe("design_batch.seconds", time.perf_counter() - started)
+    return results
@@ -0,0 +1,316 @@
+"""
+Compiled design-rule engine.
+
+The declarative rules in config/design_rules.DESIGN_GUIDE are compiled once
+into predicates that work on plain numbers (one box) and on NumPy arrays
+(a batch of candidates) alike.  Two rule kinds exist:
+
+    range     {"type": "depth", "max": 50}            value within [min, max]
+    required  {"type": "emergency_exits",
+               "condition": "area > 500"}             value truthy when the
+                                                      condition holds
+
+``type`` names the box field the rule checks (``ratio`` → aspect_ratio;
+``window_area_ratio`` is derived as window_area / area).  Any rule may carry
+a ``condition`` of ``<field> <op> <number>`` clauses joined by and / or; the
+rule only applies where it holds.  Ids default to ``<type>_min`` /
+``<type>_max`` (or ``<type>`` for two-sided and required rules) unless the
+rule sets ``"id"``.
+
+Each rule knows the box fields it reads (checked field, inputs of derived
+fields, condition fields, plus an optional ``"reads"`` list), so
+``violations_incremental`` re-runs only the rules whose inputs changed.
+
+Usage
+-----
+    rules = compile_rules(DESIGN_GUIDE)
+    rules.violations(box)          # → [{id, rule, field, value, bound, limit, margin}, …]
+    found, cache, stats = rules.violations_incremental(box, cache)   # only changed fields
+    mask, failures = rules.check_batch({"width": w, "depth": d, …})
+"""
+import hashlib
+import json
+import operator
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.design_rules import DESIGN_GUIDE
+
+# Comparisons allow this much floating-point slack (e.g. a ratio of exactly 1/3)
+EPS = 1e-9
+
+_FIELD_ALIASES = {"ratio": "aspect_ratio"}
+# Derived fields: name → (fields read, function of a values dict)
+DERIVED: Dict[str, Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], Any]]] = {
+    "window_area_ratio": (("window_area", "area"), lambda v: v["window_area"] / v["area"]),
+}
+
+_CLAUSE_RE = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*(-?\d+(?:\.\d+)?)\s*$")
+_OPS = {
+    "<": operator.lt, "<=": operator.le, ">": operator.gt,
+    ">=": operator.ge, "==": operator.eq, "!=": operator.ne,
+}
+
+
+def compile_condition(text: str) -> Tuple[Callable[[Dict[str, Any]], Any], Tuple[str, ...]]:
+    """``"area > 500 and n_floors >= 2"`` → ``(predicate(values), fields)``.
+
+    ``and`` binds tighter than ``or``; the predicate works on scalars and arrays.
+    """
+    alternatives = []
+    fields: List[str] = []
+    for alternative in re.split(r"\s+or\s+", text.strip()):
+        clauses = []
+        for clause in re.split(r"\s+and\s+", alternative):
+            m = _CLAUSE_RE.match(clause)
+            if not m:
+                raise ValueError(f"cannot compile condition {text!r}")
+            field, op, number = m.group(1), _OPS[m.group(2)], float(m.group(3))
+            clauses.append((field, op, number))
+            if field not in fields:
+                fields.append(field)
+        alternatives.append(clauses)
+
+    def predicate(values: Dict[str, Any]) -> Any:
+        result = False
+        for clauses in alternatives:
+            term = True
+            for field, op, number in clauses:
+                term = term & op(field_value(values, field), number)
+            result = result | term
+        return result
+
+    return predicate, tuple(fields)
+
+
+def field_value(values: Dict[str, Any], field: str) -> Any:
+    """*field* from *values*, computing derived fields (None if an input is missing)."""
+    if field in values:
+        return values[field]
+    if field in DERIVED:
+        inputs, fn = DERIVED[field]
+        if any(values.get(f) is None for f in inputs):
+            return None
+        return fn(values)
+    return None
+
+
+class Rule:
+    """One compiled DESIGN_GUIDE entry."""
+
+    def __init__(self, spec: Dict[str, Any], rule_id: str) -> None:
+        self.spec = spec
+        self.id = rule_id
+        self.text: str = spec.get("rule", rule_id)
+        self.type: str = spec["type"]
+        self.field: str = _FIELD_ALIASES.get(self.type, self.type)
+        self.min: Optional[float] = spec.get("min")
+        self.max: Optional[float] = spec.get("max")
+        self.kind = "range" if (self.min is not None or self.max is not None) else "required"
+        self.condition: Optional[str] = spec.get("condition")
+        self._applies, self.condition_fields = (
+            compile_condition(self.condition) if self.condition else (None, ())
+        )
+        # Box fields the rule reads — its checked field (or the inputs of a
+        # derived one), its condition's fields and any declared "reads"
+        reads: List[str] = []
+        for field in (self.field, *self.condition_fields):
+            for name in DERIVED[field][0] if field in DERIVED else (field,):
+                if name not in reads:
+                    reads.append(name)
+        for name in spec.get("reads", ()):
+            if name not in reads:
+                reads.append(name)
+        self.reads: Tuple[str, ...] = tuple(reads)
+        lo = None if self.min is None else self.min - EPS
+        hi = None if self.max is None else self.max + EPS
+        if self.kind == "required":
+            self._ok = lambda v: v == True  # noqa: E712 — elementwise on arrays
+        elif lo is not None and hi is not None:
+            self._ok = lambda v: (v >= lo) & (v <= hi)
+        elif lo is not None:
+            self._ok = lambda v: v >= lo
+        else:
+            self._ok = lambda v: v <= hi
+
+    def applies(self, values: Dict[str, Any]) -> Any:
+        """Whether the rule's condition holds (True without a condition)."""
+        return True if self._applies is None else self._applies(values)
+
+    def holds(self, values: Dict[str, Any]) -> Any:
+        """Batch-friendly check: bool, or a bool array for array inputs."""
+        return ~np.asarray(self.applies(values), dtype=bool) | self._ok(field_value(values, self.field))
+
+    def margin(self, value: float) -> Optional[float]:
+        """Distance to the nearest bound; negative when violated."""
+        if self.kind != "range":
+            return None
+        sides = []
+        if self.min is not None:
+            sides.append(value - self.min)
+        if self.max is not None:
+            sides.append(self.max - value)
+        return min(sides)
+
+    def evaluate(self, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The violation dict for one box, or None when the rule is met."""
+        try:
+            if not self.applies(values):
+                return None
+            value = field_value(values, self.field)
+            if value is not None and self._ok(value):
+                return None
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as exc:
+            return self._violation(None, error=str(exc))
+        return self._violation(value)
+
+    def _violation(self, value: Any, error: Optional[str] = None) -> Dict[str, Any]:
+        if self.kind == "required":
+            bound, limit = "required", True
+        elif self.min is not None and (self.max is None or value is None or value < self.min):
+            bound, limit = "min", self.min
+        else:
+            bound, limit = "max", self.max
+        violation = {
+            "id": self.id,
+            "rule": self.text,
+            "field": self.field,
+            "value": value,
+            "bound": bound,
+            "limit": limit,
+            "margin": self.margin(value) if isinstance(value, (int, float)) else None,
+        }
+        if error:
+            violation["error"] = error
+        return violation
+
+    def describe(self) -> str:
+        """Guide line: rule text plus its bounds or condition."""
+        if self.min is not None and self.max is not None:
+            return f"{self.text} (Min: {self.min}, Max: {self.max})"
+        if self.min is not None:
+            return f"{self.text} (Min: {self.min})"
+        if self.max is not None:
+            return f"{self.text} (Max: {self.max})"
+        if self.condition:
+            return f"{self.text} (When: {self.condition})"
+        return self.text
+
+
+def _rule_id(spec: Dict[str, Any]) -> str:
+    if "id" in spec:
+        return str(spec["id"])
+    has_min, has_max = spec.get("min") is not None, spec.get("max") is not None
+    if has_min != has_max:
+        return f"{spec['type']}_{'min' if has_min else 'max'}"
+    return str(spec["type"])
+
+
+class RuleSet:
+    """A compiled list of rules."""
+
+    def __init__(self, specs: List[Dict[str, Any]]) -> None:
+        self.rules: List[Rule] = []
+        seen: Dict[str, int] = {}
+        for spec in specs:
+            rule_id = _rule_id(spec)
+            seen[rule_id] = seen.get(rule_id, 0) + 1
+            if seen[rule_id] > 1:
+                rule_id = f"{rule_id}_{seen[rule_id]}"
+            self.rules.append(Rule(spec, rule_id))
+        self.key = hashlib.sha1(json.dumps(specs, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        # field → indices of the rules that read it
+        self.readers: Dict[str, List[int]] = {}
+        for i, rule in enumerate(self.rules):
+            for field in rule.reads:
+                self.readers.setdefault(field, []).append(i)
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def violations(self, box: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Structured violations of *box*, in rule order."""
+        out = []
+        for rule in self.rules:
+            violation = rule.evaluate(box)
+            if violation is not None:
+                out.append(violation)
+        return out
+
+    def violations_incremental(
+        self, box: Dict[str, Any], cache: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, int]]:
+        """Like ``violations``, re-evaluating only rules whose fields changed.
+
+        *cache* is the dict returned by the previous call for the same rule
+        set (``{}`` or None for a full check).  Returns ``(violations,
+        new_cache, {"evaluated": n, "reused": m})``.
+        """
+        cached = cache or {}
+        previous: Dict[str, Any] = cached.get("box", {})
+        results: Dict[str, Any] = cached.get("results", {})
+        if cached.get("key") != self.key or len(results) != len(self.rules):
+            dirty = range(len(self.rules))
+        else:
+            changed = [
+                field for field in self.readers
+                if field not in previous or previous[field] != box.get(field)
+            ]
+            dirty = sorted({i for field in changed for i in self.readers[field]})
+
+        results = dict(results)
+        for i in dirty:
+            rule = self.rules[i]
+            results[rule.id] = rule.evaluate(box)
+
+        snapshot = {field: box.get(field) for field in self.readers}
+        violations = [results[r.id] for r in self.rules if results.get(r.id) is not None]
+        stats = {"evaluated": len(dirty), "reused": len(self.rules) - len(dirty)}
+        return violations, {"key": self.key, "box": snapshot, "results": results}, stats
+
+    def check_batch(self, values: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, int]]:
+        """``(feasible_mask, {rule_id: n_failing})`` for broadcastable value arrays."""
+        shape = np.broadcast_shapes(*(np.shape(v) for v in values.values()))
+        mask = np.ones(shape, dtype=bool)
+        failures: Dict[str, int] = {}
+        for rule in self.rules:
+            if field_value(values, rule.field) is None:
+                raise ValueError(f"rule {rule.id} reads {rule.field!r}, which is not in the batch")
+            ok = rule.holds(values)
+            failures[rule.id] = int(np.broadcast_to(~ok, shape).sum())
+            np.logical_and(mask, ok, out=mask)
+        return mask, failures
+
+    def describe(self) -> List[str]:
+        return [rule.describe() for rule in self.rules]
+
+
+def format_issue(violation: Dict[str, Any]) -> str:
+    """Issue string for state.issues."""
+    if "error" in violation:
+        return f"Error checking {violation['id']}: {violation['error']}"
+    return f"Failed {violation['id']}: {violation['rule']}"
+
+
+_cache: Dict[str, RuleSet] = {}
+_cache_lock = threading.Lock()
+
+
+def compile_rules(specs: Optional[List[Dict[str, Any]]] = None) -> RuleSet:
+    """Compiled RuleSet for *specs* (DESIGN_GUIDE by default), cached by content."""
+    specs = DESIGN_GUIDE if specs is None else specs
+    key = json.dumps(specs, sort_keys=True, default=str)
+    with _cache_lock:
+        ruleset = _cache.get(key)
+        if ruleset is None:
+            ruleset = _cache[key] = RuleSet(specs)
+        return ruleset
+
+
+design_rules = compile_rules(DESIGN_GUIDE)
@@ -0,0 +1,153 @@
+"""
+Closed-form solver for the design_building branch.
+
+Every rule in config/design_rules.DESIGN_GUIDE is an interval constraint on
+one quantity.  With the requested ``area`` (footprint, as in draw_box_fn),
+``n_floors`` and ``floor_height`` fixed, the only free dimension is the
+width w — depth and aspect ratio follow from it:
+
+    width          w                  ∈ [min, max]
+    depth          area / w           ∈ [min, max]  →  w ∈ [area/max, area/min]
+    ratio          w / depth = w²/area ∈ [min, max] →  w ∈ [√(min·area), √(max·area)]
+
+Intersecting these gives the feasible width interval; the window area and
+emergency exits are set to the smallest compliant value, and the resulting
+box is checked with the compiled rules (tools/building/rules.py), which also
+covers the fixed quantities (area, floors, floor height, height).
+
+A requested ``width``, ``depth`` or ``aspect_ratio`` fixes the width
+instead; the solver then only checks it.
+
+``solve_box`` returns status "feasible" (a compliant box), "infeasible"
+(the conflicting rules, with the closest box) or "undecided" (a rule or
+input the solver does not model — the ReAct loop takes over).
+"""
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.design_rules import DESIGN_GUIDE
+from tools.building.rules import Rule, compile_rules, format_issue
+
+DEFAULTS = {"area": 800, "n_floors": 2, "floor_height": 3}
+
+_FIXED = ("area", "n_floors", "floor_height", "height")
+_WIDTH_FIELDS = ("width", "depth", "aspect_ratio")
+
+
+def width_bounds(rule: Rule, area: float) -> Tuple[float, float]:
+    """Interval of widths that satisfies one width / depth / aspect-ratio rule."""
+    lo, hi = rule.min, rule.max
+    if rule.field == "width":
+        return (lo if lo is not None else 0.0), (hi if hi is not None else math.inf)
+    if rule.field == "depth":
+        return (area / hi if hi else 0.0), (area / lo if lo else math.inf)
+    # aspect ratio = w² / area
+    return (math.sqrt(lo * area) if lo else 0.0), (math.sqrt(hi * area) if hi is not None else math.inf)
+
+
+def build_box(width: float, area: float, n_floors: int, floor_height: float,
+              window_area: Optional[float], emergency_exits: Optional[bool]) -> Dict[str, Any]:
+    """Box dict in the same shape draw_box_fn produces."""
+    depth = area / width if width else None
+    return {
+        "width": width,
+        "depth": depth,
+        "area": area,
+        "n_floors": n_floors,
+        "floor_height": floor_height,
+        "height": n_floors * floor_height,
+        "aspect_ratio": width / depth if depth else None,
+        "emergency_exits": emergency_exits,
+        "window_area": window_area,
+    }
+
+
+def _requested_width(params: Dict[str, Any], area: float) -> Optional[float]:
+    """Width implied by a requested width, depth or aspect ratio (None if none)."""
+    try:
+        if params.get("width"):
+            return float(params["width"])
+        if params.get("depth"):
+            return area / float(params["depth"])
+        if params.get("aspect_ratio"):
+            return math.sqrt(float(params["aspect_ratio"]) * area)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return None
+
+
+def _undecided(reason: str) -> Dict[str, Any]:
+    return {"status": "undecided", "box": None, "issues": [reason], "violations": [],
+            "width_range": None, "binding": []}
+
+
+def solve_box(params: Dict[str, Any], rules: List[Dict[str, Any]] = DESIGN_GUIDE) -> Dict[str, Any]:
+    """Size a box for *params* against *rules*.
+
+    Returns ``{"status", "box", "issues", "violations", "width_range", "binding"}``.
+    """
+    try:
+        area = float(params.get("area") or DEFAULTS["area"])
+        n_floors = int(params.get("n_floors") or DEFAULTS["n_floors"])
+        floor_height = float(params.get("floor_height") or DEFAULTS["floor_height"])
+    except (TypeError, ValueError):
+        return _undecided("non-numeric design parameters")
+    if area <= 0 or n_floors <= 0 or floor_height <= 0:
+        return _undecided("design parameters must be positive")
+    try:
+        ruleset = compile_rules(rules)
+    except (KeyError, ValueError) as exc:
+        return _undecided(f"cannot compile rules: {exc}")
+
+    fixed = {"area": area, "n_floors": n_floors, "floor_height": floor_height,
+             "height": n_floors * floor_height}
+    lo, hi = 1e-9, math.inf
+    lo_rule = hi_rule = None
+    window_ratio = 0.0
+    exits = False
+
+    for rule in ruleset:
+        if not set(rule.condition_fields) <= set(fixed):
+            return _undecided(f"condition of {rule.id} depends on the width")
+        if not rule.applies(fixed):
+            continue
+        if rule.field in _FIXED:
+            continue                        # checked on the final box
+        if rule.field in _WIDTH_FIELDS and rule.kind == "range":
+            r_lo, r_hi = width_bounds(rule, area)
+            if r_lo > lo:
+                lo, lo_rule = r_lo, rule
+            if r_hi < hi:
+                hi, hi_rule = r_hi, rule
+        elif rule.field == "window_area_ratio" and rule.max is None:
+            window_ratio = max(window_ratio, rule.min or 0.0)
+        elif rule.field == "emergency_exits" and rule.kind == "required":
+            exits = True
+        else:
+            return _undecided(f"unsupported rule {rule.id}")
+
+    window_area = math.ceil(window_ratio * area * 100) / 100 if window_ratio else None
+    binding: List[str] = []
+    requested = _requested_width(params, area)
+    if requested is not None:
+        # The user fixed the plan shape — check it rather than choose one
+        width = requested
+    elif lo <= hi:
+        # Middle of the feasible interval — the most slack against both bounds
+        width = (lo + hi) / 2 if math.isfinite(hi) else lo
+        width = round(width, 2) if lo <= round(width, 2) <= hi else width
+    else:
+        # Empty interval: the two rules whose bounds cross are the conflict
+        width = hi
+        binding = [r.text for r in (lo_rule, hi_rule) if r]
+
+    box = build_box(width, area, n_floors, floor_height, window_area, exits)
+    violations = ruleset.violations(box)
+    return {
+        "status": "infeasible" if violations else "feasible",
+        "box": box,
+        "issues": [format_issue(v) for v in violations],
+        "violations": violations,
+        "width_range": [lo, hi if math.isfinite(hi) else None],
+        "binding": binding,
+    }
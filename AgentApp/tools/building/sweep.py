@@ -0,0 +1,257 @@
+"""
+Vectorised design-space sweep for the design_building branch.
+
+Candidate massings are the Cartesian product of four axes — width,
+n_floors, floor_height and window_ratio — for one footprint ``area``
+(depth = area / width, as in draw_box_fn).  The compiled DESIGN_GUIDE rules
+(tools/building/rules.py) are evaluated as NumPy predicates over the
+broadcast grid, so a sweep never materialises the full candidate table:
+only the feasible rows are gathered.
+
+The feasible set is then reduced to its Pareto front on the requested
+objectives, e.g. ``{"total_area": "max", "height": "min"}``.
+
+Usage
+-----
+    result = sweep_design(800, objectives={"total_area": "max", "height": "min"})
+    result["n_feasible"], records(result["front"])
+
+Axes accept a list of values or ``{"min", "max", "step"}`` (or ``"steps"``).
+Grids of more than SWEEP_MAX_CANDIDATES candidates are rejected before any
+array is allocated.
+"""
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config.design_rules import DESIGN_GUIDE
+from tools.base import BaseAgentTool
+from tools.building.rules import compile_rules
+from utils import metrics
+
+try:
+    from app.config import SWEEP_MAX_CANDIDATES
+except ImportError:
+    SWEEP_MAX_CANDIDATES = 5_000_000
+
+AXES = ("width", "n_floors", "floor_height", "window_ratio")
+
+DEFAULT_AXES: Dict[str, Any] = {
+    "width": {"min": 5, "max": 40, "step": 0.25},
+    "n_floors": [1, 2, 3, 4, 5, 6, 7, 8],
+    "floor_height": {"min": 2.5, "max": 5.5, "step": 0.1},
+    "window_ratio": {"min": 0.05, "max": 0.4, "step": 0.05},
+}
+DEFAULT_OBJECTIVES = {"total_area": "max", "height": "min"}
+
+METRICS = (
+    "width", "depth", "aspect_ratio", "n_floors", "floor_height", "height",
+    "window_ratio", "window_area", "total_area",
+)
+
+
+def axis_size(spec: Any) -> int:
+    """Number of values *spec* expands to, without building them."""
+    if isinstance(spec, dict):
+        lo, hi = float(spec["min"]), float(spec["max"])
+        if "steps" in spec:
+            return max(0, int(spec["steps"]))
+        step = float(spec.get("step", 1))
+        if step <= 0:
+            raise ValueError("axis step must be positive")
+        return max(0, int(np.floor((hi - lo) / step + 1e-9)) + 1)
+    return int(np.size(spec))
+
+
+def axis_values(spec: Any) -> np.ndarray:
+    """1-D array of the values for one axis spec."""
+    if isinstance(spec, dict):
+        lo, hi = float(spec["min"]), float(spec["max"])
+        if "steps" in spec:
+            values = np.linspace(lo, hi, axis_size(spec))
+        else:
+            step = float(spec.get("step", 1))
+            values = lo + step * np.arange(axis_size(spec))
+    else:
+        values = np.atleast_1d(np.asarray(spec, dtype=float))
+    if values.size == 0 or values.ndim != 1:
+        raise ValueError(f"empty or malformed axis: {spec!r}")
+    if np.any(values <= 0):
+        raise ValueError(f"axis values must be positive: {spec!r}")
+    return values
+
+
+def derive(area: float, width, n_floors, floor_height, window_ratio) -> Dict[str, np.ndarray]:
+    """Derived metrics for broadcastable input arrays."""
+    depth = area / width
+    return {
+        "width": width,
+        "depth": depth,
+        "aspect_ratio": width / depth,
+        "n_floors": n_floors,
+        "floor_height": floor_height,
+        "height": n_floors * floor_height,
+        "window_ratio": window_ratio,
+        "window_area": window_ratio * area,
+        "total_area": n_floors * area,
+    }
+
+
+def pareto_front(costs: np.ndarray) -> np.ndarray:
+    """Indices of the non-dominated rows of *costs* (every column minimised).
+
+    Identical rows are collapsed first; the first row of each is returned.
+    """
+    if len(costs) == 0:
+        return np.arange(0)
+    unique, first = np.unique(costs, axis=0, return_index=True)
+    keep = np.arange(len(unique))
+    i = 0
+    while i < len(unique):
+        row = unique[i]
+        dominated = np.all(row <= unique, axis=1) & np.any(row < unique, axis=1)
+        unique, keep = unique[~dominated], keep[~dominated]
+        i = int(np.count_nonzero(~dominated[:i])) + 1
+    return first[keep]
+
+
+def sweep_design(
+    area: float,
+    axes: Optional[Dict[str, Any]] = None,
+    objectives: Optional[Dict[str, str]] = None,
+    rules: List[Dict[str, Any]] = DESIGN_GUIDE,
+    max_candidates: int = SWEEP_MAX_CANDIDATES,
+) -> Dict[str, Any]:
+    """Evaluate every candidate on the grid against *rules*.
+
+    Raises ValueError for grids of more than *max_candidates* candidates.
+
+    Returns ``{"area", "n_candidates", "n_feasible", "rule_failures",
+    "objectives", "emergency_exits", "feasible", "front", "seconds"}`` where
+    ``feasible`` and ``front`` map each metric to a 1-D array.
+    """
+    started = time.perf_counter()
+    area = float(area)
+    if area <= 0:
+        raise ValueError("area must be positive")
+    objectives = dict(objectives or DEFAULT_OBJECTIVES)
+    for name, sense in objectives.items():
+        if name not in METRICS or sense not in ("min", "max"):
+            raise ValueError(f"bad objective {name}={sense!r}; metrics: {', '.join(METRICS)}")
+
+    spec = {**DEFAULT_AXES, **(axes or {})}
+    n_candidates = math.prod(axis_size(spec[a]) for a in AXES)
+    if n_candidates > max_candidates:
+        raise ValueError(
+            f"sweep of {n_candidates:,} candidates exceeds the limit of {max_candidates:,}; "
+            "use coarser steps or narrower axes"
+        )
+    values = [axis_values(spec[a]) for a in AXES]
+    shape = tuple(len(v) for v in values)
+    grid = derive(area, *(
+        v.reshape([-1 if i == k else 1 for i in range(len(AXES))]) for k, v in enumerate(values)
+    ))
+    grid["area"] = np.float64(area)
+
+    ruleset = compile_rules(rules)
+    # Exits are added wherever a rule requires them
+    exits = any(
+        bool(rule.applies({"area": area}))
+        for rule in ruleset if rule.field == "emergency_exits" and rule.kind == "required"
+    )
+    grid["emergency_exits"] = exits
+    feasible, failures = ruleset.check_batch(grid)
+    rule_failures = {rule.text: failures[rule.id] for rule in ruleset if rule.field != "emergency_exits"}
+
+    # Gather only the feasible rows
+    idx = np.unravel_index(np.flatnonzero(feasible), shape)
+    rows = derive(area, *(v[i] for v, i in zip(values, idx)))
+
+    front_rows: Dict[str, np.ndarray] = {k: v[:0] for k, v in rows.items()}
+    if len(rows["width"]):
+        costs = np.column_stack([
+            rows[name] if sense == "min" else -rows[name] for name, sense in objectives.items()
+        ])
+        front = pareto_front(costs)
+        front = front[np.lexsort(costs[front].T[::-1])]
+        front_rows = {k: v[front] for k, v in rows.items()}
+
+    seconds = time.perf_counter() - started
+    metrics.incr("design_sweep.runs")
+    metrics.observe("design_sweep.seconds", seconds)
+    return {
+        "area": area,
+        "n_candidates": int(feasible.size),
+        "n_feasible": int(len(rows["width"])),
+        "rule_failures": rule_failures,
+        "objectives": objectives,
+        "emergency_exits": exits,
+        "feasible": rows,
+        "front": front_rows,
+        "seconds": seconds,
+    }
+
+
+def records(columns: Dict[str, np.ndarray], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Column arrays → list of row dicts (plain floats, rounded for display)."""
+    n = len(columns["width"]) if limit is None else min(limit, len(columns["width"]))
+    out = []
+    for i in range(n):
+        row = {k: round(float(v[i]), 4) for k, v in columns.items()}
+        row["n_floors"] = int(row["n_floors"])
+        out.append(row)
+    return out
+
+
+def sweep_summary(result: Dict[str, Any], limit: int = 20) -> Dict[str, Any]:
+    """JSON-ready view of a sweep: the full Pareto front, the first *limit* feasible rows."""
+    return {
+        "area": result["area"],
+        "n_candidates": result["n_candidates"],
+        "n_feasible": result["n_feasible"],
+        "rule_failures": result["rule_failures"],
+        "objectives": result["objectives"],
+        "emergency_exits": result["emergency_exits"],
+        "front": records(result["front"]),
+        "feasible": records(result["feasible"], limit),
+        "seconds": round(result["seconds"], 4),
+    }
+
+
+class DesignSweepTool(BaseAgentTool):
+    """Sweep width × floors × floor height × window ratio for a footprint area."""
+
+    name: str = "sweep_design_space"
+    description: str = (
+        "Evaluate a grid of building massings (width, n_floors, floor_height, "
+        "window_ratio) for a footprint area against the design rules; returns "
+        "the number of feasible candidates and their Pareto front."
+    )
+    categories: list = ["building_design"]
+
+    def _run(  # type: ignore[override]
+        self,
+        area: float,
+        objectives: Optional[Dict[str, str]] = None,
+        width: Optional[Any] = None,
+        n_floors: Optional[Any] = None,
+        floor_height: Optional[Any] = None,
+        window_ratio: Optional[Any] = None,
+        limit: int = 20,
+    ) -> Dict[str, Any]:
+        axes = {
+            k: v for k, v in (
+                ("width", width), ("n_floors", n_floors),
+                ("floor_height", floor_height), ("window_ratio", window_ratio),
+            ) if v is not None
+        }
+        try:
+            return sweep_summary(sweep_design(area, axes, objectives), limit)
+        except (KeyError, TypeError, ValueError) as exc:
+            return {"error": str(exc)}
+
+
+# Module-level instance
+sweep_design_space = DesignSweepTool()
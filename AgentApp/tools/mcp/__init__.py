@@ -7,13 +7,24 @@ Public API
     load_mcp_tools()    → List[BaseTool]
     reload_mcp_tools()  → List[BaseTool]  (re-fetches at runtime)
     DynamicMCPTool      — the concrete tool class (subclass of BaseAgentTool)
+    tool_registry_version(tools) → str  (hash of names + schemas)
+    ROUTER              — EndpointRouter spreading calls over MCP_GH_ENDPOINTS
 """
 
-from .loader import TOOL_CLASSES, DynamicMCPTool, load_mcp_tools, reload_mcp_tools
+from .loader import (
+    ROUTER,
+    TOOL_CLASSES,
+    DynamicMCPTool,
+    load_mcp_tools,
+    reload_mcp_tools,
+    tool_registry_version,
+)
 
 __all__ = [
     "TOOL_CLASSES",
     "DynamicMCPTool",
+    "ROUTER",
+    "tool_registry_version",
     "load_mcp_tools",
     "reload_mcp_tools",
 ]
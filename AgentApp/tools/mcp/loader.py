@@ -1,10 +1,30 @@
 """
 Dynamically load tools from the GH MCP Server (Grasshopper plugin HTTP server).
 Adapted from GlabAgents pattern — single source of truth is the running server.
+
+Several servers can be configured (``MCP_GH_ENDPOINTS``).  Their tool catalogs
+are merged by name and every call is routed by ``ROUTER``:
+
+  - calls whose arguments reference a baked object GUID are pinned to the
+    server that returned that GUID (the objects only exist in its document);
+  - all other calls go to the least-loaded server that exposes the tool,
+    and move on to the next one when a server cannot be reached.
+
+The GUID → server map keeps the MCP_GUID_OWNERS_MAX most recently used GUIDs.
+
+Tools are assumed to change the document unless their definition sets
+``"readOnly": true`` (the plugin's viewport / scene / API-lookup tools do),
+carries the MCP annotation ``readOnlyHint``, or is listed in
+MCP_READ_ONLY_TOOLS.  ``ROUTER.schedule`` uses this to decide which calls of
+one batch may run in parallel.
 """
+import hashlib
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import requests
 from langchain_core.tools import BaseTool
@@ -14,14 +34,129 @@ from tools.base import BaseAgentTool
 
 # Import config from app/ package; fall back to env vars if run stand-alone
 try:
-    from app.config import MCP_GH_ENDPOINT, MCP_TIMEOUT
+    from app.config import (
+        MCP_GH_ENDPOINT,
+        MCP_GH_ENDPOINTS,
+        MCP_GUID_OWNERS_MAX,
+        MCP_READ_ONLY_TOOLS,
+        MCP_TIMEOUT,
+    )
 except ImportError:
     import os
     MCP_GH_ENDPOINT = os.getenv("MCP_GH_ENDPOINT", "http://localhost:5100")
+    MCP_GH_ENDPOINTS = os.getenv("MCP_GH_ENDPOINTS", MCP_GH_ENDPOINT).split(",")
     MCP_TIMEOUT = int(os.getenv("MCP_TIMEOUT", "30"))
+    MCP_GUID_OWNERS_MAX = 10_000
+    MCP_READ_ONLY_TOOLS = []
 
 logger = logging.getLogger(__name__)
 
+_CONNECT_ERROR = "Error: cannot connect to GH MCP Server"
+
+_GUID_RE = re.compile(
+    r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"
+)
+
+
+def find_guids(value: Any) -> List[str]:
+    """Return every GUID-looking string inside *value* (lower-cased, in order)."""
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    return [g.lower() for g in _GUID_RE.findall(text)]
+
+
+# ── Routing across servers ────────────────────────────────────────────────────
+
+class EndpointRouter:
+    """Pick the GH MCP server that handles each call.
+
+    Tracks in-flight calls per endpoint (the load signal) and which endpoint
+    owns each baked object GUID seen in a tool result (an LRU map of at most
+    *max_owners* GUIDs).  Thread-safe.
+    """
+
+    def __init__(self, max_owners: int = MCP_GUID_OWNERS_MAX) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = {}
+        self._owners: "OrderedDict[str, str]" = OrderedDict()
+        self.max_owners = max_owners
+
+    def owner_of(self, args: Dict[str, Any]) -> Optional[str]:
+        """Endpoint owning the first known GUID referenced by *args*, if any."""
+        with self._lock:
+            owners = []
+            for g in find_guids(args):
+                if g in self._owners:
+                    self._owners.move_to_end(g)
+                    owners.append(self._owners[g])
+        if len(set(owners)) > 1:
+            logger.warning(f"Call references objects on several servers: {sorted(set(owners))}")
+        return owners[0] if owners else None
+
+    def _pick(self, candidates: List[str], args: Dict[str, Any], planned: Dict[str, int]) -> str:
+        owner = self.owner_of(args)
+        if owner in candidates:
+            return owner
+        with self._lock:
+            # min() keeps configuration order on ties → deterministic
+            return min(candidates, key=lambda e: self._in_flight.get(e, 0) + planned.get(e, 0))
+
+    def schedule(
+        self, calls: List[Tuple[Optional[List[str]], Dict[str, Any], bool]]
+    ) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Route a batch of ``(candidates, args, read_only)`` calls up front.
+
+        Returns ``(endpoint, ordering key)`` per call.  Calls are spread over
+        the servers as ``acquire`` would, and calls naming the same GUIDs land
+        on the same server.  A server that gets at least one changing call in
+        the batch serialises all of its calls (key = the server) — a GH
+        server handles each request on its own task, so a draw and a following
+        bake / capture could otherwise finish in either order.  Calls on
+        servers that only get read-only calls, and calls without candidates
+        (native tools), have key None and may run in parallel.
+        """
+        planned: Dict[str, int] = {}
+        batch_owners: Dict[str, str] = {}
+        endpoints: List[Optional[str]] = []
+        for candidates, args, _ in calls:
+            if not candidates:
+                endpoints.append(None)
+                continue
+            guids = find_guids(args)
+            endpoint = next((batch_owners[g] for g in guids if batch_owners.get(g) in candidates), None)
+            endpoint = endpoint or self._pick(candidates, args, planned)
+            for g in guids:
+                batch_owners.setdefault(g, endpoint)
+            planned[endpoint] = planned.get(endpoint, 0) + 1
+            endpoints.append(endpoint)
+        written = {e for e, (_, _, read_only) in zip(endpoints, calls) if e and not read_only}
+        return [(e, e if e in written else None) for e in endpoints]
+
+    def acquire(self, candidates: List[str], args: Dict[str, Any], prefer: Optional[str] = None) -> str:
+        """Choose an endpoint for a call (*prefer* if it is a candidate) and count it as in flight."""
+        endpoint = prefer if prefer in candidates else self._pick(candidates, args, {})
+        with self._lock:
+            self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) + 1
+        return endpoint
+
+    def release(self, endpoint: str, result: Optional[str] = None) -> None:
+        """Mark a call finished and remember the GUIDs its result created."""
+        with self._lock:
+            self._in_flight[endpoint] = max(0, self._in_flight.get(endpoint, 0) - 1)
+            if result and not result.startswith("Error"):
+                for guid in find_guids(result):
+                    self._owners.setdefault(guid, endpoint)
+                    self._owners.move_to_end(guid)
+                while len(self._owners) > self.max_owners:
+                    self._owners.popitem(last=False)
+
+    def load(self) -> Dict[str, int]:
+        """Snapshot of in-flight calls per endpoint."""
+        with self._lock:
+            return dict(self._in_flight)
+
+
+ROUTER = EndpointRouter()
+
 
 # ── Dynamic tool wrapper ──────────────────────────────────────────────────────
 
@@ -35,14 +170,38 @@ class DynamicMCPTool(BaseAgentTool):
 
     mcp_tool_name: str
     mcp_endpoint: str
+    mcp_endpoints: List[str] = []       # every server exposing this tool
     mcp_timeout: int
     categories: List[str] = []
+    outputs: Dict[str, str] = {}        # declared outputs {name: type/description}
+    read_only: bool = False             # no document side effects → may run in parallel
 
     def _run(self, **kwargs: Any) -> str:
+        return self.call_on(None, **kwargs)
+
+    def call_on(self, endpoint: Optional[str], **kwargs: Any) -> str:
+        """Run the call on *endpoint* (as chosen by ``ROUTER.schedule``), or route it now."""
         clean_args = {k: v for k, v in kwargs.items() if v is not None}
+        candidates = list(self.mcp_endpoints or [self.mcp_endpoint])
+        # Calls on baked objects must reach the server holding them; others
+        # may fall over to the next server when one is unreachable
+        failover = not find_guids(clean_args)
+        while True:
+            endpoint = ROUTER.acquire(candidates, clean_args, endpoint)
+            result = None
+            try:
+                result = self._call(endpoint, clean_args)
+            finally:
+                ROUTER.release(endpoint, result)
+            candidates.remove(endpoint)
+            if not (failover and candidates and result.startswith(_CONNECT_ERROR)):
+                return result
+            logger.warning(f"{self.mcp_tool_name}: {endpoint} unreachable — retrying on another server")
+
+    def _call(self, endpoint: str, clean_args: Dict[str, Any]) -> str:
         try:
             resp = requests.post(
-                f"{self.mcp_endpoint}/api/call_tool",
+                f"{endpoint}/api/call_tool",
                 json={"name": self.mcp_tool_name, "arguments": clean_args},
                 timeout=self.mcp_timeout,
             )
@@ -68,7 +227,7 @@ class DynamicMCPTool(BaseAgentTool):
         except requests.exceptions.Timeout:
             return f"Error: request timed out after {self.mcp_timeout}s"
         except requests.exceptions.ConnectionError:
-            return "Error: cannot connect to GH MCP Server. Is the Grasshopper plugin running?"
+            return f"{_CONNECT_ERROR} at {endpoint}. Is the Grasshopper plugin running?"
         except Exception as exc:
             return f"Error calling tool: {exc}"
 
@@ -106,63 +265,109 @@ def convert_json_schema_to_pydantic(tool_name: str, schema: Dict[str, Any]) -> t
     return create_model(model_name, **fields)
 
 
-def create_tool_from_definition(tool_def: Dict[str, Any]) -> BaseTool:
+def create_tool_from_definition(
+    tool_def: Dict[str, Any],
+    endpoints: Optional[List[str]] = None,
+) -> BaseTool:
     name = tool_def.get("name", "unknown_tool")
     description = tool_def.get("description", "No description")
     input_schema = tool_def.get("inputSchema", {})
     categories = tool_def.get("categories", ["grasshopper", "custom"])
+    outputs = tool_def.get("outputs") or {}
+    # "readOnly" in the definition, the MCP annotation readOnlyHint, or the allowlist
+    read_only = bool(
+        tool_def.get("readOnly")
+        or (tool_def.get("annotations") or {}).get("readOnlyHint")
+        or name in MCP_READ_ONLY_TOOLS
+    )
+    endpoints = endpoints or [MCP_GH_ENDPOINT]
     pydantic_model = convert_json_schema_to_pydantic(name, input_schema)
     return DynamicMCPTool(
         name=name,
         description=description,
         args_schema=pydantic_model,
         mcp_tool_name=name,
-        mcp_endpoint=MCP_GH_ENDPOINT,
+        mcp_endpoint=endpoints[0],
+        mcp_endpoints=endpoints,
         mcp_timeout=MCP_TIMEOUT,
         categories=categories,
+        outputs=outputs,
+        read_only=read_only,
     )
 
 
 # ── Fetching ──────────────────────────────────────────────────────────────────
 
-def fetch_tool_definitions() -> List[Dict[str, Any]]:
-    """Query /api/list_tools from the running GH MCP server."""
+def fetch_tool_definitions(endpoint: str = MCP_GH_ENDPOINT) -> List[Dict[str, Any]]:
+    """Query /api/list_tools from one running GH MCP server."""
     try:
         resp = requests.post(
-            f"{MCP_GH_ENDPOINT}/api/list_tools",
+            f"{endpoint}/api/list_tools",
             json={},
             timeout=MCP_TIMEOUT,
         )
         resp.raise_for_status()
         data = resp.json()
         tools = data.get("tools", [])
-        logger.info(f"GH MCP Server: loaded {len(tools)} tools")
+        logger.info(f"GH MCP Server {endpoint}: loaded {len(tools)} tools")
         return tools
     except requests.exceptions.ConnectionError:
         logger.warning(
-            f"GH MCP Server not reachable at {MCP_GH_ENDPOINT}. "
+            f"GH MCP Server not reachable at {endpoint}. "
             "Start the Grasshopper plugin to enable GH tools."
         )
         return []
     except Exception as exc:
-        logger.warning(f"Failed to fetch tools from GH MCP Server: {exc}")
+        logger.warning(f"Failed to fetch tools from GH MCP Server {endpoint}: {exc}")
         return []
 
 
+def merge_tool_catalogs(catalogs: Iterable[tuple]) -> List[tuple]:
+    """Merge ``(endpoint, tool_defs)`` pairs into ``(tool_def, [endpoints])``.
+
+    The first server to declare a tool provides its definition; a server whose
+    schema differs for the same name is still listed but logged.
+    """
+    merged: Dict[str, tuple] = {}
+    for endpoint, tool_defs in catalogs:
+        for td in tool_defs:
+            name = td.get("name", "unknown_tool")
+            if name not in merged:
+                merged[name] = (td, [endpoint])
+                continue
+            first_def, endpoints = merged[name]
+            if td.get("inputSchema", {}) != first_def.get("inputSchema", {}):
+                logger.warning(
+                    f"Tool '{name}' on {endpoint} has a different schema than on "
+                    f"{endpoints[0]}; using the first definition."
+                )
+            if endpoint not in endpoints:
+                endpoints.append(endpoint)
+    return list(merged.values())
+
+
 def load_mcp_tools() -> List[BaseTool]:
-    """Load all GH tools from the MCP server as LangChain tools."""
-    tool_defs = fetch_tool_definitions()
+    """Load all GH tools from every configured MCP server as LangChain tools."""
+    catalogs = [(ep, fetch_tool_definitions(ep)) for ep in MCP_GH_ENDPOINTS]
     tools: List[BaseTool] = []
-    for td in tool_defs:
+    for td, endpoints in merge_tool_catalogs(catalogs):
         try:
-            tool = create_tool_from_definition(td)
+            tool = create_tool_from_definition(td, endpoints)
             tools.append(tool)
-            logger.info(f"  + {tool.name}")
+            logger.info(f"  + {tool.name}  ({len(endpoints)} server(s))")
         except Exception as exc:
             logger.error(f"  - Failed to load '{td.get('name', '?')}': {exc}")
     return tools
 
 
+def tool_registry_version(tools: Iterable[BaseTool]) -> str:
+    """Short hash of the tool names + argument schemas (changes when tools do)."""
+    signature = sorted(
+        (t.name, json.dumps(t.args, sort_keys=True, default=str)) for t in tools
+    )
+    return hashlib.sha1(json.dumps(signature).encode()).hexdigest()[:12]
+
+
 def reload_mcp_tools() -> List[BaseTool]:
     """Re-fetch tools at runtime (call when user hits 'Reload Tools' in sidebar)."""
     global TOOL_CLASSES
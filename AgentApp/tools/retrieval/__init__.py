@@ -0,0 +1,27 @@
+"""
+tools/retrieval — Local building-code retrieval (offline alternative to web search).
+
+Drop .txt / .md code and regulation documents into CODE_DOCS_DIR
+(AgentApp/data/building_codes by default).  They are chunked into an on-disk
+BM25 index on first use and re-indexed whenever a file changes.
+
+Usage
+-----
+    from tools.retrieval import search_codes
+    result = search_codes.invoke("minimum stair width")   # same shape as search_web
+"""
+
+from .index import CodeIndex, build_index, ensure_index
+from .text import bm25_scores, tokenize
+from .tools import CodeSearchTool, get_code_index, search_codes
+
+__all__ = [
+    "CodeSearchTool",
+    "search_codes",
+    "get_code_index",
+    "CodeIndex",
+    "build_index",
+    "ensure_index",
+    "tokenize",
+    "bm25_scores",
+]
@@ -0,0 +1,308 @@
+"""
+On-disk BM25 index over a folder of building-code / regulation text.
+
+Layout of an index directory
+----------------------------
+    CURRENT        name of the generation directory in use
+    gen-<id>/
+      meta.json    chunk table, vocabulary {term: [df, offset]}, BM25 stats,
+                   and a signature of the source files it was built from
+      postings.bin uint32 pairs (chunk_id, term_frequency), grouped by term
+      chunks.txt   UTF-8 text of every chunk, back to back
+
+``postings.bin`` and ``chunks.txt`` are memory-mapped, so opening an index
+only parses meta.json and a query touches just the postings of its terms.
+A rebuild writes a new generation and then swaps ``CURRENT``; files an open
+index still maps are never replaced (Windows refuses that), and old
+generations are removed once nothing maps them.
+
+Usage
+-----
+    python -m tools.retrieval.index data/building_codes .cache/code_index
+
+    index = ensure_index(source_dir, index_dir)   # rebuilds when files change
+    index.search("minimum stair width", k=3)      # → [{title, url, content, score, …}]
+"""
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import sys
+import time
+import uuid
+from array import array
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.retrieval.text import tokenize
+
+INDEX_VERSION = 1
+CHUNK_WORDS = 160
+SOURCE_EXTENSIONS = (".txt", ".md")
+K1 = 1.2
+B = 0.75
+
+_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+(.+?)\s*#*\s*$")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Ingestion
+# ─────────────────────────────────────────────────────────────────────────────
+
+def source_files(source_dir: str) -> List[str]:
+    out = []
+    for root, _, files in os.walk(source_dir):
+        for name in sorted(files):
+            if name.lower().endswith(SOURCE_EXTENSIONS) and not name.lower().startswith("readme"):
+                out.append(os.path.join(root, name))
+    return sorted(out)
+
+
+def source_signature(source_dir: str) -> List[List[Any]]:
+    """``[[relative_path, size, mtime], …]`` — changes whenever a source file does."""
+    sig = []
+    for path in source_files(source_dir):
+        st = os.stat(path)
+        sig.append([os.path.relpath(path, source_dir), st.st_size, int(st.st_mtime)])
+    return sig
+
+
+def chunk_text(text: str, default_title: str, max_words: int = CHUNK_WORDS) -> List[Tuple[str, str]]:
+    """Split *text* into ``(title, chunk)`` pieces of about *max_words* words.
+
+    Paragraphs are kept whole where possible; the title is the nearest
+    preceding markdown heading (or *default_title*).
+    """
+    chunks: List[Tuple[str, str]] = []
+    title = default_title
+    buf: List[str] = []
+    words = 0
+
+    def flush() -> None:
+        nonlocal buf, words
+        if buf:
+            chunks.append((title, "\n\n".join(buf)))
+        buf, words = [], 0
+
+    for para in re.split(r"\n\s*\n", text):
+        para = para.strip()
+        if not para:
+            continue
+        heading = _HEADING_RE.match(para.splitlines()[0])
+        if heading:
+            flush()
+            title = heading.group(1)
+            para = "\n".join(para.splitlines()[1:]).strip()
+            if not para:
+                continue
+        n = len(para.split())
+        if n > max_words:
+            flush()
+            tokens = para.split()
+            for i in range(0, len(tokens), max_words):
+                chunks.append((title, " ".join(tokens[i:i + max_words])))
+            continue
+        if words + n > max_words:
+            flush()
+        buf.append(para)
+        words += n
+    flush()
+    return chunks
+
+
+def build_index(source_dir: str, index_dir: str) -> "CodeIndex":
+    """Chunk every source file and write a fresh index to *index_dir*."""
+    chunks: List[Dict[str, Any]] = []
+    texts: List[bytes] = []
+    term_postings: Dict[str, List[Tuple[int, int]]] = {}
+    offset = 0
+
+    for path in source_files(source_dir):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        rel = os.path.relpath(path, source_dir)
+        default_title = os.path.splitext(os.path.basename(path))[0].replace("_", " ")
+        for n, (title, chunk) in enumerate(chunk_text(text, default_title)):
+            tokens = tokenize(f"{title} {chunk}")
+            if not tokens:
+                continue
+            cid = len(chunks)
+            data = chunk.encode("utf-8")
+            chunks.append({
+                "source": rel, "title": title, "n": n,
+                "offset": offset, "length": len(data), "dl": len(tokens),
+            })
+            texts.append(data)
+            offset += len(data)
+            for term, tf in Counter(tokens).items():
+                term_postings.setdefault(term, []).append((cid, tf))
+
+    vocab: Dict[str, List[int]] = {}
+    postings = array("I")
+    for term in sorted(term_postings):
+        plist = term_postings[term]
+        vocab[term] = [len(plist), len(postings) // 2]
+        for cid, tf in plist:
+            postings.extend((cid, tf))
+
+    # A fresh generation directory: open readers keep their own files
+    generation = f"gen-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    gen_dir = os.path.join(index_dir, generation)
+    os.makedirs(gen_dir)
+    with open(os.path.join(gen_dir, "postings.bin"), "wb") as f:
+        postings.tofile(f)
+    with open(os.path.join(gen_dir, "chunks.txt"), "wb") as f:
+        for data in texts:
+            f.write(data)
+    meta = {
+        "version": INDEX_VERSION,
+        "source_dir": os.path.abspath(source_dir),
+        "signature": source_signature(source_dir),
+        "avgdl": sum(c["dl"] for c in chunks) / len(chunks) if chunks else 0.0,
+        "chunks": chunks,
+        "vocab": vocab,
+    }
+    with open(os.path.join(gen_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    tmp = os.path.join(index_dir, "CURRENT.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(generation)
+    os.replace(tmp, os.path.join(index_dir, "CURRENT"))
+    _remove_old_generations(index_dir, keep=generation)
+    return CodeIndex(index_dir)
+
+
+def _remove_old_generations(index_dir: str, keep: str) -> None:
+    """Delete generations other than *keep*; ones still mapped (Windows) stay for next time."""
+    for name in os.listdir(index_dir):
+        path = os.path.join(index_dir, name)
+        if name != keep and os.path.isdir(path) and name.startswith("gen-"):
+            shutil.rmtree(path, ignore_errors=True)
+    # files of the flat, pre-generation layout
+    for name in ("meta.json", "postings.bin", "chunks.txt"):
+        try:
+            os.remove(os.path.join(index_dir, name))
+        except OSError:
+            pass
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Querying
+# ─────────────────────────────────────────────────────────────────────────────
+
+class CodeIndex:
+    """Read-only view of an index's current generation (postings and text memory-mapped)."""
+
+    def __init__(self, index_dir: str) -> None:
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, "CURRENT"), encoding="utf-8") as f:
+            self.gen_dir = os.path.join(index_dir, f.read().strip())
+        with open(os.path.join(self.gen_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.chunks: List[Dict[str, Any]] = self.meta["chunks"]
+        self.vocab: Dict[str, List[int]] = self.meta["vocab"]
+        self.avgdl: float = self.meta["avgdl"] or 1.0
+        self._postings = self._map("postings.bin")
+        self._text = self._map("chunks.txt")
+        self._view = memoryview(self._postings) if self._postings else memoryview(b"")
+        self._ids = self._view.cast("I")
+
+    def _map(self, name: str) -> Optional[mmap.mmap]:
+        path = os.path.join(self.gen_dir, name)
+        if os.path.getsize(path) == 0:
+            return None
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """Unmap the files (the index cannot be searched afterwards)."""
+        self._ids.release()
+        self._view.release()
+        for m in (self._postings, self._text):
+            if m is not None:
+                m.close()
+        self._postings = self._text = None
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def text(self, cid: int) -> str:
+        c = self.chunks[cid]
+        if self._text is None:
+            return ""
+        return self._text[c["offset"]:c["offset"] + c["length"]].decode("utf-8", errors="replace")
+
+    def is_current(self, source_dir: str) -> bool:
+        return (
+            self.meta.get("version") == INDEX_VERSION
+            and self.meta.get("signature") == source_signature(source_dir)
+        )
+
+    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """Top-*k* chunks by BM25, shaped like Tavily results.
+
+        ``coverage`` is the share of distinct query terms found in the chunk.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.chunks:
+            return []
+        n_docs = len(self.chunks)
+        scores: Dict[int, float] = {}
+        matched: Dict[int, int] = {}
+        for term in terms:
+            entry = self.vocab.get(term)
+            if entry is None:
+                continue
+            df, start = entry
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            ids = self._ids[2 * start:2 * (start + df)]
+            for j in range(0, len(ids), 2):
+                cid, tf = ids[j], ids[j + 1]
+                dl = self.chunks[cid]["dl"]
+                scores[cid] = scores.get(cid, 0.0) + idf * tf * (K1 + 1) / (
+                    tf + K1 * (1 - B + B * dl / self.avgdl)
+                )
+                matched[cid] = matched.get(cid, 0) + 1
+
+        top = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        results = []
+        for cid, score in top:
+            c = self.chunks[cid]
+            results.append({
+                "title": c["title"],
+                "url": f"file://{os.path.join(self.meta['source_dir'], c['source'])}#chunk-{c['n']}",
+                "content": self.text(cid),
+                "score": round(score, 4),
+                "coverage": round(matched[cid] / len(terms), 3),
+                "source": "local_codes",
+            })
+        return results
+
+
+def ensure_index(source_dir: str, index_dir: str) -> Optional[CodeIndex]:
+    """Open the index at *index_dir*, (re)building it if the sources changed.
+
+    Returns None when *source_dir* does not exist or holds no documents.
+    """
+    if not os.path.isdir(source_dir) or not source_files(source_dir):
+        return None
+    try:
+        index = CodeIndex(index_dir)
+        if index.is_current(source_dir):
+            return index
+        index.close()
+    except (OSError, ValueError, KeyError):
+        pass
+    print(f"  [codes] building index of {source_dir} …")
+    return build_index(source_dir, index_dir)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m tools.retrieval.index <source_dir> <index_dir>")
+        sys.exit(2)
+    built = build_index(sys.argv[1], sys.argv[2])
+    print(f"indexed {len(built)} chunks, {len(built.vocab)} terms → {sys.argv[2]}")
@@ -0,0 +1,62 @@
+"""Tokenisation shared by the local retrieval index and result reranking."""
+import math
+import re
+from collections import Counter
+from typing import List, Sequence
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers how i if in into
+is it its itself just me more most my no nor not of off on once only or other
+our out over own same she should so some such than that the their them then
+there these they this those through to too under until up very was we were what
+when where which while who whom why will with would you your
+""".split())
+
+
+def stem(token: str) -> str:
+    """Very light plural / verb-ending stemmer — enough to match code wording."""
+    if len(token) <= 3 or token[0].isdigit():
+        return token
+    for suffix, repl in (("ies", "y"), ("sses", "ss"), ("ing", ""), ("ed", ""), ("es", "e"), ("s", "")):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            if suffix == "s" and token.endswith("ss"):
+                return token
+            return token[: -len(suffix)] + repl
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased, stop-word-free, stemmed tokens."""
+    return [stem(t) for t in _TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+def bm25_scores(query: str, documents: Sequence[str], k1: float = 1.2, b: float = 0.75) -> List[float]:
+    """BM25 score of every document for *query*, with IDF taken from *documents*.
+
+    For small candidate sets (reranking search results) — the on-disk index
+    in index.py uses the same formula over the whole corpus.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    docs = [Counter(tokenize(d)) for d in documents]
+    if not terms or not docs:
+        return [0.0] * len(docs)
+    n = len(docs)
+    lengths = [sum(d.values()) for d in docs]
+    avgdl = (sum(lengths) / n) or 1.0
+    idf = {}
+    for t in terms:
+        df = sum(1 for d in docs if t in d)
+        idf[t] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+    scores = []
+    for d, dl in zip(docs, lengths):
+        score = 0.0
+        for t in terms:
+            tf = d.get(t, 0)
+            if tf:
+                score += idf[t] * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+        scores.append(score)
+    return scores
@@ -0,0 +1,57 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from tools.base import BaseAgentTool
+from tools.retrieval.index import CodeIndex, ensure_index
+
+try:
+    from app.config import CODE_DOCS_DIR, CODE_INDEX_CHECK_SECONDS, CODE_INDEX_DIR
+except ImportError:
+    _ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    CODE_DOCS_DIR = os.path.join(_ROOT, "data", "building_codes")
+    CODE_INDEX_DIR = os.path.join(_ROOT, ".cache", "code_index")
+    CODE_INDEX_CHECK_SECONDS = 60
+
+_lock = threading.Lock()
+_index: Optional[CodeIndex] = None
+_checked = 0.0
+
+
+def get_code_index() -> Optional[CodeIndex]:
+    """The building-code index (None if there are no documents).
+
+    The documents are checked for changes at most every
+    CODE_INDEX_CHECK_SECONDS, not on every query.  A rebuild swaps in a new
+    generation; the old index stays mapped for queries still using it.
+    """
+    global _index, _checked
+    with _lock:
+        now = time.monotonic()
+        if _index is None or now - _checked >= CODE_INDEX_CHECK_SECONDS:
+            if _index is None or not _index.is_current(CODE_DOCS_DIR):
+                _index = ensure_index(CODE_DOCS_DIR, CODE_INDEX_DIR)
+            _checked = now
+        return _index
+
+
+class CodeSearchTool(BaseAgentTool):
+    """Search the local building-code documents (BM25, no network)."""
+
+    name: str = "search_building_codes"
+    description: str = (
+        "Search the local building-code and regulation documents for passages "
+        "related to the query."
+    )
+    categories: list = ["search", "general_question", "building_design"]
+
+    def _run(self, query: str, k: int = 3) -> Dict[str, Any]:  # type: ignore[override]
+        index = get_code_index()
+        if index is None:
+            return {"query": query, "results": [], "error": f"no documents in {CODE_DOCS_DIR}"}
+        return {"query": query, "results": index.search(query, k=k)}
+
+
+# Module-level instance — import this directly for use in nodes
+search_codes = CodeSearchTool()
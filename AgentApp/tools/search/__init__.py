@@ -5,8 +5,11 @@ Usage
 -----
     from tools.search import search_web
     result = search_web.invoke("passive solar design principles")
+
+Responses are cached in SQLite (``search_cache``); cached responses and
+their results carry ``cached`` / ``cache_age`` / ``stale`` flags.
 """
 
-from .tools import WebSearchTool, search_web
+from .tools import SearchCache, WebSearchTool, normalize_query, search_cache, search_web
 
-__all__ = ["WebSearchTool", "search_web"]
+__all__ = ["WebSearchTool", "search_web", "SearchCache", "search_cache", "normalize_query"]
@@ -1,18 +1,157 @@
+import json
 import os
-from typing import Dict, Any
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
 
 from dotenv import load_dotenv
 
 from tools.base import BaseAgentTool
+from utils import metrics
+
+try:
+    from app.config import (
+        SEARCH_CACHE,
+        SEARCH_CACHE_MAX_ENTRIES,
+        SEARCH_CACHE_PATH,
+        SEARCH_CACHE_STALE_TTL,
+        SEARCH_CACHE_TTL,
+    )
+except ImportError:
+    SEARCH_CACHE = True
+    SEARCH_CACHE_PATH = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        ".cache", "search_cache.sqlite",
+    )
+    SEARCH_CACHE_TTL = 6 * 3600
+    SEARCH_CACHE_STALE_TTL = 7 * 24 * 3600
+    SEARCH_CACHE_MAX_ENTRIES = 1000
 
 load_dotenv()
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
+MAX_RESULTS = 3
+
 # Only instantiate if key is available
 _tavily = None
 if TAVILY_API_KEY:
     from langchain_tavily import TavilySearch
-    _tavily = TavilySearch(tavily_api_key=TAVILY_API_KEY, max_results=3)
+    _tavily = TavilySearch(tavily_api_key=TAVILY_API_KEY, max_results=MAX_RESULTS)
+
+
+def normalize_query(query: str) -> str:
+    """Cache key text: lower case, punctuation dropped, whitespace collapsed."""
+    return " ".join(re.sub(r"[^\w\s]", " ", str(query).lower()).split())
+
+
+class SearchCache:
+    """SQLite cache of search responses with TTL, LRU eviction and stale-while-revalidate."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = SEARCH_CACHE_TTL,
+        stale_ttl: float = SEARCH_CACHE_STALE_TTL,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._refreshing: set = set()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            " key TEXT PRIMARY KEY, query TEXT, response TEXT,"
+            " created REAL, last_used REAL, hits INTEGER DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS search_cache_last_used ON search_cache(last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return ``(response, age_seconds)`` for entries younger than stale_ttl."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            age = now - row[1]
+            if age > self.stale_ttl:
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE search_cache SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(row[0]), age
+
+    def put(self, key: str, query: str, response: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, query, response, created, last_used, hits)"
+                " VALUES (?, ?, ?, ?, ?, 0)",
+                (key, query, json.dumps(response), now, now),
+            )
+            # Size bound: drop least recently used rows beyond max_entries
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN (SELECT key FROM search_cache"
+                " ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def revalidate(self, key: str, query: str, fetch) -> None:
+        """Refresh *key* in a background thread (once at a time per key)."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _refresh() -> None:
+            try:
+                response = fetch(query)
+                if not response.get("error"):
+                    self.put(key, query, response)
+                    metrics.incr("search_cache.revalidated")
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_refresh, daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        counters = metrics.snapshot()["counters"]
+        return {
+            "entries": entries,
+            "hits": counters.get("search_cache.hit", 0),
+            "stale_hits": counters.get("search_cache.stale", 0),
+            "misses": counters.get("search_cache.miss", 0),
+        }
+
+
+def _flag_cached(response: Dict[str, Any], age: float, stale: bool) -> Dict[str, Any]:
+    """Copy of a cached response with ``cached`` / ``cache_age`` on it and every result."""
+    meta = {"cached": True, "cache_age": round(age, 1), "stale": stale}
+    flagged = {**response, **meta}
+    if isinstance(response.get("results"), list):
+        flagged["results"] = [
+            {**r, **meta} if isinstance(r, dict) else r for r in response["results"]
+        ]
+    return flagged
 
 
 class WebSearchTool(BaseAgentTool):
@@ -22,7 +161,7 @@ class WebSearchTool(BaseAgentTool):
     description: str = "Search the web for information related to the query."
     categories: list = ["search", "general_question"]
 
-    def _run(self, query: str) -> Dict[str, Any]:  # type: ignore[override]
+    def _fetch(self, query: str) -> Dict[str, Any]:
         if _tavily is None:
             return {"error": "TAVILY_API_KEY not set — web search unavailable.", "results": []}
         try:
@@ -30,6 +169,41 @@ class WebSearchTool(BaseAgentTool):
         except Exception as e:
             return {"error": str(e), "results": []}
 
+    def _run(self, query: str) -> Dict[str, Any]:  # type: ignore[override]
+        cache = search_cache
+        if cache is None or _tavily is None:
+            return self._fetch(query)
+
+        key = f"{MAX_RESULTS}:{normalize_query(query)}"
+        hit = cache.get(key)
+        if hit is not None:
+            response, age = hit
+            stale = age > cache.ttl
+            if stale:
+                metrics.incr("search_cache.stale")
+                cache.revalidate(key, query, self._fetch)
+            else:
+                metrics.incr("search_cache.hit")
+            return _flag_cached(response, age, stale)
+
+        metrics.incr("search_cache.miss")
+        response = self._fetch(query)
+        if isinstance(response, dict) and not response.get("error"):
+            cache.put(key, query, response)
+        return response
+
+
+def _make_cache() -> Optional[SearchCache]:
+    if not SEARCH_CACHE:
+        return None
+    try:
+        return SearchCache(SEARCH_CACHE_PATH)
+    except (OSError, sqlite3.Error) as exc:
+        print(f"  [search] cache disabled: {exc}")
+        return None
+
+
+search_cache = _make_cache()
 
 # Module-level instance — import this directly for use in nodes
 search_web = WebSearchTool()
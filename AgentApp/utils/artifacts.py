@@ -0,0 +1,227 @@
+"""
+Content-addressed store for large tool outputs.
+
+Viewport captures, geometry dumps and ``run_csharp_script`` JSON used to sit
+inline in ``tool_results``, ``plan_results`` and every prompt built from
+them.  ``stash(text)`` stores anything longer than ARTIFACT_MIN_CHARS and
+returns a short stub that takes its place in state and prompts:
+
+    [artifact art:3f1c0a9be2d47a15c09e8b71, 48213 chars] {"vertices": [[0.0, …
+
+``resolve(stub)`` returns the full text; nodes call it only where they need
+the data (e.g. result templates), and ``GET /artifacts/{handle}`` serves it.
+
+Storage
+-------
+Artifacts are keyed by the SHA-256 of their bytes (the handle carries the
+first 96 bits), so identical outputs are stored once.  Each is a file under
+ARTIFACT_DIR in CACHE_DIR, written atomically and read through ``mmap``; the
+most recently used ones are also kept in an in-memory LRU tier of up to
+ARTIFACT_MEMORY_BYTES.  Errors (``Error…`` results) are never stashed, so
+failure checks on the stored strings keep working.
+
+Metrics: ``artifacts.stored``, ``artifacts.deduplicated``,
+``artifacts.memory_hit``, ``artifacts.disk_hit``.
+
+Usage
+-----
+    from utils.artifacts import artifact_store, keep, stash, resolve
+    stub = stash(result_str)            # short text for state / prompts
+    keep(capture_json)                  # store regardless of size → handle
+    resolve(stub)                       # → result_str
+    handle = artifact_store.put(data)   # "art:…" (bytes or str)
+    with artifact_store.open(handle) as view: …   # zero-copy mmap
+"""
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Union
+
+from utils import metrics
+
+try:
+    from app.config import (
+        ARTIFACT_DIR,
+        ARTIFACT_MEMORY_BYTES,
+        ARTIFACT_MIN_CHARS,
+        ARTIFACT_PREVIEW_CHARS,
+        ARTIFACTS,
+    )
+except ImportError:
+    ARTIFACTS = True
+    ARTIFACT_DIR = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "artifacts"
+    )
+    ARTIFACT_MIN_CHARS = 2000
+    ARTIFACT_PREVIEW_CHARS = 300
+    ARTIFACT_MEMORY_BYTES = 64 * 1024 * 1024
+
+HANDLE_PREFIX = "art:"
+_HEX_CHARS = 24                      # 96 bits of the SHA-256
+_HANDLE_RE = re.compile(r"^art:[0-9a-f]{%d}$" % _HEX_CHARS)
+_STUB_RE = re.compile(r"^\[artifact (art:[0-9a-f]{%d}), \d+ chars\]" % _HEX_CHARS)
+
+
+class ArtifactStore:
+    """SHA-256-addressed files with an LRU memory tier."""
+
+    def __init__(self, root: str = ARTIFACT_DIR, memory_bytes: int = ARTIFACT_MEMORY_BYTES) -> None:
+        self.root = root
+        self.memory_bytes = memory_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+
+    # ── Paths and the memory tier ─────────────────────────────────────────────
+
+    def _path(self, handle: str) -> str:
+        if not _HANDLE_RE.match(handle):
+            raise KeyError(f"not an artifact handle: {handle!r}")
+        digest = handle[len(HANDLE_PREFIX):]
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def _remember(self, handle: str, data: bytes) -> None:
+        if len(data) > self.memory_bytes:
+            return
+        with self._lock:
+            if handle in self._memory:
+                self._memory.move_to_end(handle)
+                return
+            self._memory[handle] = data
+            self._memory_used += len(data)
+            while self._memory_used > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= len(evicted)
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def put(self, data: Union[str, bytes]) -> str:
+        """Store *data* (once per distinct content) and return its handle."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        handle = HANDLE_PREFIX + hashlib.sha256(data).hexdigest()[:_HEX_CHARS]
+        path = self._path(handle)
+        if os.path.exists(path):
+            metrics.incr("artifacts.deduplicated")
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)      # atomic: readers never see a partial file
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+            metrics.incr("artifacts.stored")
+        self._remember(handle, data)
+        return handle
+
+    def get(self, handle: str) -> bytes:
+        """The bytes of *handle* (KeyError if unknown)."""
+        with self._lock:
+            data = self._memory.get(handle)
+            if data is not None:
+                self._memory.move_to_end(handle)
+        if data is not None:
+            metrics.incr("artifacts.memory_hit")
+            return data
+        with self.open(handle) as view:
+            data = bytes(view)
+        metrics.incr("artifacts.disk_hit")
+        self._remember(handle, data)
+        return data
+
+    def get_text(self, handle: str) -> str:
+        return self.get(handle).decode("utf-8", errors="replace")
+
+    def open(self, handle: str) -> mmap.mmap:
+        """Read-only memory map of *handle* (use as a context manager)."""
+        path = self._path(handle)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return _EmptyView()
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise KeyError(f"unknown artifact {handle}")
+
+    def __contains__(self, handle: str) -> bool:
+        try:
+            return handle in self._memory or os.path.exists(self._path(handle))
+        except KeyError:
+            return False
+
+
+class _EmptyView(bytes):
+    """Stand-in for an mmap of an empty file (mmap cannot map zero bytes)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+# Module-level instance
+artifact_store = ArtifactStore()
+
+
+def stub(handle: str, text: str) -> str:
+    """Short stand-in for *text*: its handle, length and a preview."""
+    preview = " ".join(text[:ARTIFACT_PREVIEW_CHARS].split())
+    return f"[artifact {handle}, {len(text)} chars] {preview}…"
+
+
+def keep(data: Union[str, bytes]) -> Optional[str]:
+    """Store *data*; its handle, or None when artifacts are off or the write fails."""
+    if not ARTIFACTS:
+        return None
+    try:
+        return artifact_store.put(data)
+    except OSError as exc:
+        print(f"  [artifacts] cannot store output: {exc}")
+        return None
+
+
+def stash(text: str) -> str:
+    """*text* itself if short (or an error), else a stub pointing at the stored copy."""
+    if (
+        not ARTIFACTS
+        or not isinstance(text, str)
+        or len(text) <= ARTIFACT_MIN_CHARS
+        or text.startswith("Error")
+        or _STUB_RE.match(text)
+    ):
+        return text
+    handle = keep(text)
+    return stub(handle, text) if handle else text
+
+
+def handle_of(value: str) -> Optional[str]:
+    """The handle a stub (or bare handle) refers to, or None."""
+    if not isinstance(value, str):
+        return None
+    if _HANDLE_RE.match(value):
+        return value
+    m = _STUB_RE.match(value)
+    return m.group(1) if m else None
+
+
+def resolve(value: str) -> str:
+    """Full text behind a stub or handle; anything else is returned unchanged.
+
+    A stub whose artifact is gone (cache cleared) resolves to itself.
+    """
+    handle = handle_of(value)
+    if handle is None:
+        return value
+    try:
+        return artifact_store.get_text(handle)
+    except KeyError:
+        return value
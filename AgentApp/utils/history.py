@@ -0,0 +1,145 @@
+"""
+Bounded state history with an on-disk, append-only event log.
+
+``state.history`` used to grow by one entry per node, many of them carrying
+full payloads (plan step results, tool results, answers), and LangGraph
+copies and checkpoints the state after every node.  Now nodes call
+``record(state, entry)``, which
+
+  - appends the full entry as one JSON line to the event log
+    (HISTORY_LOG_FILE in CACHE_DIR), tagged with the run and a sequence number;
+  - keeps a compact copy in ``state.history``: fields longer than
+    HISTORY_INLINE_CHARS are replaced by a short preview, and ``offset``
+    points at the full entry in the log;
+  - keeps only the last HISTORY_MAX_ENTRIES records (``state.history_dropped``
+    counts the older ones; ``seq`` numbers stay continuous).
+
+The run is ``state.history_run`` — the checkpoint thread id for runs started
+from the REPL or the API.  Metrics: ``history.spilled``, ``history.dropped``.
+
+Usage
+-----
+    from utils.history import record, read_entry, read_log
+    record(state, {"node": "plan_step", "result": result_str})
+    read_entry(state.history[-1]["offset"])    # the full entry
+    read_log(run=thread_id)                    # every entry of one run, in order
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from utils import metrics
+
+try:
+    from app.config import HISTORY_INLINE_CHARS, HISTORY_LOG, HISTORY_LOG_PATH, HISTORY_MAX_ENTRIES
+except ImportError:
+    HISTORY_MAX_ENTRIES = 100
+    HISTORY_INLINE_CHARS = 1000
+    HISTORY_LOG = True
+    HISTORY_LOG_PATH = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "history.log"
+    )
+
+PREVIEW_CHARS = 160
+
+_lock = threading.Lock()
+
+
+def _append(entry: Dict[str, Any], path: str = HISTORY_LOG_PATH) -> Optional[int]:
+    """Append *entry* as one JSON line; return its byte offset (None on failure)."""
+    line = (json.dumps(entry, default=str, ensure_ascii=False) + "\n").encode("utf-8")
+    try:
+        with _lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+        return offset
+    except OSError as exc:
+        print(f"  [history] cannot write {path}: {exc}")
+        return None
+
+
+def _text(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, default=str, ensure_ascii=False)
+
+
+def _preview(text: str) -> str:
+    return f"{text[:PREVIEW_CHARS]}… [{len(text)} chars]"
+
+
+def record(state, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Log *entry* and keep its compact form in ``state.history``; return that form."""
+    if not state.history_run:
+        state.history_run = uuid.uuid4().hex[:12]
+    seq = state.history_dropped + len(state.history) + 1
+    offset = None
+    if HISTORY_LOG:
+        offset = _append({"run": state.history_run, "seq": seq, "ts": round(time.time(), 3), **entry})
+
+    compact: Dict[str, Any] = {}
+    spilled: List[str] = []
+    for key, value in entry.items():
+        if isinstance(value, (str, dict, list, tuple)):
+            text = _text(value)
+            if len(text) > HISTORY_INLINE_CHARS:
+                compact[key] = _preview(text)
+                spilled.append(key)
+                continue
+        compact[key] = value
+    compact["seq"] = seq
+    if spilled:
+        compact["spilled"] = spilled
+        metrics.incr("history.spilled", len(spilled))
+    if offset is not None:
+        compact["offset"] = offset
+
+    state.history.append(compact)
+    overflow = len(state.history) - HISTORY_MAX_ENTRIES
+    if overflow > 0:
+        del state.history[:overflow]
+        state.history_dropped += overflow
+        metrics.incr("history.dropped", overflow)
+    return compact
+
+
+def read_entry(offset: int, path: str = HISTORY_LOG_PATH) -> Dict[str, Any]:
+    """The full log entry at byte *offset* (KeyError if there is none)."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            line = f.readline()
+        return json.loads(line)
+    except (OSError, ValueError):
+        raise KeyError(f"no history entry at offset {offset}")
+
+
+def read_log(run: Optional[str] = None, path: str = HISTORY_LOG_PATH) -> List[Dict[str, Any]]:
+    """Every log entry (of *run* only, if given) in write order, with its ``offset``."""
+    entries: List[Dict[str, Any]] = []
+    needle = None if run is None else f'"run": {json.dumps(run)}'.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                if needle is None or needle in line:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        entry = None       # torn write at the end of the log
+                    if entry is not None and (run is None or entry.get("run") == run):
+                        entries.append({**entry, "offset": offset})
+                offset += len(line)
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def full_history(state) -> List[Dict[str, Any]]:
+    """The complete history of *state*'s run (the in-state records if unlogged)."""
+    if not HISTORY_LOG or not state.history_run:
+        return list(state.history)
+    return read_log(state.history_run)
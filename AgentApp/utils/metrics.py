@@ -0,0 +1,72 @@
+"""
+In-process counters and timings shared by the agent nodes.
+
+Nodes record what they skipped or saved (cache hits, avoided LLM calls,
+parallel speed-ups …) so it can be inspected from the REPL (``stats``) or the
+API (``GET /metrics``).
+
+Usage
+-----
+    from utils import metrics
+    metrics.incr("plan_cache.hit")
+    metrics.observe("plan.wall_seconds", 1.84)
+    metrics.snapshot()   # → {"counters": {...}, "timings": {...}}
+"""
+import threading
+from typing import Any, Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_timings: Dict[str, Dict[str, float]] = {}
+
+
+def incr(name: str, amount: float = 1) -> None:
+    """Add *amount* to counter *name*."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def observe(name: str, seconds: float) -> None:
+    """Record one duration sample under *name* (count / total / max)."""
+    with _lock:
+        t = _timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        t["count"] += 1
+        t["total"] += seconds
+        t["max"] = max(t["max"], seconds)
+
+
+def ratio(numerator: str, denominator: str) -> float:
+    """counter[numerator] / counter[denominator] (0.0 when undefined)."""
+    with _lock:
+        den = _counters.get(denominator, 0)
+        return _counters.get(numerator, 0) / den if den else 0.0
+
+
+def snapshot() -> Dict[str, Any]:
+    """Copy of every counter and timing, with per-timing means."""
+    with _lock:
+        timings = {
+            k: {**v, "mean": v["total"] / v["count"] if v["count"] else 0.0}
+            for k, v in _timings.items()
+        }
+        return {"counters": dict(_counters), "timings": timings}
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _timings.clear()
+
+
+def format_snapshot() -> str:
+    """Human-readable dump for the terminal REPL."""
+    snap = snapshot()
+    lines = []
+    for k, v in sorted(snap["counters"].items()):
+        lines.append(f"  {k:<40} {v:g}")
+    for k, v in sorted(snap["timings"].items()):
+        lines.append(
+            f"  {k:<40} n={v['count']}  mean={v['mean']:.3f}s  "
+            f"total={v['total']:.3f}s  max={v['max']:.3f}s"
+        )
+    return "\n".join(lines) if lines else "  (no metrics recorded yet)"
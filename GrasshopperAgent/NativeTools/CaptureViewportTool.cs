@@ -35,7 +35,8 @@ namespace GrasshopperAgent.NativeTools
                 ["width"]        = "Actual pixel width of the capture",
                 ["height"]       = "Actual pixel height of the capture",
                 ["view_name"]    = "Name of the active viewport (e.g. Perspective)",
-            }
+            },
+            ReadOnly: true
         );
 
         public string Execute(Dictionary<string, string> args)
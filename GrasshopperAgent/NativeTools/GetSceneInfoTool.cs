@@ -36,7 +36,8 @@ namespace GrasshopperAgent.NativeTools
                 ["projection"]    = "parallel or perspective",
                 ["camera_target"] = "Camera target [x, y, z]",
                 ["units"]         = "Model unit system (Millimeters, Meters, …)",
-            }
+            },
+            ReadOnly: true
         );
 
         public string Execute(Dictionary<string, string> args)
@@ -30,7 +30,8 @@ namespace GrasshopperAgent.NativeTools
             {
                 ["count"]         = "Number of selected objects",
                 ["selected_json"] = "JSON array of selected objects with id, type, layer, name, bbox",
-            }
+            },
+            ReadOnly: true
         );
 
         public string Execute(Dictionary<string, string> args)
@@ -41,7 +41,8 @@ namespace GrasshopperAgent.NativeTools
                 ["properties"]   = "Public property signatures (declared on this type)",
                 ["methods"]      = "Public method signatures (declared on this type)",
                 ["enum_values"]  = "Enum member names (enum types only)",
-            }
+            },
+            ReadOnly: true
         );
 
         public string Execute(Dictionary<string, string> args)
@@ -41,7 +41,8 @@ namespace GrasshopperAgent.NativeTools
                 ["namespaces"] = "Distinct namespace list (returned when no args given)",
                 ["types"]      = "Array of { full_name, name, namespace, kind }",
                 ["count"]      = "Number of results",
-            }
+            },
+            ReadOnly: true
         );
 
         public string Execute(Dictionary<string, string> args)
@@ -22,12 +22,17 @@ namespace GrasshopperAgent.Protocol
 
     // ── Tool definition sent to Python ────────────────────────────────────────
 
+    /// <summary>
+    /// <c>ReadOnly</c> marks tools without document side effects; the Python
+    /// agent may run calls to them in parallel.
+    /// </summary>
     public record ToolDefinition(
         [property: JsonPropertyName("name")]        string Name,
         [property: JsonPropertyName("description")] string Description,
         [property: JsonPropertyName("inputSchema")]  InputSchema InputSchema,
         [property: JsonPropertyName("categories")]  string[] Categories,
-        [property: JsonPropertyName("outputs")]     Dictionary<string, string> Outputs
+        [property: JsonPropertyName("outputs")]     Dictionary<string, string> Outputs,
+        [property: JsonPropertyName("readOnly")]    bool ReadOnly = false
     );
 
     public record InputSchema(